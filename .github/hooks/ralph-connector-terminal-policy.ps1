@@ -4,8 +4,18 @@ $ErrorActionPreference = 'Stop'
 $AgentName = 'ralph-connector'
 $AllowedScripts = @(
     'scripts/assign_note_batch.py'
+    'scripts/backlinks.py'
+    'scripts/suggest_links.py'
+    'scripts/build_context.py'
+    'scripts/tags.py'
 )
 
+# Write modes of allowed scripts that belong to maintainers, not to this role.
+$DeniedArguments = @{
+    'scripts/backlinks.py' = @('--render')
+    'scripts/tags.py' = @('--backfill', '--rewrite')
+}
+
 function Write-DenyResponse {
     param(
         [Parameter(Mandatory = $true)]
@@ -147,4 +157,24 @@ if ($AllowedScripts -notcontains $scriptPath) {
     Write-DenyResponse "Command not permitted for $AgentName. Allowed commands: $allowedList"
 }
 
+$deniedFlags = @($DeniedArguments[$scriptPath])
+$arguments = @()
+if ($elements.Count -gt 3) {
+    $arguments = @($elements[3..($elements.Count - 1)])
+}
+
+foreach ($element in $arguments) {
+    $argument = (Normalize-Token $element.Extent.Text).ToLowerInvariant()
+    $flag = $argument.Split('=')[0]
+    if (-not $flag.StartsWith('--') -or $flag.Length -le 2) {
+        continue
+    }
+    # argparse accepts unambiguous prefixes, so '--back' means '--backfill'.
+    foreach ($denied in $deniedFlags) {
+        if ($denied -and $denied.StartsWith($flag)) {
+            Write-DenyResponse "'$denied' of $scriptPath is not permitted for $AgentName."
+        }
+    }
+}
+
 exit 0
\ No newline at end of file
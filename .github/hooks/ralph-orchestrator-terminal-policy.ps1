@@ -3,7 +3,10 @@ $ErrorActionPreference = 'Stop'
 
 $AgentName = 'ralph-orchestrator'
 $AllowedScripts = @(
+    'scripts/plan_iteration.py'
     'scripts/update_progress.py'
+    'scripts/graph_stats.py'
+    'scripts/question_tree.py'
 )
 
 function Write-DenyResponse {
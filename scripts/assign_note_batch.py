@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 """Assign a random batch of registered notes for a connector agent.
 
-Scans notes/ for files matching the registered NOTE-ID pattern,
-randomly selects a batch, and prints their relative filepaths.
+Samples note IDs from the binary index manifest (_index.bin) and resolves
+them to paths, so nothing is scanned however large the vault is. Without
+an _index.md it falls back to scanning notes/ (including year/month
+shards) for files matching the registered NOTE-ID pattern. Prints the
+relative filepaths of the batch.
 
 Usage:
     python scripts/assign_note_batch.py          # default batch of 3
@@ -13,22 +16,17 @@ from __future__ import annotations
 
 import argparse
 import random
-import re
 import sys
 from pathlib import Path
 
-WORKSPACE = Path(__file__).resolve().parent.parent
-NOTES_DIR = WORKSPACE / "notes"
-_NOTE_ID_RE = re.compile(r"^NOTE-\d{8}-\d{6}-\d{3}\.md$")
+sys.path.insert(0, str(Path(__file__).parent))
+import vault  # noqa: E402
+from manifest import open_fresh  # noqa: E402
 
 
 def find_registered_notes() -> list[Path]:
     """Return all registered note files (matching NOTE-ID pattern) in notes/."""
-    if not NOTES_DIR.exists():
-        return []
-    return sorted(
-        f for f in NOTES_DIR.iterdir() if f.is_file() and _NOTE_ID_RE.match(f.name)
-    )
+    return sorted(vault.iter_registered("note"))
 
 
 def main() -> int:
@@ -39,18 +37,23 @@ def main() -> int:
         default=3,
         help="Number of notes to select (default: 3)",
     )
-    args = parser.parse_args()
-
-    notes = find_registered_notes()
-    if not notes:
-        print("No registered notes found.", file=sys.stderr)
-        return 1
-
-    batch_size = min(args.size, len(notes))
-    batch = random.sample(notes, batch_size)
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    index = open_fresh()
+    if index is not None and index.notes:
+        with index:
+            ids = index.sample(args.size, "note")
+        batch = [p for p in map(vault.entry_path, ids) if p.exists()]
+    else:
+        notes = find_registered_notes()
+        if not notes:
+            print("No registered notes found.", file=sys.stderr)
+            return 1
+        batch = random.sample(notes, min(args.size, len(notes)))
 
     for note_path in batch:
-        print(note_path.relative_to(WORKSPACE))
+        print(note_path.relative_to(vault.ROOT))
 
     return 0
 
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Query and render backlinks from the persistent link index.
+
+The index is updated automatically when update_index.py registers a file.
+Connectors refresh it after editing notes; files are re-parsed only when
+their content hash has changed.
+
+Usage:
+    python scripts/backlinks.py NOTE-20260227-054343-855      # what links here?
+    python scripts/backlinks.py --refresh notes/NOTE-....md   # re-index edited files
+    python scripts/backlinks.py --refresh-all                 # re-index anything changed
+    python scripts/backlinks.py --render index                # "Backlinks" section in _index.md
+    python scripts/backlinks.py --render sidecar              # backlinks/{ID}.md files
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import link_index  # noqa: E402
+import manifest  # noqa: E402
+import vault  # noqa: E402
+
+BACKLINKS_START = "<!-- BACKLINKS -->"
+BACKLINKS_END = "<!-- END BACKLINKS -->"
+SIDECAR_DIR_NAME = "backlinks"
+
+
+def _grouped_wikilink_backlinks() -> list[tuple[str, list[str]]]:
+    """Return [(target_id, [source_ids])] for body wikilinks, sorted by target."""
+    conn = link_index.connect()
+    rows = conn.execute(
+        "SELECT dst, src FROM links WHERE kind = 'link' ORDER BY dst, src"
+    ).fetchall()
+    conn.close()
+    return [
+        (dst, [src for _, src in group])
+        for dst, group in itertools.groupby(rows, key=lambda r: r[0])
+    ]
+
+
+def render_index() -> int:
+    """Write a Backlinks section into _index.md. Returns the number of targets listed."""
+    groups = _grouped_wikilink_backlinks()
+    lines = [
+        f"- [[{dst}]] ← " + ", ".join(f"[[{src}]]" for src in srcs)
+        for dst, srcs in groups
+    ]
+    block = "\n".join([BACKLINKS_START, *lines, BACKLINKS_END])
+
+    with vault.lock("index"):
+        content = vault.INDEX_PATH.read_text(encoding="utf-8")
+        if BACKLINKS_START in content:
+            content = re.sub(
+                re.escape(BACKLINKS_START) + r".*?" + re.escape(BACKLINKS_END),
+                lambda _: block,
+                content,
+                count=1,
+                flags=re.DOTALL,
+            )
+        else:
+            content = content.rstrip("\n") + f"\n\n## Backlinks\n\n{block}\n"
+        vault.atomic_write(vault.INDEX_PATH, content)
+        manifest.refresh_manifest(vault.INDEX_PATH, vault.MANIFEST_PATH)
+    return len(groups)
+
+
+def render_sidecars() -> tuple[int, int]:
+    """Write backlinks/{ID}.md for every linked-to entry.
+
+    Only files whose contents would change are rewritten, and sidecars for
+    entries that lost all their backlinks are removed.
+    Returns (written, removed).
+    """
+    sidecar_dir = vault.ROOT / SIDECAR_DIR_NAME
+    sidecar_dir.mkdir(exist_ok=True)
+    written = 0
+    wanted: set[str] = set()
+    for dst, srcs in _grouped_wikilink_backlinks():
+        name = f"{dst}.md"
+        wanted.add(name)
+        text = f"# Linked from [[{dst}]]\n\n" + "".join(f"- [[{s}]]\n" for s in srcs)
+        path = sidecar_dir / name
+        if path.exists() and path.read_text(encoding="utf-8") == text:
+            continue
+        vault.atomic_write(path, text)
+        written += 1
+
+    removed = 0
+    for path in sidecar_dir.glob("*.md"):
+        if path.name not in wanted:
+            path.unlink()
+            removed += 1
+    return written, removed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Query and render note backlinks.")
+    parser.add_argument("entry_id", nargs="?", help="Note or question ID to query")
+    parser.add_argument(
+        "--refresh", nargs="+", metavar="PATH", help="Re-index the given files"
+    )
+    parser.add_argument(
+        "--refresh-all", action="store_true", help="Re-index every changed file"
+    )
+    parser.add_argument(
+        "--render",
+        choices=["index", "sidecar"],
+        default=None,
+        help="Render backlinks into _index.md or into backlinks/{ID}.md files",
+    )
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    if not (args.entry_id or args.refresh or args.refresh_all or args.render):
+        parser.error("give an ID to query, --refresh, --refresh-all or --render")
+
+    if args.refresh or args.refresh_all:
+        paths = None if args.refresh_all else [Path(p) for p in args.refresh]
+        missing = [p for p in paths or [] if not p.is_file()]
+        if missing:
+            print(f"Error: file not found: {missing[0]}", file=sys.stderr)
+            return 1
+        reparsed, removed = link_index.refresh(paths)
+        print(f"Link index refreshed: {reparsed} re-parsed, {removed} removed.")
+
+    if args.render == "index":
+        if not vault.INDEX_PATH.exists():
+            print("Error: _index.md not found", file=sys.stderr)
+            return 1
+        count = render_index()
+        print(f"Rendered backlinks for {count} entries into _index.md.")
+    elif args.render == "sidecar":
+        written, removed = render_sidecars()
+        print(f"Sidecars: {written} written, {removed} removed in {SIDECAR_DIR_NAME}/.")
+
+    if args.entry_id:
+        conn = link_index.connect()
+        rows = link_index.backlinks(conn, args.entry_id)
+        conn.close()
+        if not rows:
+            print(f"No backlinks to {args.entry_id}.")
+        for src, kind in rows:
+            print(f"{src}\t{kind}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""Build compact, size-budgeted context packs for doers and connectors.
+
+A question pack (context/{Q-ID}.md) holds:
+- the question and its parent chain
+- the notes that already answer it
+- the best-matching passages from docs/
+- the most similar existing notes, with their IDs
+
+A connector pack (context/batch-{hash}.md) holds the body of each
+assigned note. Under each note it lists its unlinked related notes, with
+snippets.
+
+The expensive parts are shared and cached under .ralph/:
+- docs/ is split into passages in a TF-IDF store. Only documents whose
+  size/mtime and hash changed are re-split.
+- The notes TF-IDF store is the one suggest_links.py uses.
+All requested packs are scored with one sparse product per store. A pack
+whose inputs have not changed since it was written is left alone.
+
+Usage:
+    python scripts/build_context.py Q-20260227-051858-705
+    python scripts/build_context.py Q-... Q-... --budget 8000
+    python scripts/build_context.py --open                  # every open question
+    python scripts/build_context.py --batch notes/NOTE-....md notes/NOTE-....md
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import link_index  # noqa: E402
+import suggest_links  # noqa: E402
+import vault  # noqa: E402
+from manifest import open_fresh  # noqa: E402
+from models import parse_frontmatter  # noqa: E402
+from tfidf import TfidfStore  # noqa: E402
+
+DEFAULT_BUDGET = 12_000  # characters per pack
+PASSAGE_CHARS = 900
+SNIPPET_CHARS = 240
+DOC_SUFFIXES = (".md", ".txt")
+
+_HEADING_RE = re.compile(r"^#{1,6}\s+(.+?)\s*#*\s*$")
+_FINGERPRINT_RE = re.compile(r"^<!-- context: ([0-9a-f]+) -->")
+_FRONTMATTER_RE = re.compile(r"^---\n.+?\n---\n?", re.DOTALL)
+
+
+# ── Passages ─────────────────────────────────────────────────────────
+
+
+def split_passages(text: str) -> list[tuple[int, int, str]]:
+    """Split a document into (start, end, heading) spans of about PASSAGE_CHARS.
+
+    Paragraphs are never split. Consecutive paragraphs under the same
+    heading are merged until the span would exceed PASSAGE_CHARS.
+    """
+    spans: list[tuple[int, int, str]] = []
+    heading = ""
+    start = end = None
+    pos = 0
+    for block in re.split(r"(\n\s*\n)", text):
+        block_start, pos = pos, pos + len(block)
+        stripped = block.strip()
+        if not stripped or stripped.startswith("<!-- source:"):
+            continue
+        match = _HEADING_RE.match(stripped.splitlines()[0])
+        new_heading = match.group(1) if match else heading
+        if start is not None and (
+            new_heading != heading or block_start + len(block) - start > PASSAGE_CHARS
+        ):
+            spans.append((start, end, heading))
+            start = None
+        heading = new_heading
+        if start is None:
+            start = block_start
+        end = block_start + len(block)
+    if start is not None:
+        spans.append((start, end, heading))
+    return spans
+
+
+def _doc_files() -> list[Path]:
+    if not vault.DOCS_DIR.exists():
+        return []
+    return sorted(
+        p
+        for p in vault.DOCS_DIR.rglob("*")
+        if p.suffix in DOC_SUFFIXES and p.is_file() and not p.name.startswith(".")
+    )
+
+
+def load_passage_store() -> tuple[TfidfStore, dict[str, dict]]:
+    """Bring the docs passage store up to date. Returns (store, span cache)."""
+    cache_path = vault.STATE_DIR / "passages.json"
+    try:
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cache = {}
+
+    fresh: dict[str, dict] = {}
+    texts: dict[str, str] = {}
+    for path in _doc_files():
+        rel = path.relative_to(vault.ROOT).as_posix()
+        st = path.stat()
+        entry = cache.get(rel)
+        if (
+            entry
+            and entry["size"] == st.st_size
+            and entry["mtime_ns"] == st.st_mtime_ns
+        ):
+            fresh[rel] = entry
+            continue
+        digest = vault.file_digest(path)
+        if entry and entry["sha256"] == digest:
+            fresh[rel] = {**entry, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            continue
+        texts[rel] = path.read_text(encoding="utf-8", errors="replace")
+        fresh[rel] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": digest,
+            "spans": split_passages(texts[rel]),
+        }
+
+    current = {
+        f"{rel}#{i}": f"{entry['sha256']}:{i}"
+        for rel, entry in fresh.items()
+        for i in range(len(entry["spans"]))
+    }
+    store = TfidfStore("passages")
+    changed, dropped = store.stale(current)
+    if changed or dropped:
+        docs = {}
+        for key in changed:
+            rel, i = key.rsplit("#", 1)
+            if rel not in texts:
+                texts[rel] = (vault.ROOT / rel).read_text(
+                    encoding="utf-8", errors="replace"
+                )
+            start, end, heading = fresh[rel]["spans"][int(i)]
+            docs[key] = (current[key], f"{heading} {texts[rel][start:end]}")
+        store.update(docs, dropped)
+        store.save()
+    if fresh != cache:
+        vault.STATE_DIR.mkdir(parents=True, exist_ok=True)
+        vault.atomic_write(cache_path, json.dumps(fresh))
+    return store, fresh
+
+
+def passage_text(
+    key: str, spans: dict[str, dict], texts: dict[str, str]
+) -> tuple[str, str]:
+    """Return (heading, text) of a passage key like docs/a.md#3."""
+    rel, i = key.rsplit("#", 1)
+    if rel not in texts:
+        texts[rel] = (vault.ROOT / rel).read_text(encoding="utf-8", errors="replace")
+    start, end, heading = spans[rel]["spans"][int(i)]
+    return heading, texts[rel][start:end].strip()
+
+
+# ── Pack assembly ────────────────────────────────────────────────────
+
+
+def _store_fingerprint(store: TfidfStore) -> str:
+    h = hashlib.sha256()
+    for key, digest in sorted(zip(store.keys, store.digests)):
+        h.update(f"{key}\0{digest}\n".encode())
+    return h.hexdigest()
+
+
+def _read_entry(path: Path | None) -> tuple[dict, str]:
+    """Return (frontmatter, body) of a note or question, or ({}, "")."""
+    if path is None:
+        return {}, ""
+    try:
+        text = path.read_text(encoding="utf-8")
+        return parse_frontmatter(text), _FRONTMATTER_RE.sub("", text, count=1).strip()
+    except (OSError, ValueError):
+        return {}, ""
+
+
+def _snippet(body: str, limit: int = SNIPPET_CHARS) -> str:
+    body = re.sub(r"\n## Related\n.*", "", body, flags=re.DOTALL)
+    flat = " ".join(body.split())
+    return flat if len(flat) <= limit else flat[: limit - 1].rstrip() + "…"
+
+
+def _quote(text: str) -> str:
+    return "\n".join(f"> {line}" if line else ">" for line in text.splitlines())
+
+
+def _parent_chain(conn, entry_id: str) -> list[str]:
+    chain: list[str] = []
+    current = entry_id
+    while True:
+        parents = [
+            dst for dst, kind in link_index.outlinks(conn, current) if kind == "parent"
+        ]
+        if not parents or parents[0] in chain or parents[0] == entry_id:
+            return chain
+        current = parents[0]
+        chain.append(current)
+
+
+class _Pack:
+    """Markdown lines with a running character budget."""
+
+    def __init__(self, budget: int) -> None:
+        self.budget = budget
+        self.lines: list[str] = []
+        self.size = 0
+
+    def add(self, block: str, force: bool = False) -> bool:
+        if not force and self.size + len(block) + 1 > self.budget:
+            return False
+        self.lines.append(block)
+        self.size += len(block) + 1
+        return True
+
+    def text(self, fingerprint: str) -> str:
+        return f"<!-- context: {fingerprint} -->\n" + "\n".join(self.lines) + "\n"
+
+
+def _is_current(out_path: Path, fingerprint: str) -> bool:
+    try:
+        with out_path.open(encoding="utf-8") as fh:
+            match = _FINGERPRINT_RE.match(fh.readline())
+    except OSError:
+        return False
+    return bool(match) and match.group(1) == fingerprint
+
+
+def build_question_packs(
+    question_ids: list[str],
+    budget: int = DEFAULT_BUDGET,
+    k_passages: int = 8,
+    k_notes: int = 8,
+    force: bool = False,
+) -> list[tuple[str, Path, bool]]:
+    """Write context/{Q-ID}.md for each question. Returns [(id, path, rebuilt)]."""
+    note_store, note_paths = suggest_links.load_note_store()
+    passage_store, spans = load_passage_store()
+    shared = _store_fingerprint(note_store) + _store_fingerprint(passage_store)
+
+    conn = link_index.connect()
+    index = open_fresh()
+    vault.CONTEXT_DIR.mkdir(exist_ok=True)
+
+    results: list[tuple[str, Path, bool]] = []
+    todo = []
+    for qid in question_ids:
+        path = link_index.path_of(conn, qid)
+        if path is None:
+            raise ValueError(f"not a registered question: {qid}")
+        chain = _parent_chain(conn, qid)
+        answers = sorted(
+            src for src, kind in link_index.backlinks(conn, qid) if kind == "answers"
+        )
+        record = index.lookup(qid) if index is not None else None
+        status = record.status if record is not None else ""
+        chain_paths = [link_index.path_of(conn, c) for c in chain]
+        digests = [vault.file_digest(p) for p in (path, *chain_paths) if p is not None]
+        fingerprint = hashlib.sha256(
+            json.dumps(
+                [shared, digests, answers, status, budget, k_passages, k_notes]
+            ).encode()
+        ).hexdigest()[:16]
+        out_path = vault.CONTEXT_DIR / f"{qid}.md"
+        if not force and _is_current(out_path, fingerprint):
+            results.append((qid, out_path, False))
+            continue
+        fm, _ = _read_entry(path)
+        parents = [(c, _read_entry(p)[0]) for c, p in zip(chain, chain_paths)]
+        todo.append((qid, out_path, fingerprint, fm, status, parents, answers))
+    if index is not None:
+        index.close()
+
+    if todo:
+        queries = [
+            " ".join(
+                [
+                    str(fm.get("question", "")),
+                    *(str(p.get("question", "")) for _, p in parents[:1]),
+                ]
+            )
+            for _, _, _, fm, _, parents, _ in todo
+        ]
+        passage_hits = passage_store.top_k(passage_store.vectorize(queries), k_passages)
+        note_hits = note_store.top_k(
+            note_store.vectorize(queries),
+            k_notes,
+            [set(item[6]) for item in todo],
+        )
+        texts: dict[str, str] = {}
+        for item, passages, notes in zip(todo, passage_hits, note_hits):
+            qid, out_path, fingerprint, fm, status, parents, answers = item
+            pack = _Pack(budget)
+            pack.add(f"# Context for {qid}\n", force=True)
+            pack.add("## Question\n", force=True)
+            pack.add(
+                f"**{qid}** ({status or 'open'}): {fm.get('question', '')}", force=True
+            )
+            for depth, (pid, pfm) in enumerate(parents):
+                pack.add(
+                    f"{'  ' * depth}- parent {pid}: {pfm.get('question', '')}",
+                    force=True,
+                )
+            if answers:
+                pack.add("\n## Existing answers\n")
+                for nid in answers:
+                    nfm, _ = _read_entry(note_paths.get(nid))
+                    pack.add(f"- [[{nid}]] {nfm.get('title', '')}")
+
+            # Passages get most of the budget; related notes the rest.
+            passage_budget = pack.size + (budget - pack.size) * 2 // 3
+            if passages:
+                pack.add("\n## Source passages\n")
+            for key, score in passages:
+                heading, text = passage_text(key, spans, texts)
+                rel = key.rsplit("#", 1)[0]
+                title = f"{rel} — {heading}" if heading else rel
+                block = f"### {title} ({score:.2f})\n{_quote(text)}\n"
+                if pack.size + len(block) > passage_budget:
+                    break
+                pack.add(block)
+            if notes:
+                pack.add("\n## Related notes\n")
+            for nid, score in notes:
+                nfm, body = _read_entry(note_paths.get(nid))
+                title = nfm.get("title", "")
+                if not pack.add(f"- [[{nid}]] {title} ({score:.2f}): {_snippet(body)}"):
+                    break
+            vault.atomic_write(out_path, pack.text(fingerprint))
+            results.append((qid, out_path, True))
+    conn.close()
+    return results
+
+
+def build_batch_pack(
+    note_ids: list[str], budget: int = DEFAULT_BUDGET, k: int = 5, force: bool = False
+) -> tuple[Path, bool]:
+    """Write one connector pack for a batch of notes. Returns (path, rebuilt)."""
+    store, paths = suggest_links.load_note_store(note_ids)
+    missing = [n for n in note_ids if n not in paths]
+    if missing:
+        raise ValueError(f"not a registered note: {missing[0]}")
+    digests = {n: d for n, d in zip(store.keys, store.digests)}
+    name = hashlib.sha256("\n".join(sorted(note_ids)).encode()).hexdigest()[:10]
+    out_path = vault.CONTEXT_DIR / f"batch-{name}.md"
+    fingerprint = hashlib.sha256(
+        json.dumps(
+            [_store_fingerprint(store), [digests.get(n) for n in note_ids], budget, k]
+        ).encode()
+    ).hexdigest()[:16]
+    if not force and _is_current(out_path, fingerprint):
+        return out_path, False
+
+    suggestions = suggest_links.suggest(note_ids, k, store)
+    vault.CONTEXT_DIR.mkdir(exist_ok=True)
+    pack = _Pack(budget)
+    pack.add("# Connector batch\n", force=True)
+    # Each assigned note gets an equal share of the budget.
+    share = max((budget - pack.size) // max(len(note_ids), 1), SNIPPET_CHARS * 2)
+    for nid in note_ids:
+        fm, body = _read_entry(paths[nid])
+        start = pack.size
+        pack.add(f"## [[{nid}]] {fm.get('title', '')}\n", force=True)
+        pack.add(_snippet(body, share // 2) + "\n", force=True)
+        pack.add("Unlinked related notes:")
+        for cand, score in suggestions[nid]:
+            cfm, cbody = _read_entry(paths.get(cand))
+            line = (
+                f"- [[{cand}]] {cfm.get('title', '')} ({score:.2f}): {_snippet(cbody)}"
+            )
+            if pack.size - start + len(line) > share or not pack.add(line):
+                break
+        pack.add("")
+    vault.atomic_write(out_path, pack.text(fingerprint))
+    return out_path, True
+
+
+# ── CLI ──────────────────────────────────────────────────────────────
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Build size-budgeted context packs in context/."
+    )
+    parser.add_argument(
+        "ids", nargs="*", help="Question IDs (or note IDs/paths with --batch)"
+    )
+    parser.add_argument(
+        "--open", action="store_true", help="Build packs for every open question"
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Build one connector pack for the given notes",
+    )
+    parser.add_argument(
+        "--budget",
+        type=int,
+        default=DEFAULT_BUDGET,
+        help=f"Characters per pack (default: {DEFAULT_BUDGET})",
+    )
+    parser.add_argument(
+        "--k", type=int, default=8, help="Passages and related notes per pack"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Rebuild even if up to date"
+    )
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    try:
+        if args.batch:
+            if not args.ids:
+                parser.error("--batch needs note IDs or paths")
+            path, rebuilt = build_batch_pack(
+                [Path(n).stem for n in args.ids], args.budget, args.k, args.force
+            )
+            print(path.relative_to(vault.ROOT))
+            return 0
+
+        ids = list(dict.fromkeys(Path(i).stem for i in args.ids))
+        if args.open:
+            index = open_fresh()
+            if index is not None:
+                with index:
+                    ids += [q for q in index.ids("question", "open") if q not in ids]
+        if not ids:
+            parser.error("give question IDs, --open or --batch")
+        results = build_question_packs(ids, args.budget, args.k, args.k, args.force)
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    for _, path, rebuilt in results:
+        print(f"{path.relative_to(vault.ROOT)}{'' if rebuilt else ' (unchanged)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,11 +27,10 @@ from pathlib import Path
 from pydantic import ValidationError
 
 sys.path.insert(0, str(Path(__file__).parent))
+import vault  # noqa: E402
 from models import NoteFrontmatter  # noqa: E402
 from update_index import process_file  # noqa: E402
 
-WORKSPACE = Path(__file__).resolve().parent.parent
-
 
 def build_frontmatter(title: str, answers: str, source: str, tags: list[str]) -> str:
     tags_inline = "[" + ", ".join(tags) + "]"
@@ -82,7 +81,8 @@ def main() -> int:
         metavar="NOTE-ID[:description]",
         help="Related note ID with optional description (repeatable)",
     )
-    args = parser.parse_args()
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
 
     tags = [t.strip() for t in args.tags.split(",") if t.strip()]
 
@@ -106,7 +106,7 @@ def main() -> int:
 
     content = f"{frontmatter}\n\n{body}{related_section}\n"
 
-    notes_dir = WORKSPACE / "notes"
+    notes_dir = vault.NOTES_DIR
     notes_dir.mkdir(parents=True, exist_ok=True)
     file_path = notes_dir / f"temp-{uuid.uuid4().hex[:8]}.md"
     file_path.write_text(content, encoding="utf-8")
@@ -19,10 +19,9 @@ from pathlib import Path
 from pydantic import ValidationError
 
 sys.path.insert(0, str(Path(__file__).parent))
+import vault  # noqa: E402
 from models import QuestionFrontmatter  # noqa: E402
 
-WORKSPACE = Path(__file__).resolve().parent.parent
-
 
 def build_frontmatter(question: str, parent: str | None) -> str:
     lines = [
@@ -52,7 +51,8 @@ def main() -> int:
         default=None,
         help="Parent question ID (Q-YYYYMMDD-HHMMSS-mmm)",
     )
-    args = parser.parse_args()
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
 
     try:
         QuestionFrontmatter(
@@ -71,7 +71,7 @@ def main() -> int:
     frontmatter = build_frontmatter(args.question, args.parent)
     content = f"{frontmatter}\n"
 
-    questions_dir = WORKSPACE / "notes" / "questions"
+    questions_dir = vault.QUESTIONS_DIR
     questions_dir.mkdir(parents=True, exist_ok=True)
     file_path = questions_dir / f"temp-{uuid.uuid4().hex[:8]}.md"
     file_path.write_text(content, encoding="utf-8")
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""Export the vault as a JSON graph and a static HTML site.
+
+Writes to export/ (or --out):
+
+    graph.json     every note and question with its metadata, plus every
+                   resolved link/answers/parent edge
+    index.html     questions (with status) and notes
+    {ID}.html      one page per entry: rendered body with wikilinks
+                   resolved to titles, its parent/answers links, and
+                   backlinks
+    style.css
+
+Exports are incremental. Metadata is re-read only for files whose hash
+changed in the link index. A page is re-rendered only when its
+fingerprint changes. The fingerprint covers the file's hash, the titles
+of everything it links to, and its backlinks. Files written by the
+previous export that this one does not produce are removed, including a
+whole earlier export when --out changes. Parsing and rendering run across
+a process pool when there is enough work.
+
+Usage:
+    python scripts/export.py
+    python scripts/export.py --out site/ --workers 8
+    python scripts/export.py --force          # re-render every page
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import html
+import json
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import link_index  # noqa: E402
+import vault  # noqa: E402
+from models import parse_frontmatter  # noqa: E402
+
+# Bump when the page template changes so every page is re-rendered.
+EXPORT_VERSION = 1
+PARALLEL_THRESHOLD = 64
+
+_FRONTMATTER_RE = re.compile(r"^---\n.+?\n---\n?", re.DOTALL)
+_WIKILINK_RE = re.compile(r"\[\[((?:NOTE|Q)-\d{8}-\d{6}-\d{3})\]\]")
+_CODE_RE = re.compile(r"`([^`]+)`")
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_ITALIC_RE = re.compile(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?![*\w])")
+_LINK_RE = re.compile(r"\[([^\]]+)\]\(((?:https?://|\.{0,2}/)[^)\s]+)\)")
+_LIST_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(.*)$")
+_ORDERED_RE = re.compile(r"^\s*\d+[.)]\s")
+
+STYLE = """\
+body { font: 16px/1.55 system-ui, sans-serif; max-width: 46rem; margin: 2rem auto; padding: 0 1rem; color: #222; }
+a { color: #0a58ca; text-decoration: none; } a:hover { text-decoration: underline; }
+.meta { color: #666; font-size: 0.9rem; }
+.broken { color: #b02a37; }
+.tag { background: #eef; border-radius: 3px; padding: 0 0.3rem; margin-right: 0.2rem; }
+blockquote { border-left: 3px solid #ccc; margin-left: 0; padding-left: 1rem; color: #555; }
+pre { background: #f6f8fa; padding: 0.75rem; overflow-x: auto; }
+table { border-collapse: collapse; } td, th { border-bottom: 1px solid #ddd; padding: 0.25rem 0.5rem; text-align: left; }
+section { border-top: 1px solid #eee; margin-top: 2rem; }
+"""
+
+
+# ── Markdown ─────────────────────────────────────────────────────────
+
+
+def _inline(text: str, titles: dict[str, str]) -> str:
+    """Render inline Markdown. Wikilinks become links titled by their target."""
+    codes: list[str] = []
+
+    def stash(match: re.Match) -> str:
+        codes.append(f"<code>{html.escape(match.group(1))}</code>")
+        return f"\0{len(codes) - 1}\0"
+
+    out = html.escape(_CODE_RE.sub(stash, text))
+
+    def wikilink(match: re.Match) -> str:
+        target = match.group(1)
+        if target in titles:
+            label = html.escape(titles[target] or target)
+            return f'<a href="{target}.html" title="{target}">{label}</a>'
+        return f'<span class="broken">{target}</span>'
+
+    out = _WIKILINK_RE.sub(wikilink, out)
+    out = _LINK_RE.sub(lambda m: f'<a href="{m.group(2)}">{m.group(1)}</a>', out)
+    out = _BOLD_RE.sub(r"<strong>\1</strong>", out)
+    out = _ITALIC_RE.sub(r"<em>\1</em>", out)
+    return re.sub(r"\0(\d+)\0", lambda m: codes[int(m.group(1))], out)
+
+
+def render_markdown(text: str, titles: dict[str, str]) -> str:
+    """Render the Markdown subset notes use: headings, paragraphs, lists,
+    quotes, fenced code and $$ math blocks (passed through for MathJax)."""
+    out: list[str] = []
+    para: list[str] = []
+    items: list[str] = []
+    ordered = False
+    lines = text.splitlines()
+
+    def flush() -> None:
+        nonlocal items
+        if para:
+            out.append(f"<p>{_inline(' '.join(para), titles)}</p>")
+            para.clear()
+        if items:
+            tag = "ol" if ordered else "ul"
+            body = "".join(f"<li>{_inline(i, titles)}</li>" for i in items)
+            out.append(f"<{tag}>{body}</{tag}>")
+            items = []
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if stripped.startswith("```") or stripped == "$$":
+            flush()
+            fence = "```" if stripped.startswith("```") else "$$"
+            block = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith(fence):
+                block.append(lines[i])
+                i += 1
+            content = html.escape("\n".join(block))
+            out.append(
+                f"<pre><code>{content}</code></pre>"
+                if fence == "```"
+                else f"<p>$${content}$$</p>"
+            )
+        elif not stripped:
+            flush()
+        elif stripped.startswith("#"):
+            flush()
+            level = min(len(stripped) - len(stripped.lstrip("#")) + 1, 6)
+            out.append(
+                f"<h{level}>{_inline(stripped.lstrip('#').strip(), titles)}</h{level}>"
+            )
+        elif stripped.startswith(">"):
+            flush()
+            quote = []
+            while i < len(lines) and lines[i].strip().startswith(">"):
+                quote.append(lines[i].strip()[1:].strip())
+                i += 1
+            inner = render_markdown("\n".join(quote), titles)
+            out.append(f"<blockquote>{inner}</blockquote>")
+            continue
+        elif _LIST_RE.match(line):
+            if para:
+                flush()
+            if not items:
+                ordered = bool(_ORDERED_RE.match(line))
+            items.append(_LIST_RE.match(line).group(1))
+        elif items and line[:1].isspace():
+            items[-1] += " " + stripped
+        else:
+            if items:
+                flush()
+            para.append(stripped)
+        i += 1
+    flush()
+    return "\n".join(out)
+
+
+# ── Workers ──────────────────────────────────────────────────────────
+
+
+def _meta_job(path: str) -> dict:
+    """Read the frontmatter fields the export needs from one file."""
+    try:
+        fm = parse_frontmatter(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {
+        "title": str(fm.get("title") or fm.get("question") or ""),
+        "tags": [str(t) for t in fm.get("tags") or []],
+        "source": str(fm.get("source") or ""),
+        "created": str(fm.get("created") or ""),
+    }
+
+
+def _page_html(page: dict, body: str) -> str:
+    titles = page["titles"]
+
+    def link(entry_id: str) -> str:
+        title = html.escape(titles.get(entry_id) or entry_id)
+        return f'<a href="{entry_id}.html">{title}</a>'
+
+    def link_list(heading: str, ids: list[str]) -> str:
+        if not ids:
+            return ""
+        rows = "".join(f"<li>{link(i)}</li>" for i in ids)
+        return f"<section><h2>{heading}</h2><ul>{rows}</ul></section>"
+
+    meta = [page["id"], page["type"]]
+    if page["type"] == "question":
+        meta.append("answered" if page["answered_by"] else "open")
+    if page["source"]:
+        meta.append(html.escape(page["source"]))
+    if page["created"]:
+        meta.append(html.escape(page["created"]))
+    tags = "".join(f'<span class="tag">{html.escape(t)}</span>' for t in page["tags"])
+    if tags:
+        tags = f"<p>{tags}</p>"
+    up = "".join(f"<p>{label}: {link(i)}</p>" for label, i in page["up"] if i in titles)
+    title = html.escape(page["title"] or page["id"])
+    return (
+        '<!doctype html>\n<html><head><meta charset="utf-8">'
+        f'<title>{title}</title><link rel="stylesheet" href="style.css"></head>\n'
+        f'<body><nav><a href="index.html">Index</a></nav>\n<article><h1>{title}</h1>\n'
+        f"<p class=\"meta\">{' · '.join(meta)}</p>{tags}{up}\n{body}\n</article>\n"
+        + link_list("Answered by", page["answered_by"])
+        + link_list("Sub-questions", page["children"])
+        + link_list("Backlinks", page["backlinks"])
+        + "\n</body></html>\n"
+    )
+
+
+def _render_job(job: tuple[str, str, dict]) -> None:
+    src, out, page = job
+    text = Path(src).read_text(encoding="utf-8")
+    body = _FRONTMATTER_RE.sub("", text, count=1)
+    if page["type"] == "note":
+        # The title is already the page heading.
+        body = re.sub(r"^\s*#\s+.*\n", "", body, count=1)
+    vault.atomic_write(
+        Path(out), _page_html(page, render_markdown(body, page["titles"]))
+    )
+
+
+def _run(fn, jobs: list, workers: int | None) -> list:
+    if len(jobs) < PARALLEL_THRESHOLD or workers == 1:
+        return [fn(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, jobs, chunksize=64))
+
+
+# ── Export ───────────────────────────────────────────────────────────
+
+
+def _write_if_changed(path: Path, text: str) -> None:
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return
+    except OSError:
+        pass
+    vault.atomic_write(path, text)
+
+
+def _index_html(nodes: dict[str, dict], answered: set[str]) -> str:
+    def rows(entry_type: str) -> str:
+        out = []
+        for entry_id in sorted(nodes):
+            node = nodes[entry_id]
+            if node["type"] != entry_type:
+                continue
+            extra = (
+                ("answered" if entry_id in answered else "open")
+                if entry_type == "question"
+                else html.escape(node["source"])
+            )
+            title = html.escape(node["title"] or entry_id)
+            out.append(
+                f'<tr><td><a href="{entry_id}.html">{title}</a></td>'
+                f"<td>{extra}</td></tr>"
+            )
+        return "\n".join(out)
+
+    return (
+        '<!doctype html>\n<html><head><meta charset="utf-8">'
+        "<title>Research Index</title>"
+        '<link rel="stylesheet" href="style.css"></head>\n'
+        "<body><h1>Research Index</h1>\n"
+        "<h2>Questions</h2><table><tr><th>Question</th><th>Status</th></tr>\n"
+        f"{rows('question')}</table>\n"
+        "<h2>Notes</h2><table><tr><th>Note</th><th>Source</th></tr>\n"
+        f"{rows('note')}</table>\n"
+        "</body></html>\n"
+    )
+
+
+def _outputs(out_dir: Path, pages: dict[str, str]) -> set[Path]:
+    """Every file an export with these pages writes into out_dir."""
+    return {out_dir / f"{entry_id}.html" for entry_id in pages} | {
+        out_dir / name for name in ("graph.json", "index.html", "style.css")
+    }
+
+
+def export(
+    out_dir: Path, workers: int | None = None, force: bool = False
+) -> tuple[int, int, int]:
+    """Export the vault to out_dir. Returns (rendered, unchanged, removed)."""
+    link_index.refresh()
+    conn = link_index.connect()
+    files = {
+        entry_id: (vault.ROOT / rel, entry_type, digest)
+        for entry_id, rel, entry_type, digest in conn.execute(
+            "SELECT id, path, type, sha256 FROM link_files"
+        )
+    }
+    edges = [
+        (src, dst, kind)
+        for src, dst, kind in conn.execute(
+            "SELECT src, dst, kind FROM links ORDER BY src, dst, kind"
+        )
+        if dst in files
+    ]
+    conn.close()
+
+    state_path = vault.STATE_DIR / "export.json"
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        state = {}
+    previous = _outputs(Path(state["out"]), state["pages"]) if "out" in state else set()
+    if (
+        state.get("out") != str(out_dir.resolve())
+        or state.get("version") != EXPORT_VERSION
+    ):
+        state = {"meta": state.get("meta", {}), "pages": {}}
+    cached_meta: dict[str, dict] = state["meta"]
+
+    # Metadata: only files whose hash changed are parsed.
+    stale = [
+        i
+        for i, (_, _, digest) in files.items()
+        if cached_meta.get(i, {}).get("sha256") != digest
+    ]
+    for entry_id, meta in zip(
+        stale, _run(_meta_job, [str(files[i][0]) for i in stale], workers)
+    ):
+        cached_meta[entry_id] = {**meta, "sha256": files[entry_id][2]}
+    meta = {i: cached_meta[i] for i in files}
+
+    nodes = {
+        i: {
+            "id": i,
+            "type": files[i][1],
+            "title": meta[i].get("title", ""),
+            "tags": meta[i].get("tags", []),
+            "source": meta[i].get("source", ""),
+            "created": meta[i].get("created", ""),
+            "path": files[i][0].relative_to(vault.ROOT).as_posix(),
+        }
+        for i in sorted(files)
+    }
+    outgoing: dict[str, list[tuple[str, str]]] = {}
+    incoming: dict[str, list[tuple[str, str]]] = {}
+    for src, dst, kind in edges:
+        outgoing.setdefault(src, []).append((dst, kind))
+        incoming.setdefault(dst, []).append((src, kind))
+    answered = {dst for _, dst, kind in edges if kind == "answers"}
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    old_pages: dict[str, str] = state["pages"]
+    pages: dict[str, str] = {}
+    jobs = []
+    for entry_id, node in nodes.items():
+        outs = outgoing.get(entry_id, [])
+        ins = incoming.get(entry_id, [])
+        neighbours = sorted({d for d, _ in outs} | {s for s, _ in ins})
+        titles = {n: nodes[n]["title"] for n in neighbours}
+        page = {
+            **node,
+            "titles": titles,
+            "up": [(kind.capitalize(), dst) for dst, kind in outs if kind != "link"],
+            "answered_by": sorted(s for s, k in ins if k == "answers"),
+            "children": sorted(s for s, k in ins if k == "parent"),
+            "backlinks": sorted({s for s, k in ins if k == "link"}),
+        }
+        fingerprint = hashlib.sha256(
+            json.dumps([files[entry_id][2], page], sort_keys=True).encode()
+        ).hexdigest()[:20]
+        pages[entry_id] = fingerprint
+        out_path = out_dir / f"{entry_id}.html"
+        if force or old_pages.get(entry_id) != fingerprint or not out_path.exists():
+            jobs.append((str(files[entry_id][0]), str(out_path), page))
+    _run(_render_job, jobs, workers)
+
+    graph = {
+        "nodes": list(nodes.values()),
+        "edges": [{"src": s, "dst": d, "kind": k} for s, d, k in edges],
+    }
+    _write_if_changed(out_dir / "graph.json", json.dumps(graph, indent=1))
+    _write_if_changed(out_dir / "index.html", _index_html(nodes, answered))
+    _write_if_changed(out_dir / "style.css", STYLE)
+
+    removed = 0
+    for path in previous - _outputs(out_dir.resolve(), pages):
+        if path.exists():
+            path.unlink()
+            removed += 1
+
+    vault.STATE_DIR.mkdir(parents=True, exist_ok=True)
+    vault.atomic_write(
+        state_path,
+        json.dumps(
+            {
+                "version": EXPORT_VERSION,
+                "out": str(out_dir.resolve()),
+                "meta": meta,
+                "pages": pages,
+            }
+        ),
+    )
+    return len(jobs), len(pages) - len(jobs), removed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Export the vault as graph.json and a static HTML site."
+    )
+    parser.add_argument(
+        "--out", type=Path, default=None, help="Output directory (default: export/)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count)",
+    )
+    parser.add_argument("--force", action="store_true", help="Re-render every page")
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    out_dir = args.out or vault.ROOT / "export"
+    rendered, unchanged, removed = export(out_dir, args.workers, args.force)
+    print(
+        f"Exported to {out_dir}: {rendered} page(s) rendered, "
+        f"{unchanged} unchanged, {removed} removed."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,20 @@
 """Archive current Ralph Note state and reset for a fresh start."""
 
+import argparse
 import shutil
+import sys
 import zipfile
 from datetime import datetime, timezone
 from pathlib import Path
 
-ROOT = Path(__file__).resolve().parent.parent
-NOTES_DIR = ROOT / "notes"
-QUESTIONS_DIR = NOTES_DIR / "questions"
-ARCHIVES_DIR = ROOT / "archives"
+sys.path.insert(0, str(Path(__file__).parent))
+import vault  # noqa: E402
 
+# Relative to the vault root.
 FILES_TO_ARCHIVE = [
-    ROOT / "_index.md",
-    ROOT / "PROGRESS.md",
-    ROOT / "research-questions.md",
+    "_index.md",
+    "PROGRESS.md",
+    "research-questions.md",
 ]
 
 FRESH_INDEX = """\
@@ -70,67 +71,91 @@ def build_archive() -> Path:
     """Create a zip archive of the current notes, index, progress, and questions."""
     now = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     zip_name = f"ralph_notes_archive_{now}.zip"
-    zip_path = ROOT / zip_name
+    zip_path = vault.ROOT / zip_name
 
     with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
         # Archive top-level files
-        for fp in FILES_TO_ARCHIVE:
+        for name in FILES_TO_ARCHIVE:
+            fp = vault.ROOT / name
             if fp.exists():
-                zf.write(fp, fp.relative_to(ROOT))
+                zf.write(fp, name)
 
         # Archive all files in notes/ (including questions/)
-        if NOTES_DIR.exists():
-            for child in sorted(NOTES_DIR.rglob("*")):
+        if vault.NOTES_DIR.exists():
+            for child in sorted(vault.NOTES_DIR.rglob("*")):
                 if child.is_file():
-                    zf.write(child, child.relative_to(ROOT))
+                    zf.write(child, child.relative_to(vault.ROOT))
 
     return zip_path
 
 
+def archives_dir() -> Path:
+    return vault.ROOT / "archives"
+
+
 def move_to_archives(zip_path: Path) -> Path:
     """Move the zip file into the archives directory."""
-    ARCHIVES_DIR.mkdir(parents=True, exist_ok=True)
-    dest = ARCHIVES_DIR / zip_path.name
+    archives_dir().mkdir(parents=True, exist_ok=True)
+    dest = archives_dir() / zip_path.name
     shutil.move(str(zip_path), str(dest))
     return dest
 
 
 def clear_notes():
-    """Delete all files in notes/ and notes/questions/, preserving the directories."""
-    if QUESTIONS_DIR.exists():
-        for f in QUESTIONS_DIR.iterdir():
-            if f.is_file():
+    """Delete all files in notes/ and notes/questions/, preserving the directories.
+
+    Year/month shard directories are removed; the notes/.layout marker is kept
+    so a sharded vault stays sharded.
+    """
+    for directory in (vault.QUESTIONS_DIR, vault.NOTES_DIR):
+        if not directory.exists():
+            continue
+        for f in directory.iterdir():
+            if f.is_file() and f.name != ".layout":
                 f.unlink()
+            elif f.is_dir() and f.name.isdigit():
+                shutil.rmtree(f)
 
-    if NOTES_DIR.exists():
-        for f in NOTES_DIR.iterdir():
-            if f.is_file():
-                f.unlink()
+
+def clear_state():
+    """Delete the derived link index and question-tree rollups (.ralph/state.db).
+
+    Snapshots under .ralph/ are kept.
+    """
+    for suffix in ("", "-wal", "-shm"):
+        vault.STATE_DB.with_name(vault.STATE_DB.name + suffix).unlink(missing_ok=True)
 
 
 def reset_files():
     """Reset _index.md, PROGRESS.md, and research-questions.md to fresh templates."""
-    (ROOT / "_index.md").write_text(FRESH_INDEX, encoding="utf-8")
-    (ROOT / "PROGRESS.md").write_text(FRESH_PROGRESS, encoding="utf-8")
-    (ROOT / "research-questions.md").write_text(
+    vault.INDEX_PATH.write_text(FRESH_INDEX, encoding="utf-8")
+    vault.PROGRESS_PATH.write_text(FRESH_PROGRESS, encoding="utf-8")
+    (vault.ROOT / "research-questions.md").write_text(
         FRESH_RESEARCH_QUESTIONS, encoding="utf-8"
     )
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="Archive the current notes and reset the vault to a fresh start."
+    )
+    vault.add_argument(parser)
+    vault.parse_args(parser)
+
     print("Archiving current state...")
     zip_path = build_archive()
 
-    print(f"Moving archive to {ARCHIVES_DIR / zip_path.name}")
+    print(f"Moving archive to {archives_dir() / zip_path.name}")
     dest = move_to_archives(zip_path)
 
     print("Clearing notes...")
     clear_notes()
+    clear_state()
 
     print("Resetting files to fresh state...")
     reset_files()
 
-    print(f"Done. Archive saved to: {dest.relative_to(ROOT)}")
+    print(f"Done. Archive saved to: {dest.relative_to(vault.ROOT)}")
 
 
 if __name__ == "__main__":
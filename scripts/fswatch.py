@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Minimal directory watchers used by `update_index.py --watch`.
+
+Both watchers cover the given directories and every directory below
+them, including ones created while watching (such as new notes/YYYY/MM/
+shards).
+
+On Linux, inotify is used directly through ctypes (no dependencies): the
+kernel reports each file that is closed after writing or moved into a
+watched directory, so the cost per event is constant.
+
+Everywhere else, and if inotify is unavailable, a polling watcher is used.
+It checks each directory's mtime every interval and only lists a directory
+when that mtime has changed. Files that are created, renamed or removed
+change the directory mtime. In-place edits to existing files do not, so
+the polling watcher can also be given a function listing files to stat
+on every pass.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _walk_dirs(root: Path) -> list[Path]:
+    """Return root and every directory below it."""
+    return [Path(d) for d, _, _ in os.walk(root)]
+
+
+def _walk_files(root: Path) -> list[Path]:
+    return [Path(d) / name for d, _, names in os.walk(root) for name in names]
+
+
+class InotifyWatcher:
+    """Report files written or moved into the watched directories (Linux)."""
+
+    def __init__(self, dirs: list[Path]) -> None:
+        self._libc = ctypes.CDLL(
+            ctypes.util.find_library("c") or "libc.so.6", use_errno=True
+        )
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, Path] = {}
+        try:
+            for root in dirs:
+                for d in _walk_dirs(root):
+                    self._add_watch(d)
+        except OSError:
+            os.close(self._fd)
+            raise
+        self.overflowed = False
+
+    def _add_watch(self, d: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(d), _MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {d}")
+        self._dirs[wd] = d
+
+    def _add_tree(self, root: Path) -> list[Path]:
+        """Watch a new directory tree. Returns the files already inside it."""
+        for d in _walk_dirs(root):
+            try:
+                self._add_watch(d)
+            except OSError:
+                continue  # removed again before it could be watched
+        # Files written before the watch existed raised no event.
+        return _walk_files(root)
+
+    def wait(self, timeout: float | None) -> list[Path]:
+        """Block up to `timeout` seconds (forever if None) and return changed paths."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        changed: list[Path] = []
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size
+                name = buf[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    self.overflowed = True
+                elif name and wd in self._dirs:
+                    path = self._dirs[wd] / os.fsdecode(name)
+                    if mask & _IN_ISDIR:
+                        changed.extend(self._add_tree(path))
+                    elif not mask & _IN_CREATE:
+                        changed.append(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Portable fallback: list a directory only when its mtime changes.
+
+    `files`, if given, returns files to stat on every pass, so in-place
+    edits to them are reported too.
+    """
+
+    def __init__(
+        self,
+        dirs: list[Path],
+        interval: float = 1.0,
+        files: Callable[[], Iterable[Path]] | None = None,
+    ) -> None:
+        self._interval = interval
+        self._state: dict[Path, tuple[int, dict[str, tuple[int, int]]]] = {}
+        for d in dirs:
+            self._add_tree(d)
+        self._files = files
+        self._file_sigs = self._stat_files()
+        self.overflowed = False
+
+    @staticmethod
+    def _scan(d: Path) -> tuple[int, dict[str, tuple[int, int]], list[Path]]:
+        entries, subdirs = {}, []
+        with os.scandir(d) as it:
+            for entry in it:
+                if entry.is_file():
+                    st = entry.stat()
+                    entries[entry.name] = (st.st_mtime_ns, st.st_size)
+                elif entry.is_dir():
+                    subdirs.append(Path(entry.path))
+        return d.stat().st_mtime_ns, entries, subdirs
+
+    def _add_tree(self, root: Path) -> list[Path]:
+        """Start tracking a directory tree. Returns the files inside it."""
+        found: list[Path] = []
+        pending = [root]
+        while pending:
+            d = pending.pop()
+            if d in self._state:
+                continue
+            try:
+                mtime, entries, subdirs = self._scan(d)
+            except OSError:
+                continue
+            self._state[d] = (mtime, entries)
+            found.extend(d / name for name in entries)
+            pending.extend(subdirs)
+        return found
+
+    def _stat_files(self) -> dict[Path, tuple[int, int]]:
+        sigs = {}
+        for path in self._files() if self._files else []:
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            sigs[path] = (st.st_mtime_ns, st.st_size)
+        return sigs
+
+    def wait(self, timeout: float | None) -> list[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed: list[Path] = []
+            for d, (mtime, entries) in list(self._state.items()):
+                try:
+                    if d.stat().st_mtime_ns == mtime:
+                        continue
+                    new_mtime, new_entries, subdirs = self._scan(d)
+                except OSError:
+                    del self._state[d]  # the directory is gone
+                    continue
+                changed.extend(
+                    d / name
+                    for name, sig in new_entries.items()
+                    if entries.get(name) != sig
+                )
+                self._state[d] = (new_mtime, new_entries)
+                for sub in subdirs:
+                    if sub not in self._state:
+                        changed.extend(self._add_tree(sub))
+            if self._files:
+                sigs = self._stat_files()
+                seen = set(changed)
+                changed.extend(
+                    p
+                    for p, sig in sigs.items()
+                    if self._file_sigs.get(p) != sig and p not in seen
+                )
+                self._file_sigs = sigs
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return []
+            sleep = self._interval
+            if deadline is not None:
+                sleep = min(sleep, max(0.0, deadline - time.monotonic()))
+            time.sleep(sleep)
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(
+    dirs: list[Path],
+    poll_interval: float = 1.0,
+    force_polling: bool = False,
+    files: Callable[[], Iterable[Path]] | None = None,
+) -> InotifyWatcher | PollingWatcher:
+    """Return an inotify watcher on Linux, or a polling watcher otherwise.
+
+    `files` is only used by the polling watcher; see PollingWatcher.
+    """
+    if sys.platform.startswith("linux") and not force_polling:
+        try:
+            return InotifyWatcher(dirs)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(dirs, poll_interval, files)
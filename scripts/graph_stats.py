@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Report the structure of the note/question graph.
+
+Loads every edge from the link index in one pass into a compact CSR
+(compressed sparse row) adjacency: nodes are numbered by sorted ID, and
+each node's neighbours are a contiguous slice of one flat integer array.
+All statistics are then simple linear scans over those arrays:
+
+- connected components of the wikilink graph (or, with --edges all, of
+  the graph including `answers` and `parent` edges)
+- orphan notes (no wikilinks in or out)
+- wikilink degree distribution and the highest-degree hub notes
+- question-tree depth from `parent` edges
+
+Usage:
+    python scripts/graph_stats.py
+    python scripts/graph_stats.py --clusters 5     # IDs in the 5 smallest clusters
+    python scripts/graph_stats.py --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import sys
+from array import array
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import link_index  # noqa: E402
+import vault  # noqa: E402
+
+
+class Graph:
+    """Undirected CSR adjacency over every registered note and question."""
+
+    def __init__(
+        self, ids: list[str], types: list[str], edges: list[tuple[int, int]]
+    ) -> None:
+        self.ids = ids
+        self.types = types
+        n = len(ids)
+        degree = array("l", [0]) * n
+        for a, b in edges:
+            degree[a] += 1
+            degree[b] += 1
+        self.indptr = array("l", [0]) * (n + 1)
+        for i in range(n):
+            self.indptr[i + 1] = self.indptr[i] + degree[i]
+        self.indices = array("l", [0]) * self.indptr[n]
+        fill = array("l", self.indptr[:n])
+        for a, b in edges:
+            self.indices[fill[a]] = b
+            fill[a] += 1
+            self.indices[fill[b]] = a
+            fill[b] += 1
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def degree(self, i: int) -> int:
+        return self.indptr[i + 1] - self.indptr[i]
+
+    def components(self, nodes: list[int]) -> list[list[int]]:
+        """Return connected components among `nodes`, largest first."""
+        seen = bytearray(len(self.ids))
+        indptr, indices = self.indptr, self.indices
+        comps: list[list[int]] = []
+        for start in nodes:
+            if seen[start]:
+                continue
+            seen[start] = 1
+            comp = [start]
+            stack = [start]
+            while stack:
+                v = stack.pop()
+                for j in range(indptr[v], indptr[v + 1]):
+                    w = indices[j]
+                    if not seen[w]:
+                        seen[w] = 1
+                        comp.append(w)
+                        stack.append(w)
+            comps.append(comp)
+        comps.sort(key=len, reverse=True)
+        return comps
+
+
+def load_graph() -> tuple[Graph, Graph, dict[int, int], Counter]:
+    """Return (link_graph, full_graph, question_parent, edge_counts) from the link index."""
+    link_index.refresh()
+    conn = link_index.connect()
+    rows = conn.execute("SELECT id, type FROM link_files ORDER BY id").fetchall()
+    ids = [r[0] for r in rows]
+    types = [r[1] for r in rows]
+    pos = {entry_id: i for i, entry_id in enumerate(ids)}
+
+    link_edges: list[tuple[int, int]] = []
+    all_edges: list[tuple[int, int]] = []
+    parent: dict[int, int] = {}
+    counts: Counter = Counter()
+    for src, dst, kind in conn.execute("SELECT src, dst, kind FROM links"):
+        a, b = pos.get(src), pos.get(dst)
+        if a is None or b is None:
+            counts["broken"] += 1
+            continue
+        counts[kind] += 1
+        all_edges.append((a, b))
+        if kind == "link":
+            link_edges.append((a, b))
+        elif kind == "parent":
+            parent[a] = b
+    conn.close()
+    return Graph(ids, types, link_edges), Graph(ids, types, all_edges), parent, counts
+
+
+def question_depths(graph: Graph, parent: dict[int, int]) -> dict[int, int]:
+    """Return depth (roots = 1) for every question, tolerating parent cycles."""
+    depth: dict[int, int] = {}
+    for q in (i for i, t in enumerate(graph.types) if t == "question"):
+        chain = []
+        node = q
+        while node not in depth and node not in chain:
+            chain.append(node)
+            if node not in parent:
+                break
+            node = parent[node]
+        base = depth.get(node, 0) if node not in chain else 0
+        for offset, n in enumerate(reversed(chain), start=1):
+            depth[n] = base + offset
+    return depth
+
+
+def _bucket(d: int) -> str:
+    if d <= 1:
+        return str(d)
+    lo = 1 << (d.bit_length() - 1)
+    return f"{lo}-{2 * lo - 1}"
+
+
+def compute_stats(edges: str = "link", hubs: int = 10) -> dict:
+    link_graph, full_graph, parent, counts = load_graph()
+    graph = link_graph if edges == "link" else full_graph
+    notes = [i for i, t in enumerate(graph.types) if t == "note"]
+    note_set = set(notes)
+    component_nodes = notes if edges == "link" else list(range(len(graph)))
+    comps = graph.components(component_nodes)
+
+    orphans = [link_graph.ids[i] for i in notes if link_graph.degree(i) == 0]
+    dist = Counter(_bucket(link_graph.degree(i)) for i in notes)
+    top = heapq.nlargest(hubs, notes, key=lambda i: (link_graph.degree(i), -i))
+    depths = question_depths(full_graph, parent)
+    # Clusters are handed to connectors as notes to link, so with --edges
+    # all the questions in a component are left out.
+    clusters = [[graph.ids[i] for i in sorted(c) if i in note_set] for c in comps]
+
+    return {
+        "notes": len(notes),
+        "questions": sum(1 for t in graph.types if t == "question"),
+        "edges": dict(counts),
+        "component_edges": edges,
+        "components": len(comps),
+        "largest_component": len(comps[0]) if comps else 0,
+        "singletons": sum(1 for c in comps if len(c) == 1),
+        "clusters": sorted((c for c in clusters if c), key=len, reverse=True),
+        "orphans": orphans,
+        "degree_distribution": dict(
+            sorted(dist.items(), key=lambda kv: int(kv[0].split("-")[0]))
+        ),
+        "hubs": [(link_graph.ids[i], link_graph.degree(i)) for i in top],
+        "question_max_depth": max(depths.values(), default=0),
+        "question_depths": dict(sorted(Counter(depths.values()).items())),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Report structure of the note/question graph."
+    )
+    parser.add_argument(
+        "--edges",
+        choices=["link", "all"],
+        default="link",
+        help="Edges used for components: wikilinks between notes (default) "
+        "or all edges including answers/parent",
+    )
+    parser.add_argument("--hubs", type=int, default=10, help="Number of hubs to list")
+    parser.add_argument(
+        "--clusters",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Print the note IDs of the N smallest clusters outside the largest one",
+    )
+    parser.add_argument("--json", action="store_true", help="Emit JSON")
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    stats = compute_stats(args.edges, args.hubs)
+    isolated = stats["clusters"][1:][::-1][: args.clusters] if args.clusters else []
+
+    if args.json:
+        if not args.clusters:
+            stats.pop("clusters")
+        else:
+            stats["clusters"] = isolated
+        print(json.dumps(stats, indent=2))
+        return 0
+
+    if args.clusters:
+        for cluster in isolated:
+            print(" ".join(cluster))
+        return 0
+
+    print(f"Notes: {stats['notes']}  Questions: {stats['questions']}")
+    print("Edges: " + ", ".join(f"{k} {v}" for k, v in sorted(stats["edges"].items())))
+    print(
+        f"Components ({stats['component_edges']} edges): {stats['components']} "
+        f"(largest {stats['largest_component']}, {stats['singletons']} singleton(s))"
+    )
+    print(f"Orphan notes: {len(stats['orphans'])}")
+    print(
+        "Degree distribution: "
+        + ", ".join(f"{k}: {v}" for k, v in stats["degree_distribution"].items())
+    )
+    print(
+        f"Question tree: max depth {stats['question_max_depth']} ("
+        + ", ".join(f"depth {k}: {v}" for k, v in stats["question_depths"].items())
+        + ")"
+    )
+    print("Hubs:")
+    for entry_id, degree in stats["hubs"]:
+        print(f"  {entry_id}  {degree}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""Convert non-Markdown source files into Markdown documents in docs/.
+
+Reads everything under sources/ and writes one Markdown file per source
+into docs/, mirroring the directory structure. Conversion uses only the
+standard library, so nothing leaves the machine:
+
+- .html / .htm   headings, paragraphs, lists, links, code blocks, emphasis
+- .docx          paragraphs, heading styles, list items and tables
+- .csv / .tsv    a Markdown table
+- .txt / .md     copied through
+
+Files are processed in parallel across a process pool and streamed, so
+large inputs are never loaded whole. A source whose size and mtime are
+unchanged since the last run is skipped without being read. If only its
+mtime changed, its content hash is compared before converting. Every
+generated document starts with a `<!-- source: ... -->` comment, and
+docs/.sources.json maps each generated docs/ file back to its original,
+so a note's `source: docs/...` field can always be traced to the real
+input file.
+
+A docs/ file that ingest.py did not generate is never overwritten. A
+generated document is deleted only once its source is gone; if a source
+fails to reconvert, its last good document is kept.
+
+Usage:
+    python scripts/ingest.py
+    python scripts/ingest.py --sources path/to/corpus --workers 8
+    python scripts/ingest.py --force      # reconvert everything
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import re
+import sys
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import TextIO
+from xml.etree.ElementTree import iterparse
+
+sys.path.insert(0, str(Path(__file__).parent))
+import vault  # noqa: E402
+
+_CHUNK = 1 << 16
+
+
+def _manifest_path() -> Path:
+    return vault.DOCS_DIR / ".sources.json"
+
+
+def _cache_path() -> Path:
+    return vault.STATE_DIR / "ingest.json"
+
+
+# ── Converters ───────────────────────────────────────────────────────
+
+
+class _HtmlToMarkdown(HTMLParser):
+    """Streaming HTML → Markdown converter; feed() chunks, output goes to `out`."""
+
+    _BLOCKS = {"p", "div", "section", "article", "blockquote", "table"}
+    _SKIP = {"script", "style", "head", "noscript", "svg"}
+
+    def __init__(self, out: TextIO) -> None:
+        super().__init__(convert_charrefs=True)
+        self.out = out
+        self.skip = 0
+        self.pre = 0
+        self.lists: list[str] = []
+        self.href: str | None = None
+        self.line: list[str] = []
+        self.indent = ""
+        self.table_rows = 0
+        self.cells = 0
+
+    def _flush(self, blank: bool = True) -> None:
+        text = re.sub(r"[ \t]+", " ", "".join(self.line)).strip()
+        self.line = []
+        if text:
+            # A nested list item keeps its indent; stray whitespace does not.
+            self.out.write(self.indent + text + ("\n\n" if blank else "\n"))
+        self.indent = ""
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self.skip += 1
+        elif self.skip:
+            return
+        elif re.fullmatch(r"h[1-6]", tag):
+            self._flush()
+            self.line.append("#" * int(tag[1]) + " ")
+        elif tag in ("ul", "ol"):
+            self._flush(blank=not self.lists)
+            self.lists.append(tag)
+        elif tag == "li":
+            self._flush(blank=False)
+            self.indent = "  " * max(len(self.lists) - 1, 0)
+            bullet = "1." if self.lists and self.lists[-1] == "ol" else "-"
+            self.line.append(f"{bullet} ")
+        elif tag == "pre":
+            self._flush()
+            self.out.write("```\n")
+            self.pre += 1
+        elif tag == "br":
+            self._flush(blank=False)
+        elif tag == "table":
+            self._flush()
+            self.out.write("\n")
+            self.table_rows = 0
+        elif tag == "tr":
+            self._flush(blank=False)
+            self.cells = 0
+        elif tag in ("td", "th"):
+            self.line.append("| ")
+            self.cells += 1
+        elif tag in ("strong", "b"):
+            self.line.append("**")
+        elif tag in ("em", "i"):
+            self.line.append("_")
+        elif tag == "code" and not self.pre:
+            self.line.append("`")
+        elif tag == "a":
+            self.href = dict(attrs).get("href")
+            self.line.append("[")
+        elif tag in self._BLOCKS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP:
+            self.skip = max(self.skip - 1, 0)
+        elif self.skip:
+            return
+        elif re.fullmatch(r"h[1-6]", tag) or tag in self._BLOCKS:
+            self._flush()
+            if tag == "table":
+                self.out.write("\n")
+        elif tag in ("td", "th"):
+            self.line.append(" ")
+        elif tag == "tr":
+            self.line.append("|")
+            self._flush(blank=False)
+            if self.table_rows == 0:
+                self.out.write("|" + "---|" * max(self.cells, 1) + "\n")
+            self.table_rows += 1
+        elif tag in ("ul", "ol"):
+            self._flush(blank=len(self.lists) <= 1)
+            if self.lists:
+                self.lists.pop()
+            if not self.lists:
+                self.out.write("\n")
+        elif tag == "li":
+            self._flush(blank=False)
+        elif tag == "pre":
+            self.pre = max(self.pre - 1, 0)
+            self.out.write("\n```\n\n")
+        elif tag in ("strong", "b"):
+            self.line.append("**")
+        elif tag in ("em", "i"):
+            self.line.append("_")
+        elif tag == "code" and not self.pre:
+            self.line.append("`")
+        elif tag == "a":
+            self.line.append(f"]({self.href})" if self.href else "]")
+            self.href = None
+
+    def handle_data(self, data):
+        if self.skip:
+            return
+        if self.pre:
+            self.out.write(data)
+        else:
+            self.line.append(data.replace("\n", " "))
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def convert_html(src: Path, out: TextIO) -> None:
+    parser = _HtmlToMarkdown(out)
+    with src.open(encoding="utf-8", errors="replace") as fh:
+        for chunk in iter(lambda: fh.read(_CHUNK), ""):
+            parser.feed(chunk)
+    parser.close()
+
+
+def convert_text(src: Path, out: TextIO) -> None:
+    with src.open(encoding="utf-8", errors="replace") as fh:
+        for line in fh:
+            out.write(line)
+
+
+def _cell(value: str) -> str:
+    return value.replace("|", "\\|").replace("\n", " ").strip()
+
+
+def convert_csv(src: Path, out: TextIO) -> None:
+    delimiter = "\t" if src.suffix.lower() == ".tsv" else ","
+    with src.open(encoding="utf-8", errors="replace", newline="") as fh:
+        rows = csv.reader(fh, delimiter=delimiter)
+        header = next(rows, None)
+        if not header:
+            return
+        out.write("| " + " | ".join(_cell(c) for c in header) + " |\n")
+        out.write("|" + "---|" * len(header) + "\n")
+        width = len(header)
+        for row in rows:
+            if len(row) > width:
+                # Keep the overflow in the last column so the table stays valid.
+                row = row[: width - 1] + [delimiter.join(row[width - 1 :])]
+            row += [""] * (width - len(row))
+            out.write("| " + " | ".join(_cell(c) for c in row) + " |\n")
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def convert_docx(src: Path, out: TextIO) -> None:
+    """Stream word/document.xml paragraph by paragraph."""
+    with zipfile.ZipFile(src) as zf, zf.open("word/document.xml") as xml:
+        texts: list[str] = []
+        style = ""
+        listed = False
+        row: list[str] | None = None
+        cell: list[str] | None = None
+        table_rows = 0
+        for event, elem in iterparse(xml, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag == f"{_W}tbl":
+                    out.write("\n")
+                    table_rows = 0
+                elif tag == f"{_W}tr":
+                    row = []
+                elif tag == f"{_W}tc":
+                    cell = []
+                continue
+
+            if tag == f"{_W}t" and elem.text:
+                texts.append(elem.text)
+            elif tag == f"{_W}tab":
+                texts.append("\t")
+            elif tag == f"{_W}pStyle":
+                style = elem.get(f"{_W}val", "")
+            elif tag == f"{_W}numPr":
+                listed = True
+            elif tag == f"{_W}p":
+                text = "".join(texts).strip()
+                heading = re.match(r"(?i)heading\s*(\d)", style)
+                if cell is not None:
+                    if text:
+                        cell.append(text)
+                elif not text:
+                    pass
+                elif heading:
+                    out.write("#" * min(int(heading.group(1)), 6) + f" {text}\n\n")
+                elif style.lower() == "title":
+                    out.write(f"# {text}\n\n")
+                elif listed:
+                    out.write(f"- {text}\n")
+                else:
+                    out.write(f"{text}\n\n")
+                texts, style, listed = [], "", False
+                elem.clear()
+            elif tag == f"{_W}tc" and row is not None:
+                row.append(" ".join(cell or []))
+                cell = None
+            elif tag == f"{_W}tr" and row is not None:
+                out.write("| " + " | ".join(_cell(c) for c in row) + " |\n")
+                if table_rows == 0:
+                    out.write("|" + "---|" * len(row) + "\n")
+                table_rows += 1
+                row = None
+                elem.clear()
+            elif tag == f"{_W}tbl":
+                out.write("\n")
+                elem.clear()
+
+
+CONVERTERS = {
+    ".html": convert_html,
+    ".htm": convert_html,
+    ".txt": convert_text,
+    ".text": convert_text,
+    ".md": convert_text,
+    ".markdown": convert_text,
+    ".csv": convert_csv,
+    ".tsv": convert_csv,
+    ".docx": convert_docx,
+}
+
+
+# ── Pipeline ─────────────────────────────────────────────────────────
+
+
+def _convert_job(job: tuple[str, str, str]) -> tuple[str, str, str | None]:
+    """Worker: convert one source. Returns (src, digest, error)."""
+    src, dest, source_label = Path(job[0]), Path(job[1]), job[2]
+    digest = vault.file_digest(src)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.tmp-{uuid.uuid4().hex[:8]}")
+    try:
+        with tmp.open("w", encoding="utf-8", newline="\n") as out:
+            out.write(f"<!-- source: {source_label} -->\n\n")
+            CONVERTERS[src.suffix.lower()](src, out)
+        tmp.replace(dest)
+    except Exception as exc:  # one bad file must not stop the batch
+        tmp.unlink(missing_ok=True)
+        return str(src), digest, f"{type(exc).__name__}: {exc}"
+    return str(src), digest, None
+
+
+def plan_outputs(sources_dir: Path) -> dict[Path, Path]:
+    """Map each convertible source file to its docs/ output path."""
+    files = sorted(
+        p
+        for p in sources_dir.rglob("*")
+        if p.is_file() and p.suffix.lower() in CONVERTERS and not p.name.startswith(".")
+    )
+    targets: dict[Path, list[Path]] = {}
+    for src in files:
+        rel = src.relative_to(sources_dir)
+        targets.setdefault(vault.DOCS_DIR / rel.with_suffix(".md"), []).append(src)
+
+    outputs: dict[Path, Path] = {}
+    for target, srcs in targets.items():
+        if len(srcs) == 1:
+            outputs[srcs[0]] = target
+        else:
+            # a.html and a.txt would both become a.md; keep both apart.
+            for src in srcs:
+                rel = src.relative_to(sources_dir)
+                outputs[src] = vault.DOCS_DIR / rel.with_name(rel.name + ".md")
+    return outputs
+
+
+def _label(path: Path) -> str:
+    try:
+        return path.resolve().relative_to(vault.ROOT).as_posix()
+    except ValueError:
+        return path.resolve().as_posix()
+
+
+def _generated(dest: Path, key: str, owned: set[str]) -> bool:
+    """Whether dest is absent or was written by ingest.py for this source."""
+    if not dest.exists() or _label(dest) in owned:
+        return True
+    with dest.open(encoding="utf-8", errors="replace") as fh:
+        return fh.readline().rstrip("\n") == f"<!-- source: {key} -->"
+
+
+def ingest(
+    sources_dir: Path, workers: int | None = None, force: bool = False
+) -> tuple[int, int, int, list[str]]:
+    """Convert new/changed sources. Returns (converted, unchanged, removed, errors)."""
+    cache: dict[str, dict] = {}
+    if _cache_path().exists():
+        cache = json.loads(_cache_path().read_text(encoding="utf-8"))
+    owned = {entry["output"] for entry in cache.values()}
+
+    outputs = plan_outputs(sources_dir)
+    jobs: list[tuple[str, str, str]] = []
+    new_cache: dict[str, dict] = {}
+    errors: list[str] = []
+    unchanged = 0
+    for src, dest in outputs.items():
+        key = _label(src)
+        if not _generated(dest, key, owned):
+            errors.append(
+                f"{key}: {_label(dest)} was not generated by ingest.py;"
+                " not overwriting it"
+            )
+            continue
+        st = src.stat()
+        prior = None if force else cache.get(key)
+        if prior and prior["output"] == _label(dest) and dest.exists():
+            same_stat = (
+                prior["size"] == st.st_size and prior["mtime_ns"] == st.st_mtime_ns
+            )
+            if same_stat or vault.file_digest(src) == prior["sha256"]:
+                new_cache[key] = {
+                    **prior,
+                    "size": st.st_size,
+                    "mtime_ns": st.st_mtime_ns,
+                }
+                unchanged += 1
+                continue
+        jobs.append((str(src), str(dest), key))
+
+    if len(jobs) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_convert_job, jobs, chunksize=8))
+    else:
+        results = [_convert_job(job) for job in jobs]
+
+    converted = 0
+    for (src, dest, key), (_, digest, error) in zip(jobs, results):
+        if error:
+            errors.append(f"{key}: {error}")
+            # The previous document, if any, is still in place and valid.
+            if key in cache:
+                new_cache[key] = cache[key]
+            continue
+        converted += 1
+        st = Path(src).stat()
+        new_cache[key] = {
+            "sha256": digest,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "output": _label(Path(dest)),
+        }
+
+    # Remove docs generated from sources that no longer exist.
+    removed = 0
+    live_sources = {_label(src) for src in outputs}
+    live_outputs = {entry["output"] for entry in new_cache.values()}
+    for key, entry in cache.items():
+        if key not in live_sources and entry["output"] not in live_outputs:
+            stale = vault.ROOT / entry["output"]
+            if stale.exists():
+                stale.unlink()
+                removed += 1
+
+    vault.STATE_DIR.mkdir(parents=True, exist_ok=True)
+    vault.atomic_write(_cache_path(), json.dumps(new_cache, indent=1, sort_keys=True))
+    manifest = {
+        entry["output"]: {"source": key, "sha256": entry["sha256"]}
+        for key, entry in sorted(new_cache.items())
+    }
+    vault.DOCS_DIR.mkdir(parents=True, exist_ok=True)
+    vault.atomic_write(_manifest_path(), json.dumps(manifest, indent=1, sort_keys=True))
+    return converted, unchanged, removed, errors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Convert HTML, DOCX, CSV and text sources into Markdown in docs/."
+    )
+    parser.add_argument(
+        "--sources",
+        type=Path,
+        default=None,
+        help="Directory of original files (default: sources/)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Process pool size (default: CPUs)"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Reconvert every file, ignoring the cache"
+    )
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+    if args.sources is None:
+        args.sources = vault.ROOT / "sources"
+
+    if not args.sources.is_dir():
+        print(f"Error: source directory not found: {args.sources}", file=sys.stderr)
+        return 1
+
+    converted, unchanged, removed, errors = ingest(
+        args.sources, args.workers, args.force
+    )
+    for err in errors:
+        print(f"Error: {err}", file=sys.stderr)
+    print(
+        f"Done: {converted} converted, {unchanged} unchanged, "
+        f"{removed} removed, {len(errors)} error(s)."
+    )
+    print(f"Manifest: {_manifest_path().relative_to(vault.ROOT)}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""Write-ahead journal for file registration (.ralph/journal/).
+
+Registering a file takes several steps: claim it, fill in its ID and
+timestamp, rename it, add its row to _index.md, then add it to the
+derived indexes (links, question tree, tags). update_index.py
+records each step here before it takes it. A killed process therefore
+leaves a record of exactly which files were in flight, and
+recover.py finishes or undoes only those.
+
+Every process writes its own journal file, holds an exclusive lock on it
+while running, and deletes it once nothing is in flight. So the journal
+directory only ever holds files of running processes and of processes
+that died mid-registration, and recovery cost scales with in-flight work.
+A journal whose lock can be taken belongs to a dead process.
+
+Records are JSON lines: {"tx": ..., "step": ..., ...}. The steps are
+claim, assign, rename, index, derived, done and abort. A derived
+record names the index it updated, and a tx whose derived update failed
+is held open so that recovery retries it after the process exits.
+Records are flushed to the OS but not fsynced. Note files are not fsynced either, so the journal
+protects against killed processes, not against power loss.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import uuid
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO
+
+sys.path.insert(0, str(Path(__file__).parent))
+import vault  # noqa: E402
+
+FINAL_STEPS = ("done", "abort")
+
+
+def journal_dir() -> Path:
+    return vault.STATE_DIR / "journal"
+
+
+def _rel(path: Path) -> str:
+    return path.relative_to(vault.ROOT).as_posix()
+
+
+class Journal:
+    """This process's journal. The file is created on the first record."""
+
+    def __init__(self) -> None:
+        self._fh = None
+        self._path: Path | None = None
+        self._open: dict[str, str | None] = {}  # tx -> entry ID once assigned
+        self._held: set[str] = set()
+
+    def _write(self, records: list[dict]) -> None:
+        if not records:
+            return
+        if self._fh is None:
+            journal_dir().mkdir(parents=True, exist_ok=True)
+            self._path = journal_dir() / f"{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl"
+            self._fh = self._path.open("ab")
+            vault.try_lock(self._fh)
+        data = "".join(json.dumps(r, default=str) + "\n" for r in records)
+        self._fh.write(data.encode("utf-8"))
+        self._fh.flush()
+        for r in records:
+            if r["step"] in FINAL_STEPS:
+                self._open.pop(r["tx"], None)
+        if not self._open:
+            self.close()
+
+    def claim(self, path: Path) -> tuple[str, Path]:
+        """Record the intent to claim a file. Returns (tx, claimed path)."""
+        tx = uuid.uuid4().hex[:8]
+        claimed = path.with_name(f".claim-{tx}-{path.name}")
+        self._open[tx] = None
+        self._write(
+            [{"tx": tx, "step": "claim", "path": _rel(path), "claimed": _rel(claimed)}]
+        )
+        return tx, claimed
+
+    def assign(
+        self, tx: str, entry_type: str, entry_id: str, timestamp: str, data: dict
+    ) -> None:
+        """Record the ID about to be written into the claimed file."""
+        self._open[tx] = entry_id
+        self._write(
+            [
+                {
+                    "tx": tx,
+                    "step": "assign",
+                    "type": entry_type,
+                    "id": entry_id,
+                    "timestamp": timestamp,
+                    "data": data,
+                }
+            ]
+        )
+
+    def step(self, tx: str, step: str, **fields: str) -> None:
+        self._write([{"tx": tx, "step": step, **fields}])
+
+    def abort(self, tx: str) -> None:
+        """Record that a claim was undone and the file is back in place."""
+        self.step(tx, "abort")
+
+    def indexing(self, entry_ids: list[str]) -> None:
+        """Record the intent to add these entries to _index.md."""
+        self._write([{"tx": tx, "step": "index"} for tx in self._txs_for(entry_ids)])
+
+    def hold(self, tx: str) -> None:
+        """Leave a tx open for recovery, even when done() is called for it."""
+        self._held.add(tx)
+
+    def done(self, entry_ids: list[str]) -> None:
+        """Record that these entries are in _index.md and the derived indexes."""
+        self._write(
+            [
+                {"tx": tx, "step": "done"}
+                for tx in self._txs_for(entry_ids)
+                if tx not in self._held
+            ]
+        )
+
+    def _txs_for(self, entry_ids: list[str]) -> list[str]:
+        wanted = set(entry_ids)
+        return [tx for tx, entry_id in self._open.items() if entry_id in wanted]
+
+    def close(self) -> None:
+        if self._fh is None:
+            return
+        self._fh.close()
+        self._path.unlink(missing_ok=True)
+        self._fh = None
+        self._path = None
+
+
+def read(path: Path) -> dict[str, dict]:
+    """Merge a journal's records into {tx: fields}, in order of first record.
+
+    Each tx's "step" is its last recorded step. A torn last line from a
+    killed writer is ignored.
+    """
+    with path.open("rb") as fh:
+        return _merge(fh)
+
+
+def _merge(fh: IO[bytes]) -> dict[str, dict]:
+    txs: dict[str, dict] = {}
+    fh.seek(0)
+    for line in fh:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        txs.setdefault(record["tx"], {}).update(record)
+    return txs
+
+
+def stale() -> Iterator[tuple[Path, dict[str, dict]]]:
+    """Yield (path, incomplete txs) for each journal left by a dead process.
+
+    The journal stays locked while the caller handles it, so two recoveries
+    never work on the same one. It is read through the locked handle, as
+    Windows locks are mandatory. Once the caller resumes, the file is deleted.
+    """
+    for path in _journals():
+        try:
+            fh = path.open("r+b")
+        except FileNotFoundError:
+            continue
+        with fh:
+            if not vault.try_lock(fh):
+                continue  # its process is still running
+            incomplete = {
+                tx: fields
+                for tx, fields in _merge(fh).items()
+                if fields["step"] not in FINAL_STEPS
+            }
+            yield path, incomplete
+        # Recovery is idempotent, so another recovery that opens the file
+        # before it is gone does no harm.
+        path.unlink(missing_ok=True)
+
+
+def status() -> list[tuple[Path, bool, int | None]]:
+    """Return (path, process still running, incomplete txs) for each journal.
+
+    A running process's journal is locked and not read, so its count is None.
+    """
+    result = []
+    for path in _journals():
+        try:
+            with path.open("r+b") as fh:
+                running = not vault.try_lock(fh)
+                incomplete = None
+                if not running:
+                    incomplete = sum(
+                        fields["step"] not in FINAL_STEPS
+                        for fields in _merge(fh).values()
+                    )
+        except FileNotFoundError:
+            continue
+        result.append((path, running, incomplete))
+    return result
+
+
+def _journals() -> list[Path]:
+    if not journal_dir().is_dir():
+        return []
+    return sorted(journal_dir().glob("*.jsonl"))
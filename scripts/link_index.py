@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Persistent, incrementally maintained index of links between vault files.
+
+Every registered note and question is recorded in the `link_files` table
+with the SHA-256 of its contents, and every outgoing edge in the `links`
+table. Three kinds of edge are tracked:
+
+- `link`    — an inline or Related-section [[wikilink]] in the body
+- `answers` — a note's `answers:` frontmatter field
+- `parent`  — a question's `parent:` frontmatter field
+
+Edges are indexed by destination, so "what links to X?" is a single
+index range scan proportional to X's in-degree. Files are re-parsed only
+when their content hash changes; size and mtime are checked first so an
+unchanged file is never read.
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import vault  # noqa: E402
+from models import parse_frontmatter  # noqa: E402
+
+# Matches wikilinks like [[NOTE-20260227-054343-855]] or [[Q-20260227-051858-705]]
+WIKILINK_RE = re.compile(r"\[\[((?:NOTE|Q)-\d{8}-\d{6}-\d{3})\]\]")
+_ENTRY_ID_RE = re.compile(r"^(?:NOTE|Q)-\d{8}-\d{6}-\d{3}$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS link_files (
+    id       TEXT PRIMARY KEY,
+    path     TEXT NOT NULL,
+    type     TEXT NOT NULL,
+    sha256   TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS links (
+    src  TEXT NOT NULL,
+    dst  TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    PRIMARY KEY (src, dst, kind)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS links_by_dst ON links (dst, src);
+"""
+
+
+def connect() -> sqlite3.Connection:
+    conn = vault.connect_state()
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def extract_edges(text: str) -> tuple[str, str, set[tuple[str, str]]] | None:
+    """Return (entry_id, entry_type, {(dst, kind)}) for a registered file, else None."""
+    try:
+        fm = parse_frontmatter(text)
+    except Exception:
+        return None
+    entry_id = str(fm.get("id", ""))
+    if not _ENTRY_ID_RE.match(entry_id):
+        return None
+
+    edges = {(m.group(1), "link") for m in WIKILINK_RE.finditer(text)}
+    for field in ("answers", "parent"):
+        target = fm.get(field)
+        if target and _ENTRY_ID_RE.match(str(target)):
+            edges.add((str(target), field))
+    edges = {(dst, kind) for dst, kind in edges if dst != entry_id}
+    return entry_id, str(fm.get("type", "")), edges
+
+
+def _relpath(path: Path) -> str:
+    return path.resolve().relative_to(vault.ROOT).as_posix()
+
+
+def _store(
+    conn: sqlite3.Connection,
+    path: Path,
+    st,
+    digest: str,
+    parsed: tuple[str, str, set[tuple[str, str]]],
+) -> None:
+    entry_id, entry_type, edges = parsed
+    conn.execute(
+        "INSERT OR REPLACE INTO link_files VALUES (?, ?, ?, ?, ?, ?)",
+        (entry_id, _relpath(path), entry_type, digest, st.st_size, st.st_mtime_ns),
+    )
+    conn.execute("DELETE FROM links WHERE src = ?", (entry_id,))
+    conn.executemany(
+        "INSERT INTO links VALUES (?, ?, ?)",
+        [(entry_id, dst, kind) for dst, kind in sorted(edges)],
+    )
+
+
+def index_file(conn: sqlite3.Connection, path: Path) -> bool:
+    """Bring one file's entry up to date. Returns True if its edges were re-parsed."""
+    st = path.stat()
+    rel = _relpath(path)
+    row = conn.execute(
+        "SELECT id, sha256, size, mtime_ns FROM link_files WHERE path = ?", (rel,)
+    ).fetchone()
+    if row and row[2] == st.st_size and row[3] == st.st_mtime_ns:
+        return False
+
+    digest = vault.file_digest(path)
+    if row and row[1] == digest:
+        conn.execute(
+            "UPDATE link_files SET size = ?, mtime_ns = ? WHERE id = ?",
+            (st.st_size, st.st_mtime_ns, row[0]),
+        )
+        return False
+
+    parsed = extract_edges(path.read_text(encoding="utf-8"))
+    if parsed is None:
+        return False
+    if row and row[0] != parsed[0]:
+        forget(conn, row[0])
+    _store(conn, path, st, digest, parsed)
+    return True
+
+
+def forget(conn: sqlite3.Connection, entry_id: str) -> None:
+    """Drop a file and its outgoing edges from the index."""
+    conn.execute("DELETE FROM link_files WHERE id = ?", (entry_id,))
+    conn.execute("DELETE FROM links WHERE src = ?", (entry_id,))
+
+
+def registered_files() -> list[Path]:
+    """Return every .md file under notes/ (notes and questions)."""
+    if not vault.NOTES_DIR.exists():
+        return []
+    return sorted(vault.NOTES_DIR.rglob("*.md"))
+
+
+def refresh(paths: list[Path] | None = None) -> tuple[int, int]:
+    """Re-index changed files. Returns (reparsed, removed).
+
+    With explicit paths only those files are checked. Without, every file
+    under notes/ is stat()ed and entries whose file has disappeared are
+    dropped; only files whose size/mtime and hash changed are re-read.
+    """
+    conn = connect()
+    reparsed = removed = 0
+    with conn:
+        for path in paths if paths is not None else registered_files():
+            if path.is_file() and index_file(conn, path):
+                reparsed += 1
+        if paths is None:
+            for entry_id, rel in conn.execute(
+                "SELECT id, path FROM link_files"
+            ).fetchall():
+                if not (vault.ROOT / rel).is_file():
+                    forget(conn, entry_id)
+                    removed += 1
+    conn.close()
+    return reparsed, removed
+
+
+def backlinks(conn: sqlite3.Connection, entry_id: str) -> list[tuple[str, str]]:
+    """Return [(src_id, kind)] of everything that points at entry_id."""
+    return conn.execute(
+        "SELECT src, kind FROM links WHERE dst = ? ORDER BY src, kind", (entry_id,)
+    ).fetchall()
+
+
+def outlinks(conn: sqlite3.Connection, entry_id: str) -> list[tuple[str, str]]:
+    """Return [(dst_id, kind)] of everything entry_id points at."""
+    return conn.execute(
+        "SELECT dst, kind FROM links WHERE src = ? ORDER BY dst, kind", (entry_id,)
+    ).fetchall()
+
+
+def path_of(conn: sqlite3.Connection, entry_id: str) -> Path | None:
+    row = conn.execute(
+        "SELECT path FROM link_files WHERE id = ?", (entry_id,)
+    ).fetchone()
+    return vault.ROOT / row[0] if row else None
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""Compact binary manifest of _index.md for instant lookups.
+
+update_index.py writes _index.bin next to _index.md every time it updates
+the index. Readers mmap it and never parse Markdown:
+
+    header   64 bytes   magic, version, counts, string-table offset and the
+                        size/mtime of the _index.md it was built from
+    records  48 bytes   one per entry, sorted by ID (so all notes come before
+                        all questions, and lookups are a binary search)
+    strings             length-prefixed UTF-8 source paths, by ordinal
+
+Each record holds the ID, type, status, an ordinal into the string table
+for the source doc, the byte offset and length of the entry's row in
+_index.md, and the record number of the linked entry: the answering note
+for a question, or the answered question for a note.
+
+Usage:
+    python scripts/manifest.py stats
+    python scripts/manifest.py lookup NOTE-20260227-054343-855
+    python scripts/manifest.py sample --type note -k 3
+    python scripts/manifest.py rebuild
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import random
+import struct
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+import vault  # noqa: E402
+
+MAGIC = b"RALPHIDX"
+VERSION = 1
+
+# magic, version, record size, records, notes, open, answered,
+# strings offset, strings count, _index.md size, _index.md mtime_ns
+_HEADER = struct.Struct("<8sHHIIIIQIQq")
+_HEADER_SIZE = 64
+_RECORD = struct.Struct("<24sBBxxIQIi")
+
+TYPE_NOTE, TYPE_QUESTION = 0, 1
+STATUS_NONE, STATUS_OPEN, STATUS_ANSWERED = 0, 1, 2
+_STATUS_CODES = {"open": STATUS_OPEN, "answered": STATUS_ANSWERED}
+_STATUS_NAMES = {v: k for k, v in _STATUS_CODES.items()}
+
+
+def _link(cell: bytes) -> bytes | None:
+    cell = cell.strip()
+    return cell[2:-2] if cell.startswith(b"[[") and cell.endswith(b"]]") else None
+
+
+class Record(NamedTuple):
+    id: str
+    type: str
+    status: str
+    source: str
+    offset: int
+    length: int
+    link: str | None
+
+
+def build(index_bytes: bytes, size: int, mtime_ns: int) -> bytes:
+    """Return manifest bytes for the given _index.md contents."""
+    entries: dict[bytes, tuple] = {}
+    offset = 0
+    for line in index_bytes.split(b"\n"):
+        start, offset = offset, offset + len(line) + 1
+        if not line.startswith(b"| [["):
+            continue
+        line = line.rstrip(b"\r")
+        entry_id = line[4 : line.find(b"]]", 4)]
+        # Cells are taken from the right so a title or question containing
+        # "|" cannot shift the source and link cells.
+        if entry_id.startswith(b"Q-"):
+            # | ID | Status | Question | Source | Answered By |
+            status = line[len(entry_id) + 6 :].split(b"|", 2)[1].strip().lower()
+            _, source, link, _ = line.rsplit(b"|", 3)
+            entries[entry_id] = (
+                TYPE_QUESTION,
+                _STATUS_CODES.get(status.decode(), STATUS_OPEN),
+                source.strip(),
+                start,
+                len(line),
+                _link(link),
+            )
+        elif entry_id.startswith(b"NOTE-"):
+            # | ID | Title | Answers | Source Doc | Created |
+            _, link, source, _, _ = line.rsplit(b"|", 4)
+            entries[entry_id] = (
+                TYPE_NOTE,
+                STATUS_NONE,
+                source.strip(),
+                start,
+                len(line),
+                _link(link),
+            )
+
+    ids = sorted(entries)
+    position = {entry_id: i for i, entry_id in enumerate(ids)}
+    strings: dict[bytes, int] = {}
+    records = bytearray()
+    notes = open_count = answered = 0
+    for entry_id in ids:
+        etype, status, source, offset, length, link = entries[entry_id]
+        ordinal = strings.setdefault(source, len(strings))
+        linked = position.get(link, -1) if link else -1
+        records += _RECORD.pack(
+            entry_id, etype, status, ordinal, offset, length, linked
+        )
+        notes += etype == TYPE_NOTE
+        open_count += status == STATUS_OPEN
+        answered += status == STATUS_ANSWERED
+
+    table = b"".join(struct.pack("<I", len(s)) + s for s in strings)
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        _RECORD.size,
+        len(ids),
+        notes,
+        open_count,
+        answered,
+        _HEADER_SIZE + len(records),
+        len(strings),
+        size,
+        mtime_ns,
+    ).ljust(_HEADER_SIZE, b"\0")
+    return header + bytes(records) + table
+
+
+def write_manifest(
+    index_path: Path | None = None, out_path: Path | None = None
+) -> None:
+    """Rebuild the manifest from _index.md as it is on disk now."""
+    index_path = index_path or vault.INDEX_PATH
+    out_path = out_path or vault.MANIFEST_PATH
+    data = index_path.read_bytes()
+    st = index_path.stat()
+    vault.atomic_write_bytes(out_path, build(data, st.st_size, st.st_mtime_ns))
+
+
+def refresh_manifest(
+    index_path: Path | None = None, out_path: Path | None = None
+) -> bool:
+    """Rewrite the manifest after _index.md changed. Returns False if it could not.
+
+    On Windows the rename fails while another process has _index.bin
+    mapped. The old manifest then no longer matches the size and mtime of
+    _index.md, so readers treat it as stale and open_fresh() rebuilds it.
+    """
+    try:
+        write_manifest(index_path, out_path)
+    except PermissionError as exc:
+        print(
+            f"Warning: _index.bin left stale ({exc}); it is rebuilt on next use.",
+            file=sys.stderr,
+        )
+        return False
+    return True
+
+
+class Manifest:
+    """Read-only, memory-mapped view of _index.bin.
+
+    `data` gives manifest bytes to read instead of the file.
+    """
+
+    def __init__(self, path: Path | None = None, data: bytes | None = None) -> None:
+        self.path = path or vault.MANIFEST_PATH
+        if data is None:
+            with self.path.open("rb") as fh:
+                self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._mm = data
+        if len(self._mm) < _HEADER_SIZE:
+            self.close()
+            raise ValueError(f"{self.path.name} is truncated")
+        (
+            magic,
+            version,
+            record_size,
+            self.count,
+            self.notes,
+            self.open,
+            self.answered,
+            self._strings_offset,
+            self._strings_count,
+            self.index_size,
+            self.index_mtime_ns,
+        ) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or record_size != _RECORD.size:
+            self.close()
+            raise ValueError(f"{self.path.name} is not a version {VERSION} manifest")
+        records_end = _HEADER_SIZE + self.count * _RECORD.size
+        if self._strings_offset != records_end or len(self._mm) < records_end:
+            self.close()
+            raise ValueError(f"{self.path.name} is truncated")
+        self.questions = self.count - self.notes
+        self._strings: list[str] | None = None
+
+    def __enter__(self) -> Manifest:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+
+    def is_fresh(self, index_path: Path | None = None) -> bool:
+        """True if built from the current _index.md (same size and mtime)."""
+        try:
+            st = (index_path or vault.INDEX_PATH).stat()
+        except FileNotFoundError:
+            return False
+        return st.st_size == self.index_size and st.st_mtime_ns == self.index_mtime_ns
+
+    def _id_at(self, i: int) -> bytes:
+        start = _HEADER_SIZE + i * _RECORD.size
+        return self._mm[start : start + 24].rstrip(b"\0")
+
+    def _source(self, ordinal: int) -> str:
+        if self._strings is None:
+            strings, pos = [], self._strings_offset
+            for _ in range(self._strings_count):
+                (n,) = struct.unpack_from("<I", self._mm, pos)
+                strings.append(self._mm[pos + 4 : pos + 4 + n].decode("utf-8"))
+                pos += 4 + n
+            self._strings = strings
+        return self._strings[ordinal]
+
+    def find(self, entry_id: str) -> int | None:
+        """Binary-search for an ID. Returns its record number or None."""
+        key = entry_id.encode("ascii")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._id_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.count and self._id_at(lo) == key else None
+
+    def record(self, i: int) -> Record:
+        raw_id, etype, status, ordinal, offset, length, link = _RECORD.unpack_from(
+            self._mm, _HEADER_SIZE + i * _RECORD.size
+        )
+        return Record(
+            id=raw_id.rstrip(b"\0").decode("ascii"),
+            type="question" if etype == TYPE_QUESTION else "note",
+            status=_STATUS_NAMES.get(status, ""),
+            source=self._source(ordinal),
+            offset=offset,
+            length=length,
+            link=self._id_at(link).decode("ascii") if link >= 0 else None,
+        )
+
+    def lookup(self, entry_id: str) -> Record | None:
+        i = self.find(entry_id)
+        return None if i is None else self.record(i)
+
+    def _records(self, entry_type: str) -> Iterator[tuple]:
+        first, last = (
+            (0, self.notes) if entry_type == "note" else (self.notes, self.count)
+        )
+        return _RECORD.iter_unpack(
+            self._mm[
+                _HEADER_SIZE + first * _RECORD.size : _HEADER_SIZE + last * _RECORD.size
+            ]
+        )
+
+    def ids(self, entry_type: str, status: str | None = None) -> list[str]:
+        """All IDs of one type (optionally one status), sorted, so oldest first."""
+        if status is None:
+            rng = (
+                range(self.notes)
+                if entry_type == "note"
+                else range(self.notes, self.count)
+            )
+            return [self._id_at(i).decode("ascii") for i in rng]
+        code = _STATUS_CODES[status]
+        return [
+            rec[0].rstrip(b"\0").decode("ascii")
+            for rec in self._records(entry_type)
+            if rec[2] == code
+        ]
+
+    def sources(self, entry_type: str = "note") -> set[str]:
+        """Distinct `source` values across all entries of one type."""
+        return {self._source(o) for o in {rec[3] for rec in self._records(entry_type)}}
+
+    def sample(self, k: int, entry_type: str = "note") -> list[str]:
+        """Random IDs of one type without touching any other record."""
+        rng = (
+            range(self.notes) if entry_type == "note" else range(self.notes, self.count)
+        )
+        picks = random.sample(rng, min(k, len(rng)))
+        return [self._id_at(i).decode("ascii") for i in picks]
+
+    def row(self, i: int, index_path: Path | None = None) -> str:
+        """Return the entry's _index.md table row by seeking to its offset."""
+        rec = self.record(i)
+        with (index_path or vault.INDEX_PATH).open("rb") as fh:
+            fh.seek(rec.offset)
+            return fh.read(rec.length).decode("utf-8")
+
+
+def open_fresh() -> Manifest | None:
+    """Open the manifest, rebuilding it first if it is missing or stale.
+
+    Returns None if there is no _index.md to build from.
+    """
+    if not vault.INDEX_PATH.exists():
+        return None
+    try:
+        m = Manifest()
+        if m.is_fresh():
+            return m
+        m.close()
+    except (OSError, ValueError, struct.error):
+        pass
+    try:
+        write_manifest()
+    except PermissionError:
+        # Mapped by another process (Windows): read a private copy instead.
+        st = vault.INDEX_PATH.stat()
+        data = build(vault.INDEX_PATH.read_bytes(), st.st_size, st.st_mtime_ns)
+        return Manifest(data=data)
+    return Manifest()
+
+
+# ── CLI ──────────────────────────────────────────────────────────────
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Query the binary index manifest.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Entry counts")
+    p_lookup = sub.add_parser("lookup", help="Show one entry")
+    p_lookup.add_argument("entry_id")
+    p_sample = sub.add_parser("sample", help="Random IDs of one type")
+    p_sample.add_argument("--type", choices=["note", "question"], default="note")
+    p_sample.add_argument("-k", type=int, default=3)
+    sub.add_parser("rebuild", help="Rebuild _index.bin from _index.md")
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    if args.command == "rebuild":
+        write_manifest()
+    m = open_fresh()
+    if m is None:
+        print("Error: _index.md not found", file=sys.stderr)
+        return 1
+
+    with m:
+        if args.command in ("stats", "rebuild"):
+            print(f"Entries: {len(m)}")
+            print(f"Notes: {m.notes}")
+            print(f"Questions: {m.questions} ({m.open} open, {m.answered} answered)")
+        elif args.command == "lookup":
+            i = m.find(args.entry_id)
+            if i is None:
+                print(f"{args.entry_id} not found", file=sys.stderr)
+                return 1
+            rec = m.record(i)
+            for field, value in rec._asdict().items():
+                print(f"{field}: {value if value is not None else ''}")
+            print(f"row: {m.row(i)}")
+        elif args.command == "sample":
+            for entry_id in m.sample(args.k, args.type):
+                print(entry_id)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""Re-validate registered notes and questions, and migrate their frontmatter.
+
+Every registered file is checked against the post-registration schema
+(models.RegisteredNote / RegisteredQuestion). The checks are a real ID that
+matches the filename, a parsed `created` timestamp, and all of the
+registration-time field rules.
+
+With --spec, declarative migrations are applied first. A spec is a YAML
+list of migrations, each with an optional `types` filter and a list of
+operations run in order:
+
+    - id: 2026-10-normalise-tags
+      types: [note]
+      ops:
+        - tags: {lower: true, spaces: "-", dedupe: true}
+    - id: 2026-10-confidence
+      types: [note]
+      ops:
+        - set_default: {field: confidence, value: medium}
+        - rename: {from: src, to: source}
+        - delete: {field: legacy}
+        - replace: {field: status, values: {closed: answered}}
+
+The whole spec, including every operation's arguments, is validated
+before any file is touched. Every operation is idempotent, so a file
+migrated twice (as when a chunk is resumed) ends up the same as one
+migrated once. For that reason a `replace` mapping may not map a value
+to another value it also replaces.
+
+Only frontmatter lines whose value changed are rewritten, so quoting and
+key order survive. Each file is replaced atomically. Files are processed
+in fixed-size chunks across a process pool. After each chunk a checkpoint
+is written to .ralph/, so an interrupted run resumes where it stopped
+when started again with the same spec. Once files have changed, the link,
+tag and question-tree indexes are brought up to date.
+
+Usage:
+    python scripts/migrate.py                          # validate only
+    python scripts/migrate.py --spec migrations.yaml --dry-run
+    python scripts/migrate.py --spec migrations.yaml
+    python scripts/migrate.py --restart                # ignore the checkpoint
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Literal
+
+import yaml
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+sys.path.insert(0, str(Path(__file__).parent))
+import link_index  # noqa: E402
+import question_tree  # noqa: E402
+import tags  # noqa: E402
+import vault  # noqa: E402
+from models import (  # noqa: E402
+    parse_frontmatter,
+    rewrite_frontmatter,
+    validate_registered,
+)
+
+CHUNK_SIZE = 512
+PARALLEL_THRESHOLD = 64
+
+
+# ── Spec ─────────────────────────────────────────────────────────────
+
+
+def _op_set_default(fm: dict, field: str, value: Any) -> None:
+    fm.setdefault(field, value)
+
+
+def _op_rename(fm: dict, **args: str) -> None:
+    old, new = args["from"], args["to"]
+    if old in fm and new not in fm:
+        # Keep the key's position.
+        items = [(new if k == old else k, v) for k, v in fm.items()]
+        fm.clear()
+        fm.update(items)
+
+
+def _op_delete(fm: dict, field: str) -> None:
+    fm.pop(field, None)
+
+
+def _op_replace(fm: dict, field: str, values: dict) -> None:
+    if (
+        field in fm
+        and isinstance(fm[field], (str, int, float, bool))
+        and fm[field] in values
+    ):
+        fm[field] = values[fm[field]]
+
+
+def _op_tags(
+    fm: dict, lower: bool = False, spaces: str | None = None, dedupe: bool = True
+) -> None:
+    if not isinstance(fm.get("tags"), list):
+        return
+    tags = [str(t).strip() for t in fm["tags"]]
+    if lower:
+        tags = [t.lower() for t in tags]
+    if spaces is not None:
+        tags = [re.sub(r"\s+", spaces, t) for t in tags]
+    if dedupe:
+        tags = list(dict.fromkeys(tags))
+    fm["tags"] = [t for t in tags if t]
+
+
+def _problems(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc'])}:"
+        f" {err['msg'].removeprefix('Value error, ')}"
+        for err in exc.errors()
+    )
+
+
+class _OpArgs(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+
+class _SetDefaultArgs(_OpArgs):
+    field: str
+    value: Any
+
+
+class _RenameArgs(_OpArgs):
+    from_: str = Field(alias="from")
+    to: str
+
+
+class _DeleteArgs(_OpArgs):
+    field: str
+
+
+class _ReplaceArgs(_OpArgs):
+    field: str
+    values: dict[Any, Any]
+
+    @field_validator("values")
+    @classmethod
+    def no_chains(cls, v: dict[Any, Any]) -> dict[Any, Any]:
+        for old, new in v.items():
+            if isinstance(new, (str, int, float, bool)) and new != old and new in v:
+                raise ValueError(
+                    f"{old!r} -> {new!r}, which is replaced again;"
+                    " re-running the migration would chain the two"
+                )
+        return v
+
+
+class _TagsArgs(_OpArgs):
+    lower: bool = False
+    spaces: str | None = None
+    dedupe: bool = True
+
+
+OPS = {
+    "set_default": (_op_set_default, _SetDefaultArgs),
+    "rename": (_op_rename, _RenameArgs),
+    "delete": (_op_delete, _DeleteArgs),
+    "replace": (_op_replace, _ReplaceArgs),
+    "tags": (_op_tags, _TagsArgs),
+}
+
+
+class Migration(BaseModel):
+    id: str = Field(min_length=1)
+    types: list[Literal["note", "question"]] = ["note", "question"]
+    ops: list[dict[str, dict[str, Any]]]
+
+    @field_validator("ops")
+    @classmethod
+    def valid_ops(
+        cls, v: list[dict[str, dict[str, Any]]]
+    ) -> list[dict[str, dict[str, Any]]]:
+        for number, op in enumerate(v, 1):
+            if len(op) != 1 or next(iter(op)) not in OPS:
+                raise ValueError(
+                    f"op {number} must be one of {', '.join(OPS)}"
+                    f" with its arguments, got {op}"
+                )
+            ((name, args),) = op.items()
+            try:
+                OPS[name][1].model_validate(args)
+            except ValidationError as exc:
+                raise ValueError(f"op {number} ({name}): {_problems(exc)}") from None
+        return v
+
+
+def load_spec(path: Path) -> list[Migration]:
+    """Parse and validate a spec. Raises ValueError naming the bad migration."""
+    raw = yaml.safe_load(path.read_text(encoding="utf-8")) or []
+    if not isinstance(raw, list):
+        raise ValueError("spec must be a YAML list of migrations")
+    migrations = []
+    for number, entry in enumerate(raw, 1):
+        try:
+            migrations.append(Migration.model_validate(entry))
+        except ValidationError as exc:
+            label = entry.get("id") if isinstance(entry, dict) else None
+            where = f"migration {number}" + (f" ({label})" if label else "")
+            raise ValueError(f"{where}: {_problems(exc)}") from None
+    return migrations
+
+
+def apply_migrations(fm: dict, migrations: list[dict]) -> dict:
+    """Return a migrated copy of the frontmatter dict."""
+    fm = dict(fm)
+    for migration in migrations:
+        if fm.get("type") not in migration["types"]:
+            continue
+        for op in migration["ops"]:
+            ((name, args),) = op.items()
+            OPS[name][0](fm, **args)
+    return fm
+
+
+# ── Rewriting ────────────────────────────────────────────────────────
+
+
+def _error_lines(exc: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(p) for p in err['loc'][1:]) or 'frontmatter'}: {err['msg']}"
+        for err in exc.errors()
+    ]
+
+
+def _migrate_job(job: tuple[str, list[dict], bool]) -> tuple[str, bool, list[str]]:
+    """Migrate and validate one file. Returns (path, changed, errors)."""
+    path_str, migrations, dry_run = job
+    path = Path(path_str)
+    try:
+        text = path.read_text(encoding="utf-8")
+        fm = parse_frontmatter(text)
+    except (OSError, ValueError) as exc:
+        return path_str, False, [str(exc)]
+
+    new = apply_migrations(fm, migrations) if migrations else fm
+    changed = new != fm or list(new) != list(fm)
+    if changed and not dry_run:
+        vault.atomic_write(path, rewrite_frontmatter(text, fm, new))
+
+    errors: list[str] = []
+    try:
+        validate_registered(new)
+    except ValidationError as exc:
+        errors = _error_lines(exc)
+    if str(new.get("id")) != path.stem:
+        errors.append(f"id: {new.get('id')!r} does not match the filename")
+    return path_str, changed, errors
+
+
+# ── Driver ───────────────────────────────────────────────────────────
+
+
+def _checkpoint_path() -> Path:
+    return vault.STATE_DIR / "migrate-checkpoint.json"
+
+
+def run(
+    migrations: list[Migration],
+    dry_run: bool = False,
+    workers: int | None = None,
+    restart: bool = False,
+) -> tuple[int, list[str], dict[str, list[str]]]:
+    """Process every registered file. Returns (checked, changed, {path: errors})."""
+    spec = [m.model_dump() for m in migrations]
+    files = sorted([*vault.iter_registered("note"), *vault.iter_registered("question")])
+    # The checkpoint only applies to the same spec over the same files.
+    h = hashlib.sha256(json.dumps([spec, dry_run], sort_keys=True).encode())
+    for path in files:
+        h.update(f"{path.relative_to(vault.ROOT).as_posix()}\n".encode())
+    run_key = h.hexdigest()
+
+    checkpoint = {"key": run_key, "next": 0, "changed": [], "errors": {}}
+    ckpt_path = _checkpoint_path()
+    if not restart and ckpt_path.exists():
+        try:
+            saved = json.loads(ckpt_path.read_text(encoding="utf-8"))
+        except ValueError:
+            saved = {}
+        if saved.get("key") == run_key:
+            checkpoint = saved
+            if checkpoint["next"]:
+                print(f"Resuming at file {checkpoint['next']} of {len(files)}.")
+
+    vault.STATE_DIR.mkdir(parents=True, exist_ok=True)
+    pending = len(files) - checkpoint["next"]
+    use_pool = pending >= PARALLEL_THRESHOLD and workers != 1
+    pool = ProcessPoolExecutor(max_workers=workers) if use_pool else None
+    try:
+        for start in range(checkpoint["next"], len(files), CHUNK_SIZE):
+            jobs = [(str(p), spec, dry_run) for p in files[start : start + CHUNK_SIZE]]
+            if pool is not None:
+                results = list(pool.map(_migrate_job, jobs, chunksize=16))
+            else:
+                results = [_migrate_job(job) for job in jobs]
+            for path_str, changed, errors in results:
+                rel = Path(path_str).relative_to(vault.ROOT).as_posix()
+                if changed:
+                    checkpoint["changed"].append(rel)
+                if errors:
+                    checkpoint["errors"][rel] = errors
+            checkpoint["next"] = start + len(jobs)
+            vault.atomic_write(ckpt_path, json.dumps(checkpoint))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # A finished run leaves no checkpoint behind.
+    ckpt_path.unlink(missing_ok=True)
+    if checkpoint["changed"] and not dry_run:
+        link_index.refresh([vault.ROOT / rel for rel in checkpoint["changed"]])
+        # Changed tags or answers/parent fields leave the facet index and
+        # the question rollups stale, so both are rebuilt from the files.
+        conn = question_tree.connect()
+        try:
+            question_tree.rebuild(conn)
+        finally:
+            conn.close()
+        tags.backfill()
+    return len(files), checkpoint["changed"], checkpoint["errors"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Validate registered files and apply frontmatter migrations."
+    )
+    parser.add_argument("--spec", type=Path, help="YAML migration spec to apply")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report changes without writing"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore any saved checkpoint"
+    )
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    try:
+        migrations = load_spec(args.spec) if args.spec else []
+    except (OSError, ValueError, ValidationError) as exc:
+        print(f"Error: invalid spec: {exc}", file=sys.stderr)
+        return 1
+
+    checked, changed, errors = run(migrations, args.dry_run, args.workers, args.restart)
+    verb = "Would change" if args.dry_run else "Changed"
+    if migrations:
+        print(f"{verb} {len(changed)} of {checked} file(s).")
+        for rel in changed[:20] if args.dry_run else []:
+            print(f"  {rel}")
+    for rel, lines in sorted(errors.items()):
+        print(f"{rel}:", file=sys.stderr)
+        for line in lines:
+            print(f"  {line}", file=sys.stderr)
+    print(f"Validated {checked} file(s): {len(errors)} invalid.")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
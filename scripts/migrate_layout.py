@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Convert a vault between the flat and sharded notes/ layouts.
+
+flat:     notes/NOTE-20261019-....md,  notes/questions/Q-20261019-....md
+sharded:  notes/2026/10/NOTE-20261019-....md,  notes/questions/2026/10/Q-....md
+
+The shard is derived from the ID, so any script can resolve an ID to its
+path without scanning (see vault.entry_path). The layout is recorded in
+notes/.layout before any file moves, and every file is moved with a single
+rename, so an interrupted migration can simply be re-run. Until then,
+vault.entry_path falls back to the other layout's path.
+
+Usage:
+    python scripts/migrate_layout.py sharded
+    python scripts/migrate_layout.py flat
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import link_index  # noqa: E402
+import vault  # noqa: E402
+
+
+def migrate(target: str) -> int:
+    """Move every registered file into the target layout. Returns files moved."""
+    vault.set_layout(target)
+    moved = 0
+    for entry_type in ("note", "question"):
+        for path in list(vault.iter_registered(entry_type)):
+            dest_dir = vault.entry_dir(path.stem, target)
+            if path.parent == dest_dir:
+                continue
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            path.rename(dest_dir / path.name)
+            moved += 1
+
+    if target == "flat":
+        # Drop the now-empty year/month directories.
+        for base in (vault.NOTES_DIR, vault.QUESTIONS_DIR):
+            for year in base.glob("[0-9][0-9][0-9][0-9]"):
+                for month in year.iterdir():
+                    if month.is_dir() and not any(month.iterdir()):
+                        month.rmdir()
+                if year.is_dir() and not any(year.iterdir()):
+                    year.rmdir()
+    return moved
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Convert notes/ between flat and sharded layouts."
+    )
+    parser.add_argument("layout", choices=vault.LAYOUTS, help="Target layout")
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    previous = vault.layout()
+    moved = migrate(args.layout)
+    reparsed, removed = link_index.refresh()
+    print(f"Layout: {previous} -> {args.layout}. Moved {moved} file(s).")
+    print(f"Link index updated: {reparsed} re-parsed, {removed} removed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,12 +4,12 @@
 from __future__ import annotations
 
 import re
-from typing import Annotated, Literal, Union
+from datetime import datetime
+from typing import Annotated, Any, Literal, Union
 
 import yaml
 from pydantic import BaseModel, Field, TypeAdapter, field_validator
 
-
 # ── Frontmatter models ──────────────────────────────────────────────
 
 
@@ -72,15 +72,69 @@ Frontmatter = Annotated[
 _validate = TypeAdapter(Frontmatter).validate_python
 
 
+# ── Registered-file models ──────────────────────────────────────────
+# Frontmatter after update_index.py has assigned the ID and timestamp.
+
+
+class RegisteredNote(NoteFrontmatter):
+    id: str = Field(pattern=r"^NOTE-\d{8}-\d{6}-\d{3}$")
+    created: datetime
+
+
+class RegisteredQuestion(QuestionFrontmatter):
+    id: str = Field(pattern=r"^Q-\d{8}-\d{6}-\d{3}$")
+    status: Literal["open", "answered"]
+    created: datetime
+
+
+Registered = Annotated[
+    Union[RegisteredNote, RegisteredQuestion],
+    Field(discriminator="type"),
+]
+validate_registered = TypeAdapter(Registered).validate_python
+
+
 # ── Helpers ──────────────────────────────────────────────────────────
 
+_FRONTMATTER_RE = re.compile(r"^---\n(.+?)\n---", re.DOTALL)
+_KEY_RE = re.compile(r"^([A-Za-z_][\w-]*):")
+
 
 def parse_frontmatter(text: str) -> dict:
     """Extract and parse YAML frontmatter from a Markdown file."""
-    match = re.match(r"^---\n(.+?)\n---", text, re.DOTALL)
+    match = _FRONTMATTER_RE.match(text)
     if not match:
         raise ValueError("No valid YAML frontmatter (expected --- delimiters)")
     raw = yaml.safe_load(match.group(1))
     if not isinstance(raw, dict):
         raise ValueError("Frontmatter must be a YAML mapping")
     return raw
+
+
+def _dump_value(value: Any) -> str:
+    dumped = yaml.safe_dump(
+        value, default_flow_style=True, allow_unicode=True, width=1 << 30
+    )
+    return dumped.removesuffix("\n").removesuffix("\n...").strip()
+
+
+def rewrite_frontmatter(text: str, old: dict, new: dict) -> str:
+    """Rewrite only the changed keys of a file's frontmatter block."""
+    match = _FRONTMATTER_RE.match(text)
+    blocks: dict[str, list[str]] = {}
+    current = None
+    for line in match.group(1).split("\n"):
+        key = _KEY_RE.match(line)
+        if key:
+            current = key.group(1)
+            blocks[current] = [line]
+        elif current is not None:
+            blocks[current].append(line)
+
+    lines: list[str] = []
+    for key, value in new.items():
+        if key in blocks and key in old and old[key] == value:
+            lines.extend(blocks[key])
+        else:
+            lines.append(f"{key}: {_dump_value(value)}")
+    return f"---\n{chr(10).join(lines)}\n---" + text[match.end() :]
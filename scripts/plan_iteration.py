@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Compute the orchestrator's next dispatch plan from the index and history.
+
+Applies the Step 2 rules of ralph-orchestrator.agent.md in one pass:
+
+- Paused if PAUSE.md exists.
+- First iteration: askers only, to seed the question pool.
+- Doers for the oldest open questions, up to --max-doers.
+- An asker when fewer than 3 questions are open, no asker has run in the
+  last 4 iterations, or some docs/ file is not yet the source of any note.
+- Connectors once there are at least 6 notes, from the third iteration on.
+
+Counts, open question IDs and note sources come from the binary index
+manifest (_index.bin) and the last rows of PROGRESS.md. No note or
+question file is read except the few question texts that are printed.
+
+Usage:
+    python scripts/plan_iteration.py
+    python scripts/plan_iteration.py --max-doers 8 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import vault  # noqa: E402
+from manifest import open_fresh  # noqa: E402
+from models import parse_frontmatter  # noqa: E402
+from update_progress import HISTORY_ROW_RE, _find_section  # noqa: E402
+
+MIN_OPEN_QUESTIONS = 3
+ASKER_LOOKBACK = 4
+MIN_NOTES_FOR_CONNECTORS = 6
+SEED_ITERATIONS = 2
+SEED_ASKERS = 3
+MIN_CONNECTORS = 5
+MAX_CONNECTORS = 10
+
+
+def read_history() -> list[tuple[int, str]]:
+    """Return [(iteration, type)] rows from PROGRESS.md, oldest first."""
+    try:
+        lines = vault.PROGRESS_PATH.read_text(encoding="utf-8").splitlines()
+        start, end = _find_section(lines, "## Iteration History")
+    except (OSError, ValueError):
+        return []
+    rows = []
+    for line in lines[start + 1 : end]:
+        match = HISTORY_ROW_RE.match(line.strip())
+        if match:
+            rows.append((int(match.group(1)), match.group(2).strip().lower()))
+    return rows
+
+
+def unexplored_docs(cited: set[str]) -> list[str]:
+    """Return docs/ files that no note cites as its source."""
+    if not vault.DOCS_DIR.exists():
+        return []
+    docs = (
+        p.relative_to(vault.ROOT).as_posix()
+        for p in vault.DOCS_DIR.rglob("*")
+        if p.is_file() and not p.name.startswith(".")
+    )
+    return sorted(d for d in docs if d not in cited)
+
+
+def plan(max_doers: int = 5) -> dict:
+    """Return the dispatch plan as a dict (see --json)."""
+    if (vault.ROOT / "PAUSE.md").exists():
+        return {"paused": True}
+
+    history = read_history()
+    iteration = (history[-1][0] if history else 0) + 1
+
+    index = open_fresh()
+    if index is None:
+        open_ids, notes, cited = [], 0, set()
+    else:
+        with index:
+            open_ids = index.ids("question", "open")
+            notes = index.notes
+            cited = index.sources("note")
+    unexplored = unexplored_docs(cited)
+
+    reasons = []
+    if not history:
+        askers = SEED_ASKERS
+        reasons.append("first iteration: seed the question pool")
+    else:
+        recent = [kind for _, kind in history[-ASKER_LOOKBACK:]]
+        if len(open_ids) < MIN_OPEN_QUESTIONS:
+            reasons.append(f"fewer than {MIN_OPEN_QUESTIONS} open questions")
+        if not any("asker" in kind for kind in recent):
+            reasons.append(f"no asker in the last {ASKER_LOOKBACK} iterations")
+        if unexplored:
+            reasons.append(f"{len(unexplored)} doc(s) not yet cited by any note")
+        askers = 2 if len(open_ids) < MIN_OPEN_QUESTIONS else 1 if reasons else 0
+
+    doer_ids = open_ids[:max_doers] if history else []
+
+    connectors = 0
+    if notes >= MIN_NOTES_FOR_CONNECTORS and iteration > SEED_ITERATIONS:
+        connectors = min(MAX_CONNECTORS, max(MIN_CONNECTORS, notes // 50))
+
+    return {
+        "paused": False,
+        "iteration": iteration,
+        "open_questions": len(open_ids),
+        "notes": notes,
+        "askers": askers,
+        "asker_reasons": reasons,
+        "unexplored_docs": unexplored[:10],
+        "doers": len(doer_ids),
+        "doer_questions": doer_ids,
+        "connectors": connectors,
+    }
+
+
+def _question_text(entry_id: str) -> str:
+    try:
+        text = vault.entry_path(entry_id).read_text(encoding="utf-8")
+        return str(parse_frontmatter(text).get("question", ""))
+    except (OSError, ValueError):
+        return ""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Plan the next orchestrator iteration."
+    )
+    parser.add_argument(
+        "--max-doers", type=int, default=5, help="Most doers to dispatch (default: 5)"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the plan as JSON")
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    result = plan(args.max_doers)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+    if result["paused"]:
+        print("Paused: PAUSE.md exists.")
+        return 0
+
+    print(f"Iteration: {result['iteration']}")
+    print(f"Open questions: {result['open_questions']}  Notes: {result['notes']}")
+    reasons = "; ".join(result["asker_reasons"])
+    print(f"Askers: {result['askers']}" + (f" ({reasons})" if reasons else ""))
+    for doc in result["unexplored_docs"]:
+        print(f"  unexplored: {doc}")
+    print(f"Doers: {result['doers']}")
+    for qid in result["doer_questions"]:
+        print(f"  {qid}  {_question_text(qid)}")
+    print(f"Connectors: {result['connectors']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""Rollups over the question tree formed by `parent:` links.
+
+For every question the `question_tree` table in .ralph/state.db stores:
+
+- `descendants`           — questions below it, at any depth
+- `answered_descendants`  — how many of those are answered
+- `notes`                 — notes answering it or any descendant
+
+update_index.py keeps the table current as files register. A new
+question adds one to `descendants` on each ancestor. The first note
+answering a question marks it answered and adds to `answered_descendants`
+on each ancestor; every note adds to `notes` on the question and its
+ancestors. Each registration is O(depth). The table is built in full from
+the link index the first time it is needed, or on --rebuild.
+
+Usage:
+    python scripts/question_tree.py                 # top-level questions, most open work first
+    python scripts/question_tree.py Q-20260227-051858-705   # one subtree
+    python scripts/question_tree.py --depth 2
+    python scripts/question_tree.py --json
+    python scripts/question_tree.py --rebuild
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import link_index  # noqa: E402
+import vault  # noqa: E402
+from models import parse_frontmatter  # noqa: E402
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS question_tree (
+    id                   TEXT PRIMARY KEY,
+    parent               TEXT,
+    answered             INTEGER NOT NULL DEFAULT 0,
+    own_notes            INTEGER NOT NULL DEFAULT 0,
+    descendants          INTEGER NOT NULL DEFAULT 0,
+    answered_descendants INTEGER NOT NULL DEFAULT 0,
+    notes                INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS question_tree_by_parent ON question_tree (parent);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+_BUILT_KEY = "question_tree_built"
+
+_COLUMNS = "id, parent, answered, own_notes, descendants, answered_descendants, notes"
+
+
+def connect() -> sqlite3.Connection:
+    conn = vault.connect_state()
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _ancestors(conn: sqlite3.Connection, parent: str | None) -> list[str]:
+    """Return the chain of registered ancestors, nearest first."""
+    chain: list[str] = []
+    while parent and parent not in chain:
+        row = conn.execute(
+            "SELECT parent FROM question_tree WHERE id = ?", (parent,)
+        ).fetchone()
+        if row is None:
+            break
+        chain.append(parent)
+        parent = row[0]
+    return chain
+
+
+def _bump(conn: sqlite3.Connection, ids: list[str], column: str, amount: int) -> None:
+    conn.executemany(
+        f"UPDATE question_tree SET {column} = {column} + ? WHERE id = ?",
+        [(amount, i) for i in ids],
+    )
+
+
+def rebuild(conn: sqlite3.Connection) -> int:
+    """Recompute every rollup from the link index. Returns questions counted."""
+    link_index.refresh()
+    questions = [
+        row[0]
+        for row in conn.execute("SELECT id FROM link_files WHERE type = 'question'")
+    ]
+    known = set(questions)
+    # The declared parent is stored even if it is not registered yet, as
+    # add_question() does, so the parent adopts the child when it registers.
+    parent = {
+        src: dst
+        for src, dst in conn.execute("SELECT src, dst FROM links WHERE kind = 'parent'")
+        if src in known
+    }
+    own_notes = dict.fromkeys(questions, 0)
+    for dst, n in conn.execute(
+        "SELECT dst, COUNT(*) FROM links WHERE kind = 'answers' GROUP BY dst"
+    ):
+        if dst in own_notes:
+            own_notes[dst] = n
+
+    stats = {
+        q: [1 if own_notes[q] else 0, own_notes[q], 0, 0, own_notes[q]]
+        for q in questions
+    }
+    for q in questions:
+        answered, _, _, _, notes = stats[q]
+        seen = {q}
+        p = parent.get(q)
+        while p in known and p not in seen:
+            seen.add(p)
+            s = stats[p]
+            s[2] += 1
+            s[3] += answered
+            s[4] += notes
+            p = parent.get(p)
+
+    with conn:
+        conn.execute("DELETE FROM question_tree")
+        conn.executemany(
+            f"INSERT INTO question_tree ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(q, parent.get(q), *stats[q]) for q in questions],
+        )
+        conn.execute("INSERT OR REPLACE INTO meta VALUES (?, '1')", (_BUILT_KEY,))
+    return len(questions)
+
+
+def _is_built(conn: sqlite3.Connection) -> bool:
+    return (
+        conn.execute("SELECT 1 FROM meta WHERE key = ?", (_BUILT_KEY,)).fetchone()
+        is not None
+    )
+
+
+def add_question(conn: sqlite3.Connection, entry_id: str, parent: str | None) -> None:
+    """Insert a newly registered question and update its ancestors."""
+    if conn.execute("SELECT 1 FROM question_tree WHERE id = ?", (entry_id,)).fetchone():
+        return
+    conn.execute(
+        "INSERT INTO question_tree (id, parent) VALUES (?, ?)", (entry_id, parent)
+    )
+    # Children registered before their parent are adopted with their subtrees.
+    desc, answered_desc, notes = conn.execute(
+        "SELECT COALESCE(SUM(descendants + 1), 0),"
+        " COALESCE(SUM(answered_descendants + answered), 0), COALESCE(SUM(notes), 0)"
+        " FROM question_tree WHERE parent = ?",
+        (entry_id,),
+    ).fetchone()
+    # So are notes that answered it before it registered.
+    (own_notes,) = conn.execute(
+        "SELECT COUNT(*) FROM links WHERE kind = 'answers' AND dst = ?", (entry_id,)
+    ).fetchone()
+    answered = 1 if own_notes else 0
+    conn.execute(
+        "UPDATE question_tree SET answered = ?, own_notes = ?, descendants = ?,"
+        " answered_descendants = ?, notes = ? WHERE id = ?",
+        (answered, own_notes, desc, answered_desc, notes + own_notes, entry_id),
+    )
+    ancestors = _ancestors(conn, parent)
+    _bump(conn, ancestors, "descendants", desc + 1)
+    _bump(conn, ancestors, "answered_descendants", answered_desc + answered)
+    _bump(conn, ancestors, "notes", notes + own_notes)
+
+
+def add_note(conn: sqlite3.Connection, question_id: str) -> None:
+    """Count a newly registered note against the question it answers."""
+    row = conn.execute(
+        "SELECT parent FROM question_tree WHERE id = ?", (question_id,)
+    ).fetchone()
+    if row is None:
+        return
+    ancestors = _ancestors(conn, row[0])
+    newly_answered = conn.execute(
+        "UPDATE question_tree SET answered = 1 WHERE id = ? AND answered = 0",
+        (question_id,),
+    ).rowcount
+    conn.execute(
+        "UPDATE question_tree SET own_notes = own_notes + 1, notes = notes + 1"
+        " WHERE id = ?",
+        (question_id,),
+    )
+    _bump(conn, ancestors, "notes", 1)
+    if newly_answered:
+        _bump(conn, ancestors, "answered_descendants", 1)
+
+
+def on_register(entry_type: str, entry_id: str, data: dict) -> None:
+    """Update the rollups for one registered file (called by update_index.py).
+
+    The link index must already include the file, so a first-time build
+    picks it up instead of counting it twice.
+    """
+    conn = connect()
+    try:
+        if not _is_built(conn):
+            rebuild(conn)
+            return
+        with conn:
+            if entry_type == "question":
+                add_question(conn, entry_id, data.get("parent") or None)
+            elif data.get("answers"):
+                add_note(conn, str(data["answers"]))
+    finally:
+        conn.close()
+
+
+def load(conn: sqlite3.Connection) -> dict[str, dict]:
+    """Return {question_id: rollup dict}, building the table if needed.
+
+    `parent` is the declared parent, which may not be registered yet.
+    """
+    if not _is_built(conn):
+        rebuild(conn)
+    rows = conn.execute(f"SELECT {_COLUMNS} FROM question_tree").fetchall()
+    return {
+        row[0]: {
+            "id": row[0],
+            "parent": row[1],
+            "answered": bool(row[2]),
+            "own_notes": row[3],
+            "descendants": row[4],
+            "answered_descendants": row[5],
+            "notes": row[6],
+            "open": row[4] - row[5] + (0 if row[2] else 1),
+        }
+        for row in rows
+    }
+
+
+# ── CLI ──────────────────────────────────────────────────────────────
+
+
+def _question_text(conn: sqlite3.Connection, entry_id: str) -> str:
+    path = link_index.path_of(conn, entry_id)
+    try:
+        return str(
+            parse_frontmatter(path.read_text(encoding="utf-8")).get("question", "")
+        )
+    except (AttributeError, OSError, ValueError):
+        return ""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Show answered/open rollups over the question tree."
+    )
+    parser.add_argument("question", nargs="?", help="Show only this question's subtree")
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=1,
+        help="Levels to print below the roots (default: 1)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print all rollups as JSON")
+    parser.add_argument(
+        "--rebuild", action="store_true", help="Recompute from the link index first"
+    )
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    conn = connect()
+    if args.rebuild:
+        print(f"Rebuilt rollups for {rebuild(conn)} question(s).", file=sys.stderr)
+    tree = load(conn)
+
+    if args.json:
+        print(json.dumps(sorted(tree.values(), key=lambda r: r["id"]), indent=2))
+        conn.close()
+        return 0
+
+    children: dict[str | None, list[str]] = {}
+    for q in tree.values():
+        parent = q["parent"] if q["parent"] in tree else None
+        children.setdefault(parent, []).append(q["id"])
+    for ids in children.values():
+        # Most open work first, then oldest.
+        ids.sort(key=lambda i: (-tree[i]["open"], i))
+
+    if args.question:
+        if args.question not in tree:
+            print(
+                f"Error: {args.question} is not a registered question", file=sys.stderr
+            )
+            conn.close()
+            return 1
+        roots = [args.question]
+    else:
+        roots = children.get(None, [])
+    if not roots:
+        print("No registered questions.")
+
+    def show(entry_id: str, level: int) -> None:
+        q = tree[entry_id]
+        status = "answered" if q["answered"] else "open"
+        total = q["descendants"] + 1
+        print(
+            f"{'  ' * level}{entry_id} [{status}] {q['open']}/{total} open,"
+            f" {q['notes']} note(s)  {_question_text(conn, entry_id)}"
+        )
+        if level < args.depth:
+            for child in children.get(entry_id, []):
+                show(child, level + 1)
+
+    for root in roots:
+        show(root, 0)
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""Regenerate _index.md from the frontmatter of every registered file.
+
+The note and question files are the ground truth. _index.md is derived
+from them, so it can always be rebuilt after a bad hand edit, a
+conflicting write or a partial restore. Only the frontmatter block of each
+file is read, never the body. Files are parsed in chunks across a process
+pool and the results merged in sorted ID order:
+
+- a question is `answered` if any note names it in `answers`, and its
+  Answered By cell is the earliest such note;
+- every note row lists its title, the question it answers, its source
+  and its created timestamp.
+
+Text outside the two tables, such as a rendered Backlinks section, is kept
+as long as the table markers are intact. Otherwise the fresh_start.py
+template is used. The new file is written atomically under the index
+lock, and _index.bin is rebuilt to match.
+
+Usage:
+    python scripts/rebuild_index.py
+    python scripts/rebuild_index.py --check      # exit 1 if _index.md is out of sync
+    python scripts/rebuild_index.py --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent))
+import manifest  # noqa: E402
+import vault  # noqa: E402
+from fresh_start import FRESH_INDEX  # noqa: E402
+
+_READ_SIZE = 4096
+CHUNK_SIZE = 256
+PARALLEL_THRESHOLD = 512
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+# The raw text, since YAML would turn the timestamp into a datetime.
+_CREATED_RE = re.compile(rb"""^created:[ \t]*["']?([^"'\s]+)""", re.MULTILINE)
+
+# Frontmatter written by create_note.py / create_question.py is flat
+# `key: value` lines. Those are read without YAML, which is several times
+# faster; anything less plain falls back to the YAML parser.
+_FIELDS = ("type", "question", "title", "answers", "source")
+_LINE_RE = re.compile(r"^([A-Za-z_][\w-]*): (.+)$")
+_QUOTED_RE = re.compile(r'^"([^"\\]*)"$')
+_PLAIN_RE = re.compile(r"^[A-Za-z][\w./-]*(?: [\w./-]+)*$")
+_YAML_WORDS = frozenset("y n yes no on off true false null".split())
+
+
+def read_frontmatter(path: Path) -> bytes | None:
+    """Return the bytes between the --- delimiters, reading no further."""
+    with path.open("rb") as fh:
+        head = fh.read(_READ_SIZE)
+        if not head.startswith(b"---\n"):
+            return None
+        start = 4
+        while True:
+            end = head.find(b"\n---", start)
+            if end != -1:
+                return head[4:end]
+            more = fh.read(_READ_SIZE)
+            if not more:
+                return None
+            start = max(4, len(head) - 3)
+            head += more
+
+
+def _plain_fields(block: bytes) -> dict | None:
+    """Parse the index fields of flat frontmatter, or None if it needs YAML."""
+    fields: dict[str, str] = {}
+    for line in block.decode("utf-8").split("\n"):
+        match = _LINE_RE.match(line)
+        if match is None:
+            return None  # continuation line, block scalar, nesting, comment...
+        key, value = match.group(1), match.group(2).rstrip()
+        if value[0] in "\"'" and _QUOTED_RE.match(value) is None:
+            return None
+        if value[0] in "[{" and value[-1] not in "]}":
+            return None
+        if value[0] in "|>&*!%@`":
+            return None
+        if key not in _FIELDS:
+            continue
+        quoted = _QUOTED_RE.match(value)
+        if quoted:
+            fields[key] = quoted.group(1)
+        elif _PLAIN_RE.match(value) and value.lower() not in _YAML_WORDS:
+            fields[key] = value
+        else:
+            return None
+    return fields
+
+
+def _cell(value: object) -> str:
+    return "" if value is None else str(value)
+
+
+def _read_entries(paths: list[str]) -> list[tuple]:
+    """Parse a chunk of files into index rows.
+
+    Each result is ("question", id, question, source, created),
+    ("note", id, title, answers, source, created) or ("error", path, message).
+    """
+    results: list[tuple] = []
+    for path_str in paths:
+        path = Path(path_str)
+        try:
+            block = read_frontmatter(path)
+            if block is None:
+                raise ValueError("no valid YAML frontmatter")
+            fm = _plain_fields(block) or yaml.load(block, Loader=_Loader)
+            if not isinstance(fm, dict):
+                raise ValueError("frontmatter must be a YAML mapping")
+        except (OSError, ValueError, yaml.YAMLError) as exc:
+            results.append(("error", path_str, str(exc).splitlines()[0]))
+            continue
+        entry_id = path.stem
+        match = _CREATED_RE.search(block)
+        created = match.group(1).decode("utf-8") if match else ""
+        if fm.get("type") == "question":
+            results.append(
+                (
+                    "question",
+                    entry_id,
+                    _cell(fm.get("question")),
+                    _cell(fm.get("source")),
+                    created,
+                )
+            )
+        else:
+            results.append(
+                (
+                    "note",
+                    entry_id,
+                    _cell(fm.get("title")),
+                    _cell(fm.get("answers")),
+                    _cell(fm.get("source")),
+                    created,
+                )
+            )
+    return results
+
+
+def collect(workers: int | None = None) -> tuple[list[tuple], list[tuple], list[tuple]]:
+    """Read every registered file. Returns (questions, notes, errors), sorted by ID."""
+    paths = sorted(
+        str(p)
+        for p in [*vault.iter_registered("question"), *vault.iter_registered("note")]
+    )
+    chunks = [paths[i : i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+    if len(paths) >= PARALLEL_THRESHOLD and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [r for chunk in pool.map(_read_entries, chunks) for r in chunk]
+    else:
+        results = [r for chunk in chunks for r in _read_entries(chunk)]
+
+    questions, notes, errors = [], [], []
+    for result in results:
+        {"question": questions, "note": notes, "error": errors}[result[0]].append(
+            result
+        )
+    questions.sort(key=lambda r: r[1])
+    notes.sort(key=lambda r: r[1])
+    return questions, notes, errors
+
+
+def _fill(text: str, marker: str, rows: list[str]) -> str:
+    """Replace the table rows that end at `marker` (header and separator kept)."""
+    lines = text.split("\n")
+    end = lines.index(marker)
+    start = end
+    while start > 0 and not lines[start - 1].startswith("|-"):
+        start -= 1
+    return "\n".join(lines[:start] + rows + lines[end:])
+
+
+def render(template: str, questions: list[tuple], notes: list[tuple]) -> str:
+    """Return _index.md for the given rows, in the existing format."""
+    answered_by: dict[str, str] = {}
+    for _, note_id, _, answers, _, _ in notes:  # sorted, so the earliest note wins
+        if answers:
+            answered_by.setdefault(answers, note_id)
+
+    question_rows = []
+    for _, qid, question, source, _ in questions:
+        first = answered_by.get(qid)
+        status = "answered" if first else "open"
+        answered = f"[[{first}]] " if first else ""
+        question_rows.append(
+            f"| [[{qid}]] | {status} | {question} | {source} | {answered}|"
+        )
+
+    note_rows = []
+    for _, note_id, title, answers, source, created in notes:
+        answers_link = f"[[{answers}]]" if answers else ""
+        note_rows.append(
+            f"| [[{note_id}]] | {title} | {answers_link} | {source} | {created} |"
+        )
+
+    text = _fill(template, "<!-- END QUESTIONS -->", question_rows)
+    text = _fill(text, "<!-- END NOTES -->", note_rows)
+    created = [row[-1] for row in [*questions, *notes] if row[-1]]
+    if created:
+        text = re.sub(
+            r"^Last Updated:.*$",
+            f"Last Updated: {max(created)}",
+            text,
+            count=1,
+            flags=re.MULTILINE,
+        )
+    return text
+
+
+def _template(text: str | None) -> str:
+    """The current _index.md if its tables are intact, else the fresh template."""
+    if text is None:
+        return FRESH_INDEX
+    lines = text.split("\n")
+    for marker, header in (
+        ("<!-- END QUESTIONS -->", "| ID | Status |"),
+        ("<!-- END NOTES -->", "| ID | Title |"),
+    ):
+        if marker not in lines or header not in text:
+            return FRESH_INDEX
+        # The separator row must come before the marker.
+        if not any(line.startswith("|-") for line in lines[: lines.index(marker)]):
+            return FRESH_INDEX
+    return text
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Regenerate _index.md from the frontmatter of registered files."
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only report whether _index.md matches the files (exit 1 if not)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count)",
+    )
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    questions, notes, errors = collect(args.workers)
+    for _, path_str, message in errors:
+        rel = Path(path_str).relative_to(vault.ROOT).as_posix()
+        print(f"Skipped {rel}: {message}", file=sys.stderr)
+
+    with vault.lock("index"):
+        current = (
+            vault.INDEX_PATH.read_text(encoding="utf-8")
+            if vault.INDEX_PATH.exists()
+            else None
+        )
+        text = render(_template(current), questions, notes)
+        if args.check:
+            in_sync = current == text
+            print(
+                "_index.md is in sync with the files."
+                if in_sync
+                else "_index.md is out of sync; run rebuild_index.py to regenerate it."
+            )
+            return 0 if in_sync else 1
+        vault.atomic_write(vault.INDEX_PATH, text)
+        manifest.refresh_manifest(vault.INDEX_PATH, vault.MANIFEST_PATH)
+
+    print(
+        f"Rebuilt _index.md: {len(questions)} question(s), {len(notes)} note(s),"
+        f" {len(errors)} skipped."
+    )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
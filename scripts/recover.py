@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Finish or undo registrations interrupted by a killed process.
+
+update_index.py journals each registration step in .ralph/journal/ before
+taking it (see journal.py). This reads only the journals left by dead
+processes. Files claimed but not yet given an ID are put back under their
+original names. Files that already have an ID are renamed, added to
+_index.md and added to the link index, as far as each step is missing.
+Running processes' journals are left alone.
+
+update_index.py runs the same recovery every time it starts, so this is
+only needed to inspect the journal or to recover without registering.
+
+Usage:
+    python scripts/recover.py
+    python scripts/recover.py --status
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import journal  # noqa: E402
+import vault  # noqa: E402
+from update_index import recover_journals  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Recover registrations interrupted by a killed process."
+    )
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="List journals and their in-flight files without changing anything",
+    )
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    if args.status:
+        journals = journal.status()
+        if not journals:
+            print("No journals: nothing is in flight.")
+        for path, running, incomplete in journals:
+            state = "running" if running else f"interrupted, {incomplete} in flight"
+            print(f"{path.relative_to(vault.ROOT)}: {state}")
+        return 0
+
+    actions = recover_journals()
+    for line in actions:
+        print(line)
+    print(f"Recovered {len(actions)} step(s)." if actions else "Nothing to recover.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
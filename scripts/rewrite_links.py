@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Rewrite or remove wikilinks across the vault in a single batched pass.
+
+Takes a mapping of old IDs to new IDs (or to nothing, for removal) and
+applies it to every file that references an old ID. Affected files are
+found through the link index, so untouched files are never read. Each
+file is rewritten atomically, and large batches are spread over a
+process pool.
+
+Removal never deletes prose:
+
+- in the `## Related` section, a list item that starts with the link
+  (`- [[ID]] - description`) is deleted as a whole line, and a
+  `## Related` heading left with no items is dropped
+- everywhere else, `[[ID]]` is replaced by the plain ID, so the sentence
+  around it stays intact
+
+Remapping also updates `answers:` and `parent:` frontmatter fields, and a
+link that a remap turns into a self-link or a duplicate Related item is
+removed. _index.md is not modified.
+
+Usage:
+    python scripts/rewrite_links.py --map NOTE-A=NOTE-B --map NOTE-C=NOTE-B
+    python scripts/rewrite_links.py --remove NOTE-D
+    python scripts/rewrite_links.py --map-file merges.txt   # "OLD NEW" or "OLD" per line
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import link_index  # noqa: E402
+import vault  # noqa: E402
+
+_ENTRY_ID_RE = re.compile(r"^(?:NOTE|Q)-\d{8}-\d{6}-\d{3}$")
+_FRONTMATTER_RE = re.compile(r"^---\n.+?\n---", re.DOTALL)
+_LIST_ITEM_LINK_RE = re.compile(r"^[ \t]*[-*+][ \t]+\[\[([^\]]+)\]\]", re.MULTILINE)
+_EMPTY_RELATED_RE = re.compile(
+    r"\n*^## Related[ \t]*\n(?:[ \t]*\n)*(?=^#|\Z)", re.MULTILINE
+)
+
+# Below this many files a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 64
+
+
+def _alternation(ids: list[str]) -> str:
+    return "(?:" + "|".join(re.escape(i) for i in sorted(ids)) + ")"
+
+
+def _remove_links(text: str, ids: list[str]) -> str:
+    alt = _alternation(ids)
+    item_re = re.compile(rf"^[ \t]*[-*+][ \t]+\[\[{alt}\]\]")
+    link_re = re.compile(rf"\[\[({alt})\]\]")
+    in_related = False
+    kept = []
+    for line in text.split("\n"):
+        if line.startswith("#"):
+            in_related = line.strip() == "## Related"
+        elif in_related and item_re.match(line):
+            continue
+        kept.append(link_re.sub(r"\1", line))
+    text = "\n".join(kept)
+    # Keep a blank line before the heading that follows a dropped section.
+    return _EMPTY_RELATED_RE.sub(
+        lambda m: "\n" if m.end() == len(text) else "\n\n", text
+    )
+
+
+def _dedupe_related(text: str) -> str:
+    """Drop Related-section items whose leading link repeats an earlier item's."""
+    seen: set[str] = set()
+    in_related = False
+    kept = []
+    for line in text.split("\n"):
+        if line.startswith("#"):
+            in_related = line.strip() == "## Related"
+        elif in_related:
+            m = _LIST_ITEM_LINK_RE.match(line)
+            if m:
+                if m.group(1) in seen:
+                    continue
+                seen.add(m.group(1))
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def rewrite_text(
+    text: str, mapping: dict[str, str | None], own_id: str | None = None
+) -> str:
+    """Apply an old-ID → new-ID (or None) mapping to one file's text."""
+    present = [old for old in mapping if old in text]
+    if not present:
+        return text
+
+    # A remap that points back at this file would create a self-link.
+    removals = [old for old in present if mapping[old] in (None, own_id)]
+    remaps = {old: mapping[old] for old in present if old not in removals}
+
+    if removals:
+        text = _remove_links(text, removals)
+
+    if remaps:
+        # Two-phase replace through sentinels so chained mappings
+        # (A→B, B→C) are applied exactly once, as a single pass would.
+        for i, old in enumerate(remaps):
+            text = text.replace(f"[[{old}]]", f"[[\x00{i}\x00]]")
+        for i, new in enumerate(remaps.values()):
+            text = text.replace(f"[[\x00{i}\x00]]", f"[[{new}]]")
+
+        fm = _FRONTMATTER_RE.match(text)
+        if fm:
+            header = fm.group(0)
+            alt = _alternation(list(remaps))
+            new_header = re.sub(
+                rf'^((?:answers|parent):[ \t]*"?)({alt})("?)[ \t]*$',
+                lambda m: m.group(1) + remaps[m.group(2)] + m.group(3),
+                header,
+                flags=re.MULTILINE,
+            )
+            text = new_header + text[len(header) :]
+        text = _dedupe_related(text)
+
+    return text
+
+
+def rewrite_file(
+    path: Path, mapping: dict[str, str | None], own_id: str | None = None
+) -> bool:
+    """Rewrite one file in place (atomically). Returns True if it changed."""
+    text = path.read_text(encoding="utf-8")
+    new_text = rewrite_text(text, mapping, own_id)
+    if new_text == text:
+        return False
+    vault.atomic_write(path, new_text)
+    return True
+
+
+def _rewrite_job(job: tuple[str, str, dict[str, str | None]]) -> str | None:
+    path, own_id, mapping = job
+    return path if rewrite_file(Path(path), mapping, own_id) else None
+
+
+def affected_files(mapping: dict[str, str | None]) -> list[tuple[Path, str, dict]]:
+    """Return [(path, own_id, sub_mapping)] for files that reference any old ID."""
+    link_index.refresh()
+    conn = link_index.connect()
+    per_src: dict[str, dict[str, str | None]] = {}
+    olds = list(mapping)
+    for start in range(0, len(olds), 500):
+        chunk = olds[start : start + 500]
+        marks = ",".join("?" * len(chunk))
+        for src, dst in conn.execute(
+            f"SELECT DISTINCT src, dst FROM links WHERE dst IN ({marks})", chunk
+        ):
+            per_src.setdefault(src, {})[dst] = mapping[dst]
+
+    jobs = []
+    for src in sorted(per_src):
+        path = link_index.path_of(conn, src)
+        if path is not None and path.is_file():
+            jobs.append((path, src, per_src[src]))
+    conn.close()
+    return jobs
+
+
+def rewrite_references(
+    mapping: dict[str, str | None], workers: int | None = None
+) -> list[Path]:
+    """Apply the mapping across the vault. Returns the paths that changed."""
+    jobs = [(str(p), own, sub) for p, own, sub in affected_files(mapping)]
+    if len(jobs) < PARALLEL_THRESHOLD or workers == 1:
+        results = [_rewrite_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_rewrite_job, jobs, chunksize=32))
+
+    changed = [Path(p) for p in results if p is not None]
+    if changed:
+        link_index.refresh(changed)
+    return changed
+
+
+# ── CLI ──────────────────────────────────────────────────────────────
+
+
+def _parse_mapping(
+    pairs: list[str], removals: list[str], map_file: Path | None
+) -> dict[str, str | None]:
+    mapping: dict[str, str | None] = {}
+    lines: list[list[str]] = [p.split("=", 1) for p in pairs]
+    lines += [[r] for r in removals]
+    if map_file is not None:
+        for raw in map_file.read_text(encoding="utf-8").splitlines():
+            parts = raw.split("#", 1)[0].split()
+            if parts:
+                lines.append(parts)
+
+    for parts in lines:
+        if len(parts) > 2:
+            raise ValueError(f"expected 'OLD NEW' or 'OLD', got {' '.join(parts)!r}")
+        old = parts[0].strip()
+        new = parts[1].strip() if len(parts) == 2 and parts[1].strip() else None
+        for value in (old, new):
+            if value is not None and not _ENTRY_ID_RE.match(value):
+                raise ValueError(f"not a valid note or question ID: {value!r}")
+        if old == new:
+            raise ValueError(f"{old} is mapped to itself")
+        mapping[old] = new
+    return mapping
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Batch-rewrite or remove wikilinks across the vault."
+    )
+    parser.add_argument(
+        "--map",
+        action="append",
+        default=[],
+        metavar="OLD=NEW",
+        help="Rewrite links to OLD as links to NEW (repeatable)",
+    )
+    parser.add_argument(
+        "--remove",
+        action="append",
+        default=[],
+        metavar="ID",
+        help="Remove links to ID (repeatable)",
+    )
+    parser.add_argument(
+        "--map-file",
+        type=Path,
+        default=None,
+        help="File with one 'OLD NEW' (remap) or 'OLD' (remove) per line",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Process pool size (default: CPUs)"
+    )
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    try:
+        mapping = _parse_mapping(args.map, args.remove, args.map_file)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    if not mapping:
+        parser.error("give at least one --map, --remove or --map-file entry")
+
+    changed = rewrite_references(mapping, args.workers)
+    for path in changed:
+        print(f"Rewrote {path.relative_to(vault.ROOT)}")
+    print(f"Done: {len(changed)} file(s) rewritten for {len(mapping)} ID(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Run bookkeeping scripts for several vaults in parallel.
+
+A vault is any directory laid out like this checkout: notes/,
+notes/questions/, docs/, _index.md and PROGRESS.md. Every script takes
+--vault PATH (or the RALPH_VAULT environment variable) and then keeps
+its caches, state database and locks in that vault's .ralph/ directory.
+Vaults therefore share nothing and never contend on a file.
+
+Each vault gets its own worker. The worker runs the commands one after
+another with RALPH_VAULT set, and prefixes every output line with the
+vault's name. By default the commands are update_index.py followed by
+validate_references.py. Anything after `--` replaces them with a single
+script and its arguments.
+
+Usage:
+    python scripts/run_vaults.py ~/research/llm ~/research/storage
+    python scripts/run_vaults.py --init ~/research/new-topic
+    python scripts/run_vaults.py ~/research/* -- update_index.py --watch
+    python scripts/run_vaults.py ~/research/* -- graph_stats.py --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import vault  # noqa: E402
+from fresh_start import (  # noqa: E402
+    FRESH_INDEX,
+    FRESH_PROGRESS,
+    FRESH_RESEARCH_QUESTIONS,
+)
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+DEFAULT_COMMANDS = [["update_index.py"], ["validate_references.py"]]
+
+_print_lock = threading.Lock()
+
+
+def init_vault(root: Path) -> list[str]:
+    """Create any missing parts of a vault skeleton. Returns what was created."""
+    created = []
+    for rel in ("notes/questions", "docs"):
+        if not (root / rel).is_dir():
+            (root / rel).mkdir(parents=True)
+            created.append(f"{rel}/")
+    for name, text in (
+        ("_index.md", FRESH_INDEX),
+        ("PROGRESS.md", FRESH_PROGRESS),
+        ("research-questions.md", FRESH_RESEARCH_QUESTIONS),
+    ):
+        if not (root / name).exists():
+            vault.atomic_write(root / name, text)
+            created.append(name)
+    return created
+
+
+def is_vault(root: Path) -> bool:
+    return (root / "_index.md").is_file() and (root / "notes").is_dir()
+
+
+def _emit(prefix: str, line: str, stream) -> None:
+    with _print_lock:
+        stream.write(f"[{prefix}] {line}")
+        if not line.endswith("\n"):
+            stream.write("\n")
+        stream.flush()
+
+
+def run_vault(root: Path, commands: list[list[str]], results: dict[Path, int]) -> None:
+    """Run each command against one vault, stopping at the first failure."""
+    env = {**os.environ, vault.VAULT_ENV: str(root), "PYTHONUNBUFFERED": "1"}
+    prefix = root.name
+    code = 0
+    for command in commands:
+        script, *args = command
+        proc = subprocess.Popen(
+            [sys.executable, str(SCRIPTS_DIR / script), *args],
+            env=env,
+            cwd=root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        for line in proc.stdout:
+            _emit(prefix, line, sys.stdout)
+        code = proc.wait()
+        if code != 0:
+            _emit(prefix, f"{script} exited with status {code}", sys.stderr)
+            break
+    results[root] = code
+
+
+def main() -> int:
+    argv = sys.argv[1:]
+    command: list[str] = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, command = argv[:split], argv[split + 1 :]
+
+    parser = argparse.ArgumentParser(
+        description="Run bookkeeping scripts for several vaults in parallel.",
+        epilog="Arguments after -- name one script in scripts/ and its arguments.",
+    )
+    parser.add_argument("vaults", nargs="+", type=Path, help="Vault root directories")
+    parser.add_argument(
+        "--init", action="store_true", help="Create missing vault files first"
+    )
+    args = parser.parse_args(argv)
+
+    if command and not (SCRIPTS_DIR / command[0]).is_file():
+        print(f"Error: no such script: scripts/{command[0]}", file=sys.stderr)
+        return 1
+    commands = [command] if command else DEFAULT_COMMANDS
+
+    roots = list(dict.fromkeys(p.expanduser().resolve() for p in args.vaults))
+    names = [r.name for r in roots]
+    if len(set(names)) != len(names):
+        print(
+            "Warning: vault names repeat; output prefixes are ambiguous",
+            file=sys.stderr,
+        )
+
+    for root in roots:
+        if args.init:
+            for item in init_vault(root):
+                print(f"[{root.name}] created {item}")
+        if not is_vault(root):
+            print(
+                f"Error: {root} is not a vault (use --init to create one)",
+                file=sys.stderr,
+            )
+            return 1
+
+    results: dict[Path, int] = {}
+    threads = [
+        threading.Thread(target=run_vault, args=(root, commands, results), daemon=True)
+        for root in roots
+    ]
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            t.join()
+    except KeyboardInterrupt:
+        # Children share the terminal's process group and get the interrupt too.
+        print("\nStopped.", file=sys.stderr)
+        return 130
+
+    failed = [root for root in roots if results.get(root, 1) != 0]
+    if len(roots) > 1:
+        print(f"{len(roots) - len(failed)}/{len(roots)} vault(s) succeeded.")
+    for root in failed:
+        print(f"Failed: {root}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""Load-test the bookkeeping scripts with a simulated agent fleet.
+
+No model is called. Worker processes stand in for the subagents and run
+the same scripts they would, in the same order, against a throwaway
+vault:
+
+- askers run create_question.py 1-3 times, sometimes with --parent, and
+  then update_index.py;
+- doers pick a registered question and run create_note.py once or twice,
+  sometimes with --related;
+- connectors run assign_note_batch.py, add wikilinks between the notes
+  they got, and then run backlinks.py --refresh;
+- one orchestrator runs plan_iteration.py and update_progress.py once
+  per round.
+
+Between calls each worker sleeps for a log-normally distributed think
+time. The median think time of each role is scaled by --time-scale, so
+the same mix can run at agent speed (1.0) or as a stress test (0.0).
+
+Afterwards the vault is checked:
+
+- no files were left unregistered, claimed or journaled;
+- no ID was issued twice and every issued ID has its file;
+- _index.md has exactly the rows rebuild_index.py derives from the files,
+  so none were lost or duplicated and every answered question names
+  its earliest note;
+- validate_references.py passes;
+- PROGRESS.md numbers its iterations 1..n with no gaps or repeats.
+
+Some failures are expected when agents race. A file can be skipped
+because another update_index.py run is registering it, and
+assign_note_batch.py can find no notes. Those calls are reported as
+skipped. The run then reports throughput and per-script latency. It exits
+1 if any check fails or any call failed unexpectedly, and keeps the vault
+for inspection.
+
+Usage:
+    python scripts/simulate_fleet.py              # 2 askers, 4 doers, 2 connectors
+    python scripts/simulate_fleet.py --doers 16 --rounds 10 --time-scale 0
+    python scripts/simulate_fleet.py --json --keep
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import journal  # noqa: E402
+import rebuild_index  # noqa: E402
+import vault  # noqa: E402
+from plan_iteration import read_history  # noqa: E402
+from run_vaults import init_vault  # noqa: E402
+from update_index import find_unregistered_files  # noqa: E402
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# Median seconds a real agent spends between script calls.
+THINK_SECONDS = {"asker": 20.0, "doer": 45.0, "connector": 30.0, "orchestrator": 10.0}
+THINK_SIGMA = 0.6
+
+# Every stderr line of a failed call matching one of these means it was skipped.
+EXPECTED_FAILURES = [
+    re.compile(r"^Skipped \S+: already being registered$"),
+    re.compile(r"^No registered notes found\.$"),
+]
+
+WORDS = (
+    "cache index shard token lock queue latency replica schema parser "
+    "budget vector graph batch journal manifest snapshot cluster"
+).split()
+
+
+# ── Workers ──────────────────────────────────────────────────────────
+
+
+class _Agent:
+    """One simulated agent: runs scripts and records what they cost."""
+
+    def __init__(self, role: str, number: int, seed: int, time_scale: float) -> None:
+        self.name = f"{role}-{number}"
+        self.role = role
+        self.rng = random.Random(f"{seed}-{self.name}")
+        self.time_scale = time_scale
+        self.calls: list[dict] = []
+
+    def think(self) -> None:
+        median = THINK_SECONDS[self.role] * self.time_scale
+        if median > 0:
+            time.sleep(self.rng.lognormvariate(math.log(median), THINK_SIGMA))
+
+    def run(self, script: str, *args: str) -> tuple[bool, str]:
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / script), *args],
+            cwd=vault.ROOT,  # agents run from the vault root
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+        )
+        stderr = [line for line in proc.stderr.splitlines() if line.strip()]
+        self.calls.append(
+            {
+                "agent": self.name,
+                "script": script,
+                "seconds": time.perf_counter() - start,
+                "ok": proc.returncode == 0,
+                "skipped": proc.returncode != 0
+                and bool(stderr)
+                and all(
+                    any(p.match(line) for p in EXPECTED_FAILURES) for line in stderr
+                ),
+                "error": (stderr or [""])[-1] if proc.returncode else "",
+                "ids": [
+                    line.split(":", 1)[1].strip()
+                    for line in proc.stdout.splitlines()
+                    if line.startswith("ID:")
+                ],
+            }
+        )
+        return proc.returncode == 0, proc.stdout
+
+    def phrase(self, words: int) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(words))
+
+    def pick(self, entry_type: str, k: int = 1) -> list[str]:
+        ids = [p.stem for p in vault.iter_registered(entry_type)]
+        return self.rng.sample(ids, min(k, len(ids)))
+
+    # One session of each role.
+
+    def asker(self) -> None:
+        for _ in range(self.rng.randint(1, 3)):
+            args = ["--question", f"How does the {self.phrase(3)} work?"]
+            if self.rng.random() < 0.3:
+                parent = self.pick("question")
+                if parent:
+                    args += ["--parent", parent[0]]
+            self.run("create_question.py", *args)
+            self.think()
+        self.run("update_index.py")
+
+    def doer(self) -> None:
+        question = self.pick("question")
+        if not question:
+            return
+        for _ in range(self.rng.randint(1, 2)):
+            self.think()
+            args = [
+                "--title", self.phrase(4).capitalize(),
+                "--answers", question[0],
+                "--source", "docs/simulated.md",
+                "--tags", ",".join(self.rng.sample(WORDS, 2)),
+                "--body", " ".join(self.phrase(12) for _ in range(3)),
+            ]  # fmt: skip
+            related = self.pick("note") if self.rng.random() < 0.3 else []
+            if related:
+                args += ["--related", f"{related[0]}: related"]
+            self.run("create_note.py", *args)
+
+    def connector(self) -> None:
+        ok, out = self.run("assign_note_batch.py", "--size", "3")
+        paths = [vault.ROOT / line.strip() for line in out.splitlines() if line.strip()]
+        if not ok or len(paths) < 2:
+            return
+        self.think()
+        for path in paths:
+            other = self.rng.choice([p for p in paths if p != path])
+            start = time.perf_counter()
+            try:
+                text = path.read_text(encoding="utf-8")
+            except OSError:
+                continue
+            if f"[[{other.stem}]]" not in text:
+                if "## Related" not in text:
+                    text = text.rstrip("\n") + "\n\n## Related\n"
+                text = text.rstrip("\n") + f"\n- [[{other.stem}]] - simulated link\n"
+                vault.atomic_write(path, text)
+            self.calls.append(
+                {
+                    "agent": self.name,
+                    "script": "(edit note)",
+                    "seconds": time.perf_counter() - start,
+                    "ok": True,
+                    "skipped": False,
+                    "error": "",
+                    "ids": [],
+                }
+            )
+        rel = [p.relative_to(vault.ROOT).as_posix() for p in paths]
+        self.run("backlinks.py", "--refresh", *rel)
+
+    def orchestrator(self, round_number: int) -> None:
+        self.run("plan_iteration.py", "--json")
+        self.think()
+        self.run(
+            "update_progress.py",
+            "--type", "Simulated",
+            "--target", f"round {round_number}",
+            "--result", "Simulated fleet round",
+        )  # fmt: skip
+
+
+def _work(
+    role: str, number: int, rounds: int, seed: int, time_scale: float
+) -> list[dict]:
+    """Run one agent for `rounds` sessions. Returns its call records."""
+    agent = _Agent(role, number, seed, time_scale)
+    for round_number in range(1, rounds + 1):
+        agent.think()
+        if role == "orchestrator":
+            agent.orchestrator(round_number)
+        else:
+            getattr(agent, role)()
+    return agent.calls
+
+
+# ── Checks ───────────────────────────────────────────────────────────
+
+
+_ANSWERED_RE = re.compile(
+    r"^\| \[\[(Q-[^\]]+)\]\] \| answered \|.*\| (?:\[\[([^\]]+)\]\] )?\|$"
+)
+
+
+def _row_key(line: str) -> str:
+    """An index row without a question's Answered By cell."""
+    return re.sub(r"\| [^|]*\|$", "|", line) if line.startswith("| [[Q-") else line
+
+
+def _rows(index_text: str) -> Counter:
+    lines = index_text.split("\n")
+    return Counter(_row_key(line) for line in lines if line.startswith("| [["))
+
+
+def check_vault(issued: list[str]) -> list[str]:
+    """Return a description of every broken invariant."""
+    problems: list[str] = []
+
+    leftovers = [
+        p.relative_to(vault.ROOT).as_posix() for p in find_unregistered_files()
+    ]
+    leftovers += [
+        p.relative_to(vault.ROOT).as_posix()
+        for p in vault.NOTES_DIR.rglob(".*")
+        if p.is_file() and p.name != ".layout"
+    ]
+    if leftovers:
+        problems.append(f"{len(leftovers)} file(s) left unregistered: {leftovers[:5]}")
+    if journal.status():
+        problems.append(f"{len(journal.status())} journal(s) left in .ralph/journal/")
+
+    duplicates = [i for i, n in Counter(issued).items() if n > 1]
+    if duplicates:
+        problems.append(f"{len(duplicates)} ID(s) issued twice: {duplicates[:5]}")
+    missing = [i for i in set(issued) if not vault.entry_path(i).exists()]
+    if missing:
+        problems.append(
+            f"{len(missing)} issued ID(s) have no file: {sorted(missing)[:5]}"
+        )
+
+    questions, notes, errors = rebuild_index.collect()
+    if errors:
+        problems.append(f"{len(errors)} registered file(s) unreadable")
+    current = vault.INDEX_PATH.read_text(encoding="utf-8")
+    expected = rebuild_index.render(current, questions, notes)
+    # Concurrent doers can register a question's notes out of ID order, so
+    # Answered By may name any note that answers it, not just the earliest.
+    have, want = _rows(current), _rows(expected)
+    lost, extra = want - have, have - want
+    if lost:
+        problems.append(
+            f"{sum(lost.values())} index row(s) lost or stale: {list(lost)[:3]}"
+        )
+    if extra:
+        problems.append(f"{sum(extra.values())} unexpected row(s): {list(extra)[:3]}")
+    answers = {note[1]: note[3] for note in notes}
+    unlinked = [
+        match.group(1)
+        for match in map(_ANSWERED_RE.match, current.split("\n"))
+        if match and answers.get(match.group(2) or "") != match.group(1)
+    ]
+    if unlinked:
+        problems.append(
+            f"{len(unlinked)} answered question(s) not linked to a note answering them:"
+            f" {unlinked[:5]}"
+        )
+
+    proc = subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / "validate_references.py")],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode:
+        problems.append("validate_references.py failed:\n" + proc.stdout.strip())
+
+    iterations = [n for n, _ in read_history()]
+    if iterations != list(range(1, len(iterations) + 1)):
+        problems.append(f"PROGRESS.md iterations are not 1..n: {iterations}")
+    return problems
+
+
+# ── Report ───────────────────────────────────────────────────────────
+
+
+def summarise(calls: list[dict], wall: float) -> dict:
+    by_script: dict[str, list[dict]] = {}
+    for call in calls:
+        by_script.setdefault(call["script"], []).append(call)
+
+    def pct(values: list[float], q: float) -> float:
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    scripts = {}
+    for script, rows in sorted(by_script.items()):
+        seconds = sorted(r["seconds"] for r in rows)
+        scripts[script] = {
+            "calls": len(rows),
+            "errors": sum(not r["ok"] and not r["skipped"] for r in rows),
+            "skipped": sum(r["skipped"] for r in rows),
+            "p50_ms": round(statistics.median(seconds) * 1000, 1),
+            "p95_ms": round(pct(seconds, 0.95) * 1000, 1),
+            "max_ms": round(seconds[-1] * 1000, 1),
+        }
+    registered = sum(len(c["ids"]) for c in calls)
+    return {
+        "wall_seconds": round(wall, 2),
+        "calls": len(calls),
+        "calls_per_second": round(len(calls) / wall, 2) if wall else 0.0,
+        "registered": registered,
+        "registered_per_second": round(registered / wall, 2) if wall else 0.0,
+        "scripts": scripts,
+        "errors": sorted(
+            {
+                f"{c['script']}: {c['error']}"
+                for c in calls
+                if not c["ok"] and not c["skipped"]
+            }
+        ),
+        "unexpected_errors": sum(not c["ok"] and not c["skipped"] for c in calls),
+        "skipped": sum(c["skipped"] for c in calls),
+    }
+
+
+def print_report(summary: dict, problems: list[str]) -> None:
+    print(
+        f"Wall time: {summary['wall_seconds']}s  Calls: {summary['calls']}"
+        f" ({summary['calls_per_second']}/s)  Registered: {summary['registered']}"
+        f" ({summary['registered_per_second']}/s)"
+    )
+    print(f"\n{'script':<24}{'calls':>7}{'errors':>8}{'skipped':>9}", end="")
+    print(f"{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for script, s in summary["scripts"].items():
+        print(
+            f"{script:<24}{s['calls']:>7}{s['errors']:>8}{s['skipped']:>9}"
+            f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['max_ms']:>10}"
+        )
+    for error in summary["errors"]:
+        print(f"  error: {error}")
+    print()
+    if problems:
+        print("Invariant violations:")
+        for problem in problems:
+            print(f"  - {problem}")
+    else:
+        print("All invariants hold.")
+    if summary["unexpected_errors"]:
+        print(f"{summary['unexpected_errors']} call(s) failed unexpectedly.")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Stress-test the bookkeeping scripts with simulated agents."
+    )
+    parser.add_argument(
+        "--askers", type=int, default=2, help="Asker workers (default: 2)"
+    )
+    parser.add_argument(
+        "--doers", type=int, default=4, help="Doer workers (default: 4)"
+    )
+    parser.add_argument(
+        "--connectors", type=int, default=2, help="Connector workers (default: 2)"
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=5, help="Sessions per worker (default: 5)"
+    )
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=0.01,
+        help="Multiplier on agent think times; 0 disables them (default: 0.01)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument(
+        "--keep", action="store_true", help="Keep the temporary vault afterwards"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="ralph-fleet-"))
+    init_vault(root)
+    vault.use(root)  # exported as RALPH_VAULT, so every worker and script uses it
+
+    jobs = [("orchestrator", 1)]
+    for role, count in (
+        ("asker", args.askers),
+        ("doer", args.doers),
+        ("connector", args.connectors),
+    ):
+        jobs += [(role, n) for n in range(1, count + 1)]
+
+    # Seed the vault so doers and connectors have work from the start.
+    asker = _Agent("asker", 0, args.seed, 0.0)
+    asker.asker()
+    doer = _Agent("doer", 0, args.seed, 0.0)
+    for _ in range(5):
+        if len(list(vault.iter_registered("note"))) >= 3:
+            break
+        doer.doer()
+    calls = [*asker.calls, *doer.calls]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = [
+            pool.submit(_work, role, n, args.rounds, args.seed, args.time_scale)
+            for role, n in jobs
+        ]
+        for future in futures:
+            calls.extend(future.result())
+    wall = time.perf_counter() - start
+
+    issued = [i for call in calls for i in call["ids"]]
+    problems = check_vault(issued)
+    summary = summarise(calls, wall)
+    summary["vault"] = str(root)
+    summary["workers"] = {role: n for role, n in Counter(r for r, _ in jobs).items()}
+    summary["problems"] = problems
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary, problems)
+
+    failed = bool(problems or summary["unexpected_errors"])
+    if args.keep or failed:
+        print(f"Vault kept at {root}", file=sys.stderr)
+    else:
+        shutil.rmtree(root, ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""Take point-in-time snapshots of the vault and restore them in seconds.
+
+A snapshot is a small JSON manifest mapping every file in notes/, plus
+_index.md and PROGRESS.md, to the SHA-256 of its contents. File contents
+are stored once in a content-addressed object store under
+.ralph/snapshots/objects/, so a snapshot only copies files that changed
+since the previous one. Unchanged files are detected by size and mtime
+and are not even re-read.
+
+Restoring rewrites only the files whose contents differ from the snapshot
+and deletes files that did not exist when it was taken. A safety snapshot
+of the current state is always taken first, so a restore can be undone.
+The state derived from notes in .ralph/ (link index, question tree, tag
+index, TF-IDF stores) and _index.bin is then rebuilt or dropped, so
+queries never answer from the pre-restore vault.
+
+Usage:
+    python scripts/snapshot.py create [--name before-iteration-12]
+    python scripts/snapshot.py list
+    python scripts/snapshot.py restore NAME
+    python scripts/snapshot.py prune --keep 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import link_index  # noqa: E402
+import question_tree  # noqa: E402
+import tags  # noqa: E402
+import vault  # noqa: E402
+
+_NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,79}$")
+
+
+def snapshots_dir() -> Path:
+    return vault.STATE_DIR / "snapshots"
+
+
+def objects_dir() -> Path:
+    return snapshots_dir() / "objects"
+
+
+def manifests_dir() -> Path:
+    return snapshots_dir() / "manifests"
+
+
+def object_path(digest: str) -> Path:
+    return objects_dir() / digest[:2] / digest
+
+
+def tracked_files() -> list[Path]:
+    """Return every file covered by a snapshot: notes/ (recursive), _index.md, PROGRESS.md."""
+    files = [p for p in (vault.INDEX_PATH, vault.PROGRESS_PATH) if p.is_file()]
+    if vault.NOTES_DIR.exists():
+        files.extend(p for p in vault.NOTES_DIR.rglob("*") if p.is_file())
+    return sorted(files)
+
+
+def _relpath(path: Path) -> str:
+    return path.relative_to(vault.ROOT).as_posix()
+
+
+def _default_name() -> str:
+    now = datetime.now(timezone.utc)
+    return now.strftime("%Y%m%d-%H%M%S-") + f"{now.microsecond // 1000:03d}"
+
+
+def list_manifests() -> list[dict]:
+    """Return all snapshot manifests, oldest first."""
+    if not manifests_dir().exists():
+        return []
+    manifests = [
+        json.loads(p.read_text(encoding="utf-8"))
+        for p in manifests_dir().glob("*.json")
+    ]
+    return sorted(manifests, key=lambda m: m["created"])
+
+
+def _check_name(name: str) -> None:
+    if not _NAME_RE.match(name):
+        raise ValueError(
+            "snapshot name must be 1-80 characters of letters, digits, '.', '_' or '-'"
+        )
+
+
+def load_manifest(name: str) -> dict:
+    _check_name(name)
+    path = manifests_dir() / f"{name}.json"
+    if not path.exists():
+        raise ValueError(f"No snapshot named '{name}'")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _store_object(path: Path, digest: str) -> None:
+    """Copy a file into the object store unless its digest is already stored."""
+    dest = object_path(digest)
+    if dest.exists():
+        return
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{digest}.tmp-{uuid.uuid4().hex[:8]}")
+    shutil.copyfile(path, tmp)
+    tmp.replace(dest)
+
+
+def create_snapshot(name: str | None = None) -> dict:
+    """Record the current vault state and return the written manifest."""
+    name = name or _default_name()
+    _check_name(name)
+    manifest_path = manifests_dir() / f"{name}.json"
+    if manifest_path.exists():
+        raise ValueError(f"Snapshot '{name}' already exists")
+
+    # Reuse digests from the newest snapshot for files whose size and mtime
+    # are unchanged, so an idle vault snapshots without reading any content.
+    previous = list_manifests()
+    known = previous[-1]["files"] if previous else {}
+
+    files: dict[str, dict] = {}
+    copied = 0
+    for path in tracked_files():
+        rel = _relpath(path)
+        st = path.stat()
+        prior = known.get(rel)
+        if (
+            prior
+            and prior["size"] == st.st_size
+            and prior["mtime_ns"] == st.st_mtime_ns
+            and object_path(prior["sha256"]).exists()
+        ):
+            digest = prior["sha256"]
+        else:
+            digest = vault.file_digest(path)
+            if not object_path(digest).exists():
+                _store_object(path, digest)
+                copied += 1
+        files[rel] = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    manifest = {
+        "name": name,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "copied": copied,
+        "files": files,
+    }
+    manifests_dir().mkdir(parents=True, exist_ok=True)
+    vault.atomic_write(manifest_path, json.dumps(manifest, indent=1) + "\n")
+    return manifest
+
+
+def restore_snapshot(
+    name: str, safety_name: str | None = None
+) -> tuple[int, int, dict | None]:
+    """Roll the vault back to a snapshot.
+
+    The snapshot is checked before anything is written. With `safety_name`,
+    the current state is first saved as a snapshot of that name. The index
+    lock is held throughout, so no registration interleaves with the
+    restore. Returns (files_written, files_deleted, safety manifest).
+    """
+    manifest = load_manifest(name)
+    wanted: dict[str, dict] = manifest["files"]
+
+    missing = [
+        rel for rel, info in wanted.items() if not object_path(info["sha256"]).exists()
+    ]
+    if missing:
+        raise ValueError(
+            f"Snapshot '{name}' is incomplete: {len(missing)} object(s) missing "
+            f"from the store (first: {missing[0]})"
+        )
+
+    with vault.lock("index"):
+        safety = create_snapshot(safety_name) if safety_name else None
+
+        written = 0
+        for rel, info in wanted.items():
+            dest = vault.ROOT / rel
+            if (
+                dest.is_file()
+                and dest.stat().st_size == info["size"]
+                and vault.file_digest(dest) == info["sha256"]
+            ):
+                continue
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dest.with_name(f".{dest.name}.tmp-{uuid.uuid4().hex[:8]}")
+            shutil.copyfile(object_path(info["sha256"]), tmp)
+            # Restore the recorded mtime so the next snapshot can skip this file.
+            os.utime(tmp, ns=(info["mtime_ns"], info["mtime_ns"]))
+            tmp.replace(dest)
+            written += 1
+
+        deleted = 0
+        for path in tracked_files():
+            if _relpath(path) not in wanted:
+                path.unlink()
+                deleted += 1
+
+        refresh_derived_state()
+    return written, deleted, safety
+
+
+def refresh_derived_state() -> None:
+    """Bring everything derived from notes/ and _index.md back in line.
+
+    The SQLite indexes are rebuilt from the restored files. The TF-IDF
+    stores and _index.bin are deleted and rebuilt on next use.
+    """
+    link_index.refresh()
+    conn = question_tree.connect()
+    try:
+        question_tree.rebuild(conn)
+    finally:
+        conn.close()
+    tags.backfill()
+    for path in vault.STATE_DIR.glob("tfidf-*.npz"):
+        path.unlink(missing_ok=True)
+    vault.MANIFEST_PATH.unlink(missing_ok=True)
+
+
+def prune_snapshots(keep: int) -> tuple[int, int]:
+    """Delete all but the newest `keep` snapshots and unreferenced objects.
+
+    Returns (manifests_removed, objects_removed).
+    """
+    manifests = list_manifests()
+    doomed = manifests[:-keep] if keep > 0 else manifests
+    for m in doomed:
+        (manifests_dir() / f"{m['name']}.json").unlink()
+
+    live = {
+        info["sha256"] for m in manifests[len(doomed) :] for info in m["files"].values()
+    }
+    removed = 0
+    if objects_dir().exists():
+        for obj in objects_dir().glob("*/*"):
+            if obj.name not in live:
+                obj.unlink()
+                removed += 1
+    return len(doomed), removed
+
+
+# ── CLI ──────────────────────────────────────────────────────────────
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Snapshot and restore notes/, _index.md and PROGRESS.md."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_create = sub.add_parser("create", help="Take a snapshot of the current state")
+    p_create.add_argument(
+        "--name", default=None, help="Snapshot name (default: timestamp)"
+    )
+
+    sub.add_parser("list", help="List snapshots, oldest first")
+
+    p_restore = sub.add_parser("restore", help="Roll the vault back to a snapshot")
+    p_restore.add_argument("name", help="Snapshot name (see 'list')")
+
+    p_prune = sub.add_parser("prune", help="Delete old snapshots and unused objects")
+    p_prune.add_argument(
+        "--keep", type=int, default=20, help="Number of newest snapshots to keep"
+    )
+
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    try:
+        if args.command == "create":
+            manifest = create_snapshot(args.name)
+            print(
+                f"Snapshot {manifest['name']}: {len(manifest['files'])} file(s), "
+                f"{manifest['copied']} new object(s) stored."
+            )
+        elif args.command == "list":
+            manifests = list_manifests()
+            if not manifests:
+                print("No snapshots found.")
+            for m in manifests:
+                print(f"{m['name']}  {m['created']}  {len(m['files'])} file(s)")
+        elif args.command == "restore":
+            written, deleted, safety = restore_snapshot(
+                args.name, f"pre-restore-{_default_name()}"
+            )
+            print(
+                f"Restored {args.name}: {written} file(s) rewritten, "
+                f"{deleted} file(s) removed."
+            )
+            print(f"Previous state saved as snapshot {safety['name']}.")
+        elif args.command == "prune":
+            manifests, objects = prune_snapshots(args.keep)
+            print(f"Pruned {manifests} snapshot(s) and {objects} object(s).")
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Suggest related, not-yet-linked notes for a connector's batch.
+
+Keeps a TF-IDF matrix over every registered note's title, tags and body
+(see tfidf.py). Only notes whose content hash in the link index changed
+since the last run are re-tokenized; of the files on disk, only the
+batch notes are re-checked, so a query does not stat the whole vault. The whole batch is scored against the vault with one
+sparse matrix product. Notes already linked to or from a batch note, in
+either direction, are left out.
+
+Usage:
+    python scripts/suggest_links.py notes/NOTE-....md notes/NOTE-....md
+    python scripts/suggest_links.py NOTE-20260227-054343-855 --k 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import link_index  # noqa: E402
+import vault  # noqa: E402
+from models import parse_frontmatter  # noqa: E402
+from tfidf import TfidfStore  # noqa: E402
+
+_FRONTMATTER_RE = re.compile(r"^---\n.+?\n---\n?", re.DOTALL)
+
+
+def note_text(text: str) -> str:
+    """Return the indexed text of a note: title and tags (weighted x2) plus body."""
+    try:
+        fm = parse_frontmatter(text)
+    except ValueError:
+        fm = {}
+    body = link_index.WIKILINK_RE.sub(" ", _FRONTMATTER_RE.sub("", text, count=1))
+    title = str(fm.get("title", ""))
+    tags = " ".join(str(t) for t in fm.get("tags") or [])
+    return f"{title} {title} {tags} {tags} {body}"
+
+
+class _NotePaths(Mapping[str, Path]):
+    """{id: path} that builds each Path on lookup, not 100k of them up front."""
+
+    def __init__(self, rels: dict[str, str]) -> None:
+        self._rels = rels
+
+    def __getitem__(self, entry_id: str) -> Path:
+        return vault.ROOT / self._rels[entry_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rels)
+
+    def __len__(self) -> int:
+        return len(self._rels)
+
+
+def load_note_store(
+    refresh: list[str] | None = None,
+) -> tuple[TfidfStore, Mapping[str, Path]]:
+    """Bring the notes TF-IDF store up to date. Returns (store, {id: path}).
+
+    The store follows the content hashes in the link index, which
+    registration, the watcher and `backlinks.py --refresh` keep current.
+    Only the notes whose IDs are in `refresh` are re-checked on disk, so
+    a query never stats the whole vault.
+    """
+    paths = [
+        vault.entry_path(n)
+        for n in refresh or []
+        if vault.NOTE_FILE_RE.match(f"{n}.md")
+    ]
+    if paths:
+        link_index.refresh(paths)
+    conn = link_index.connect()
+    rows = conn.execute(
+        "SELECT id, path, sha256 FROM link_files WHERE type = 'note'"
+    ).fetchall()
+    conn.close()
+
+    paths = _NotePaths({entry_id: rel for entry_id, rel, _ in rows})
+    digests = {entry_id: digest for entry_id, _, digest in rows}
+    store = TfidfStore("notes")
+    changed, dropped = store.stale(digests)
+    if changed or dropped:
+        docs = {
+            entry_id: (
+                digests[entry_id],
+                note_text(paths[entry_id].read_text(encoding="utf-8")),
+            )
+            for entry_id in changed
+        }
+        store.update(docs, dropped)
+        store.save()
+    return store, paths
+
+
+def linked_ids(entry_id: str) -> set[str]:
+    conn = link_index.connect()
+    ids = {dst for dst, kind in link_index.outlinks(conn, entry_id) if kind == "link"}
+    ids |= {src for src, kind in link_index.backlinks(conn, entry_id) if kind == "link"}
+    conn.close()
+    return ids
+
+
+def suggest(
+    note_ids: list[str], k: int, store: TfidfStore | None = None
+) -> dict[str, list[tuple[str, float]]]:
+    """Return {note_id: [(candidate_id, score)]} for each note in the batch."""
+    if store is None:
+        store, _ = load_note_store()
+    row_of = {key: i for i, key in enumerate(store.keys)}
+    missing = [n for n in note_ids if n not in row_of]
+    if missing:
+        raise ValueError(f"not a registered note: {missing[0]}")
+
+    queries = store.matrix()[[row_of[n] for n in note_ids]]
+    exclude = [linked_ids(n) | {n} for n in note_ids]
+    return dict(zip(note_ids, store.top_k(queries, k, exclude)))
+
+
+def _title(path: Path) -> str:
+    try:
+        return str(parse_frontmatter(path.read_text(encoding="utf-8")).get("title", ""))
+    except (OSError, ValueError):
+        return ""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Suggest unlinked related notes for a batch of notes."
+    )
+    parser.add_argument(
+        "notes", nargs="+", help="Note IDs or paths (e.g. from assign_note_batch.py)"
+    )
+    parser.add_argument("--k", type=int, default=5, help="Suggestions per note")
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    note_ids = [Path(n).stem for n in args.notes]
+    # The batch notes are the ones a connector may just have edited.
+    store, paths = load_note_store(note_ids)
+    try:
+        results = suggest(note_ids, args.k, store)
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    for note_id, candidates in results.items():
+        print(f"{note_id}:")
+        if not candidates:
+            print("  (no unlinked candidates)")
+        for cand, score in candidates:
+            print(f"  {cand}  {score:.3f}  {_title(paths[cand])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
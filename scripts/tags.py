@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""Canonical note tags and a tag facet index.
+
+Tags are canonicalised when a note registers. They are lowercased,
+whitespace becomes "-", and known variants map to one canonical tag
+through tag-synonyms.yaml at the vault root:
+
+    authentication: [auth, authn, login]
+    postgresql: [postgres, pg]
+
+The facet index lives in .ralph/state.db next to the link index. For
+each tag it holds the sorted IDs of the notes carrying it (`tag_postings`,
+keyed by tag then note) and their count (`tag_counts`). update_index.py
+updates both as each note registers, so a tag or an intersection of tags
+is answered from the index without opening any note. The index is built
+from every note the first time it is needed. --backfill rebuilds it,
+for example after editing tags by hand or with migrate.py, and
+--backfill --rewrite also puts the canonical tags into the files.
+
+Usage:
+    python scripts/tags.py auth                 # notes tagged authentication
+    python scripts/tags.py auth storage         # notes with both tags
+    python scripts/tags.py auth storage --any   # notes with either tag
+    python scripts/tags.py --list --limit 20    # most used tags
+    python scripts/tags.py --backfill [--rewrite]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from collections import Counter
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent))
+import link_index  # noqa: E402
+import vault  # noqa: E402
+from models import parse_frontmatter, rewrite_frontmatter  # noqa: E402
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tag_postings (
+    tag  TEXT NOT NULL,
+    note TEXT NOT NULL,
+    PRIMARY KEY (tag, note)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tag_postings_by_note ON tag_postings (note);
+CREATE TABLE IF NOT EXISTS tag_counts (
+    tag   TEXT PRIMARY KEY,
+    notes INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+_BUILT_KEY = "tags_built"
+
+_synonyms_cache: tuple[Path, int, dict[str, str]] | None = None
+
+
+# ── Canonical tags ───────────────────────────────────────────────────
+
+
+def normalise(tag: object) -> str:
+    return re.sub(r"\s+", "-", str(tag).strip().lower())
+
+
+def load_synonyms() -> dict[str, str]:
+    """Return {variant: canonical} from tag-synonyms.yaml ({} if there is none).
+
+    Raises ValueError if the file is not a mapping of tag to variant list.
+    """
+    global _synonyms_cache
+    path = vault.TAG_SYNONYMS_PATH
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return {}
+    if _synonyms_cache is not None and _synonyms_cache[:2] == (path, mtime):
+        return _synonyms_cache[2]
+    try:
+        raw = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    except yaml.YAMLError as exc:
+        raise ValueError(f"{path.name}: {exc}") from exc
+    if not isinstance(raw, dict):
+        raise ValueError(
+            f"{path.name} must map each canonical tag to a list of variants"
+        )
+
+    table: dict[str, str] = {}
+    for canonical, variants in raw.items():
+        if variants is not None and not isinstance(variants, list):
+            raise ValueError(f"{path.name}: variants of {canonical!r} must be a list")
+        for variant in [canonical, *(variants or [])]:
+            table[normalise(variant)] = normalise(canonical)
+    _synonyms_cache = (path, mtime, table)
+    return table
+
+
+def canonical(tag: object, synonyms: dict[str, str]) -> str:
+    tag = normalise(tag)
+    return synonyms.get(tag, tag)
+
+
+def canonicalise(tags: list, synonyms: dict[str, str] | None = None) -> list[str]:
+    """Return the canonical tags in their original order, without duplicates."""
+    if synonyms is None:
+        synonyms = load_synonyms()
+    result = dict.fromkeys(canonical(t, synonyms) for t in tags)
+    result.pop("", None)
+    return list(result)
+
+
+# ── Facet index ──────────────────────────────────────────────────────
+
+
+def connect() -> sqlite3.Connection:
+    conn = vault.connect_state()
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def set_tags(conn: sqlite3.Connection, note_id: str, tags: list[str]) -> None:
+    """Make a note's postings match its tags, adjusting the counts."""
+    old = {
+        row[0]
+        for row in conn.execute(
+            "SELECT tag FROM tag_postings WHERE note = ?", (note_id,)
+        )
+    }
+    new = set(tags)
+    for tag in old - new:
+        conn.execute(
+            "DELETE FROM tag_postings WHERE tag = ? AND note = ?", (tag, note_id)
+        )
+        conn.execute("UPDATE tag_counts SET notes = notes - 1 WHERE tag = ?", (tag,))
+        conn.execute("DELETE FROM tag_counts WHERE tag = ? AND notes <= 0", (tag,))
+    for tag in new - old:
+        conn.execute("INSERT INTO tag_postings VALUES (?, ?)", (tag, note_id))
+        conn.execute(
+            "INSERT INTO tag_counts VALUES (?, 1)"
+            " ON CONFLICT (tag) DO UPDATE SET notes = notes + 1",
+            (tag,),
+        )
+
+
+def on_register(note_id: str, tags: list[str]) -> None:
+    """Add a newly registered note to the facet index (called by update_index.py).
+
+    The first registration in a vault without an index builds it from
+    every note. Either way the note's own tags are then set under the
+    same lock, so a concurrent back-fill cannot drop them.
+    """
+    with vault.lock("tags"):
+        conn = connect()
+        try:
+            built = is_built(conn)
+        finally:
+            conn.close()
+        if not built:
+            _backfill()
+        conn = connect()
+        try:
+            with conn:
+                set_tags(conn, note_id, tags)
+        finally:
+            conn.close()
+
+
+def backfill(rewrite: bool = False) -> tuple[int, int]:
+    """Rebuild the facet index from every registered note.
+
+    With `rewrite`, notes whose tags are not canonical are rewritten too.
+    Returns (notes indexed, files rewritten).
+    """
+    with vault.lock("tags"):
+        return _backfill(rewrite)
+
+
+def _backfill(rewrite: bool = False) -> tuple[int, int]:
+    synonyms = load_synonyms()
+    postings: list[tuple[str, str]] = []
+    rewritten = 0
+    for path in vault.iter_registered("note"):
+        try:
+            text = path.read_text(encoding="utf-8")
+            fm = parse_frontmatter(text)
+        except (OSError, ValueError, yaml.YAMLError):
+            continue
+        tags = fm.get("tags") if isinstance(fm.get("tags"), list) else []
+        canon = canonicalise(tags, synonyms)
+        if rewrite and canon and canon != tags:
+            new = rewrite_frontmatter(text, fm, {**fm, "tags": canon})
+            vault.atomic_write(path, new)
+            rewritten += 1
+        postings.extend((tag, path.stem) for tag in canon)
+
+    counts = Counter(tag for tag, _ in postings)
+    conn = connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM tag_postings")
+            conn.execute("DELETE FROM tag_counts")
+            conn.executemany(
+                "INSERT OR IGNORE INTO tag_postings VALUES (?, ?)", postings
+            )
+            conn.executemany("INSERT INTO tag_counts VALUES (?, ?)", counts.items())
+            conn.execute("INSERT OR REPLACE INTO meta VALUES (?, '1')", (_BUILT_KEY,))
+    finally:
+        conn.close()
+    return len({note for _, note in postings}), rewritten
+
+
+def is_built(conn: sqlite3.Connection) -> bool:
+    return (
+        conn.execute("SELECT 1 FROM meta WHERE key = ?", (_BUILT_KEY,)).fetchone()
+        is not None
+    )
+
+
+def notes_with(
+    conn: sqlite3.Connection, tags: list[str], any_of: bool = False
+) -> list[str]:
+    """Return the sorted IDs of notes carrying all (or any) of the given tags."""
+    if not tags:
+        return []
+    placeholders = ", ".join("?" * len(tags))
+    having = "" if any_of else f" HAVING COUNT(*) = {len(set(tags))}"
+    return [
+        row[0]
+        for row in conn.execute(
+            f"SELECT note FROM tag_postings WHERE tag IN ({placeholders})"
+            f" GROUP BY note{having} ORDER BY note",
+            tags,
+        )
+    ]
+
+
+def top_tags(conn: sqlite3.Connection, limit: int) -> list[tuple[str, int]]:
+    return conn.execute(
+        "SELECT tag, notes FROM tag_counts ORDER BY notes DESC, tag LIMIT ?", (limit,)
+    ).fetchall()
+
+
+# ── CLI ──────────────────────────────────────────────────────────────
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Query notes by canonical tag, or back-fill the tag index."
+    )
+    parser.add_argument("tags", nargs="*", help="Tags to look up (all must match)")
+    parser.add_argument("--any", action="store_true", help="Match any of the tags")
+    parser.add_argument("--list", action="store_true", help="List tags by note count")
+    parser.add_argument(
+        "--limit", type=int, default=50, help="Tags shown by --list (default: 50)"
+    )
+    parser.add_argument(
+        "--backfill", action="store_true", help="Rebuild the index from every note"
+    )
+    parser.add_argument(
+        "--rewrite",
+        action="store_true",
+        help="With --backfill, also write canonical tags into the notes",
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    try:
+        synonyms = load_synonyms()
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    if args.backfill:
+        notes, rewritten = backfill(args.rewrite)
+        print(f"Indexed tags of {notes} note(s).")
+        if args.rewrite:
+            print(f"Rewrote tags in {rewritten} note(s).")
+            if rewritten:
+                link_index.refresh()
+        return 0
+    if not args.tags and not args.list:
+        parser.error("give tags to look up, --list or --backfill")
+
+    conn = connect()
+    if not is_built(conn):
+        conn.close()
+        print(f"Indexed tags of {backfill()[0]} note(s).", file=sys.stderr)
+        conn = connect()
+
+    if args.list:
+        rows = top_tags(conn, args.limit)
+        conn.close()
+        if args.json:
+            print(json.dumps([{"tag": t, "notes": n} for t, n in rows], indent=2))
+        for tag, count in [] if args.json else rows:
+            print(f"{count:>6}  {tag}")
+        return 0
+
+    wanted = canonicalise(args.tags, synonyms)
+    notes = notes_with(conn, wanted, args.any)
+    conn.close()
+    if args.json:
+        print(json.dumps({"tags": wanted, "notes": notes}, indent=2))
+        return 0
+    for query in dict.fromkeys(args.tags):
+        tag = canonical(query, synonyms)
+        if tag and tag != query:
+            print(f"{query} -> {tag}", file=sys.stderr)
+    print("\n".join(notes) if notes else "No matching notes.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Incrementally maintained sparse TF-IDF matrices over keyed documents.
+
+A `TfidfStore` keeps a SciPy CSR matrix of raw term counts (one row per
+document) together with each document's content digest, persisted as a
+single .npz file under .ralph/. Updating the store re-tokenizes only the
+documents whose digest changed. IDF weights and row normalisation are
+applied when the store is loaded, which is a handful of vectorised
+operations over the non-zeros.
+"""
+
+from __future__ import annotations
+
+import io
+import math
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+sys.path.insert(0, str(Path(__file__).parent))
+import vault  # noqa: E402
+
+TOKEN_RE = re.compile(r"[a-z][a-z0-9]+(?:['-][a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+    about above after again against all also among and any are because been
+    before being below between both but can could did does doing down during
+    each few for from further had has have having her here hers him his how
+    into its itself just more most much must not now off once only other our
+    out over own same she should some such than that the their them then there
+    these they this those through too under until upon very was were what when
+    where which while who whom why will with within without would you your
+    """.split())
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class TfidfStore:
+    """Keyed term-count matrix with incremental updates and TF-IDF scoring."""
+
+    def __init__(self, name: str) -> None:
+        self.path = vault.STATE_DIR / f"tfidf-{name}.npz"
+        self.keys: list[str] = []
+        self.digests: list[str] = []
+        self.vocab: dict[str, int] = {}
+        self.counts = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._weighted: sparse.csr_matrix | None = None
+        self._idf: np.ndarray | None = None
+        if self.path.exists():
+            self._load()
+
+    # ── Persistence ──────────────────────────────────────────────────
+
+    def _load(self) -> None:
+        with np.load(self.path, allow_pickle=False) as data:
+            self.keys = data["keys"].tolist()
+            self.digests = data["digests"].tolist()
+            terms = data["terms"].tolist()
+            self.counts = sparse.csr_matrix(
+                (data["data"], data["indices"], data["indptr"]),
+                shape=(len(self.keys), len(terms)),
+            )
+        self.vocab = {t: i for i, t in enumerate(terms)}
+
+    def save(self) -> None:
+        vault.STATE_DIR.mkdir(parents=True, exist_ok=True)
+        terms = sorted(self.vocab, key=self.vocab.__getitem__)
+        buf = io.BytesIO()
+        np.savez(
+            buf,
+            keys=np.array(self.keys, dtype=str),
+            digests=np.array(self.digests, dtype=str),
+            terms=np.array(terms, dtype=str),
+            data=self.counts.data,
+            indices=self.counts.indices,
+            indptr=self.counts.indptr,
+        )
+        # Concurrent savers each write their own temp file.
+        vault.atomic_write_bytes(self.path, buf.getvalue())
+
+    # ── Updates ──────────────────────────────────────────────────────
+
+    def stale(self, current: dict[str, str]) -> tuple[list[str], list[str]]:
+        """Return (keys to (re)index, keys to drop) given {key: digest}."""
+        known = dict(zip(self.keys, self.digests))
+        changed = [k for k, d in current.items() if known.get(k) != d]
+        dropped = [k for k in known if k not in current]
+        return changed, dropped
+
+    def _count_rows(self, texts: list[str], grow: bool) -> sparse.csr_matrix:
+        indptr, indices, data = [0], [], []
+        for text in texts:
+            counts = Counter(tokenize(text))
+            for term, n in counts.items():
+                col = self.vocab.get(term)
+                if col is None:
+                    if not grow:
+                        continue
+                    col = self.vocab[term] = len(self.vocab)
+                indices.append(col)
+                data.append(n)
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (
+                np.array(data, dtype=np.float32),
+                np.array(indices, dtype=np.int32),
+                np.array(indptr, dtype=np.int64),
+            ),
+            shape=(len(texts), len(self.vocab)),
+        )
+
+    def update(
+        self, docs: dict[str, tuple[str, str]], dropped: list[str] | None = None
+    ) -> None:
+        """Replace rows for {key: (digest, text)} and remove `dropped` keys."""
+        replace = set(docs) | set(dropped or ())
+        keep = [i for i, k in enumerate(self.keys) if k not in replace]
+        new_rows = self._count_rows([text for _, text in docs.values()], grow=True)
+
+        old = self.counts[keep] if keep else None
+        width = len(self.vocab)
+        if old is not None:
+            old = sparse.csr_matrix(
+                (old.data, old.indices, old.indptr), shape=(old.shape[0], width)
+            )
+            self.counts = sparse.vstack([old, new_rows], format="csr")
+        else:
+            self.counts = new_rows
+        self.keys = [self.keys[i] for i in keep] + list(docs)
+        self.digests = [self.digests[i] for i in keep] + [d for d, _ in docs.values()]
+        self._weighted = self._idf = None
+
+    # ── Scoring ──────────────────────────────────────────────────────
+
+    def _weigh(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Apply sublinear TF, IDF and L2 row normalisation in place on a copy."""
+        weighted = counts.astype(np.float32, copy=True)
+        data = weighted.data
+        np.log1p(data, out=data)
+        data *= self._idf[weighted.indices]
+        rows = np.repeat(np.arange(weighted.shape[0]), np.diff(weighted.indptr))
+        norms = np.sqrt(
+            np.bincount(rows, weights=data * data, minlength=weighted.shape[0])
+        )
+        norms[norms == 0] = 1.0
+        data /= norms[rows].astype(np.float32)
+        return weighted
+
+    def matrix(self) -> sparse.csr_matrix:
+        """Return the L2-normalised TF-IDF matrix (rows follow self.keys)."""
+        if self._weighted is None:
+            n = max(len(self.keys), 1)
+            df = np.bincount(self.counts.indices, minlength=len(self.vocab))
+            self._idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+            self._weighted = self._weigh(self.counts)
+        return self._weighted
+
+    def vectorize(self, texts: list[str]) -> sparse.csr_matrix:
+        """Return normalised TF-IDF rows for arbitrary query texts."""
+        self.matrix()
+        return self._weigh(self._count_rows(texts, grow=False))
+
+    def top_k(
+        self,
+        queries: sparse.csr_matrix,
+        k: int,
+        exclude: list[set[str]] | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        """Return the k most similar keys per query row, best first.
+
+        All queries are scored with one sparse product; `exclude[i]` lists
+        keys never to return for query i.
+        """
+        if not self.keys:
+            return [[] for _ in range(queries.shape[0])]
+        matrix = self.matrix()
+        if queries.shape[0] * queries.shape[1] <= 50_000_000:
+            # Small batches: CSR x dense is a single pass over the non-zeros.
+            scores = np.asarray(matrix @ queries.T.toarray()).T.copy()
+        else:
+            scores = (queries @ matrix.T).toarray()
+        pos = {key: i for i, key in enumerate(self.keys)} if exclude else {}
+        results = []
+        for row, sims in enumerate(scores):
+            for key in exclude[row] if exclude else ():
+                if key in pos:
+                    sims[pos[key]] = -math.inf
+            take = min(k, len(sims))
+            best = np.argpartition(-sims, take - 1)[:take]
+            best = best[np.argsort(-sims[best])]
+            results.append(
+                [(self.keys[i], float(sims[i])) for i in best if sims[i] > 0]
+            )
+        return results
@@ -5,26 +5,61 @@ Scans notes/ and notes/questions/ for files that haven't been registered
 (i.e. filenames that don't match the ID format), validates frontmatter,
 generates unique IDs and timestamps, and updates _index.md.
 
+With --watch, stays running and registers files as they appear instead of
+rescanning: filesystem events (inotify on Linux, directory polling
+elsewhere) are debounced into batches, and each batch is written to
+_index.md in a single update. Edits to registered notes are fed to the
+link index as they happen.
+
 Usage:
     python scripts/update_index.py
+    python scripts/update_index.py --watch [--debounce 0.5]
 """
 
 from __future__ import annotations
 
+import argparse
 import re
+import sqlite3
+import stat
 import sys
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-WORKSPACE = Path(__file__).resolve().parent.parent
-
 sys.path.insert(0, str(Path(__file__).parent))
-from models import _validate, parse_frontmatter  # noqa: E402
+import fswatch  # noqa: E402
+import journal  # noqa: E402
+import link_index  # noqa: E402
+import manifest  # noqa: E402
+import question_tree  # noqa: E402
+import tags  # noqa: E402
+import vault  # noqa: E402
+from models import _validate, parse_frontmatter, rewrite_frontmatter  # noqa: E402
+
+
+def _last_id_path() -> Path:
+    return vault.STATE_DIR / "last-id"
 
 
 def generate_id_and_timestamp(entry_type: str) -> tuple[str, str]:
-    """Return (entry_id, iso_timestamp) with millisecond precision."""
+    """Return (entry_id, iso_timestamp) with millisecond precision.
+
+    Timestamps are strictly increasing across every process registering
+    into the vault: the last one issued is kept in .ralph/last-id under a
+    lock. So files registered in the same millisecond, by one process or
+    by several, still get distinct IDs.
+    """
     now = datetime.now(timezone.utc)
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    with vault.lock("ids"):
+        try:
+            last = datetime.fromisoformat(_last_id_path().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            last = None
+        if last is not None and now <= last:
+            now = last + timedelta(milliseconds=1)
+        vault.atomic_write(_last_id_path(), now.isoformat())
     datestamp = now.strftime("%Y%m%d-%H%M%S")
     millis = f"{now.microsecond // 1000:03d}"
     iso = now.strftime("%Y-%m-%dT%H:%M:%S.") + millis + "Z"
@@ -47,16 +82,31 @@ def replace_placeholders(text: str, entry_id: str, timestamp: str) -> str:
     return text
 
 
+def canonicalise_tags(text: str, data: dict) -> str:
+    """Rewrite a note's tags in canonical form (see tags.py), updating `data` too."""
+    if not isinstance(data.get("tags"), list):
+        return text
+    try:
+        synonyms = tags.load_synonyms()
+    except ValueError as exc:
+        print(f"Warning: tag synonyms not applied: {exc}", file=sys.stderr)
+        synonyms = {}
+    canonical = tags.canonicalise(data["tags"], synonyms)
+    if not canonical or canonical == data["tags"]:
+        return text
+    text = rewrite_frontmatter(text, data, {**data, "tags": canonical})
+    data["tags"] = canonical
+    return text
+
+
 def rename_to_id(file_path: Path, entry_id: str, entry_type: str) -> Path:
     """Rename file to {entry_id}.md in the appropriate directory.
 
-    Notes stay in notes/, questions go to notes/questions/.
+    Notes stay in notes/, questions go to notes/questions/. In a sharded
+    vault both go into a year/month subdirectory derived from the ID.
     Returns the new file path.
     """
-    if entry_type == "question":
-        dest_dir = WORKSPACE / "notes" / "questions"
-    else:
-        dest_dir = WORKSPACE / "notes"
+    dest_dir = vault.entry_dir(entry_id)
     dest_dir.mkdir(parents=True, exist_ok=True)
     new_path = dest_dir / f"{entry_id}.md"
     if file_path.resolve() != new_path.resolve():
@@ -72,8 +122,12 @@ def update_index(
     data: dict,
 ) -> None:
     """Append an entry to the correct table in _index.md, using wikilinks for IDs."""
-    content = index_path.read_text(encoding="utf-8")
+    update_index_batch(index_path, [(entry_type, entry_id, timestamp, data)])
 
+
+def _add_index_entry(
+    content: str, entry_type: str, entry_id: str, timestamp: str, data: dict
+) -> str:
     if entry_type == "question":
         row = f"| [[{entry_id}]] | open | {data['question']} | {data['source']} | |"
         content = content.replace(
@@ -95,14 +149,31 @@ def update_index(
                     lines[i] = line.replace("| open |", "| answered |")
                     lines[i] = re.sub(r"\|\s*\|$", f"| [[{entry_id}]] |", lines[i])
             content = "\n".join(lines)
+    return content
 
-    content = re.sub(
-        r"^Last Updated:.*$",
-        f"Last Updated: {timestamp}",
-        content,
-        flags=re.MULTILINE,
-    )
-    index_path.write_text(content, encoding="utf-8")
+
+def update_index_batch(
+    index_path: Path, entries: list[tuple[str, str, str, dict]]
+) -> None:
+    """Apply several (entry_type, entry_id, timestamp, data) entries in one write."""
+    if not entries:
+        return
+    # Watchers and batch runs in the same vault take turns on the index.
+    with vault.lock("index"):
+        content = index_path.read_text(encoding="utf-8")
+        for entry in entries:
+            content = _add_index_entry(content, *entry)
+
+        content = re.sub(
+            r"^Last Updated:.*$",
+            f"Last Updated: {entries[-1][2]}",
+            content,
+            flags=re.MULTILINE,
+        )
+        vault.atomic_write(index_path, content)
+        manifest.refresh_manifest(
+            index_path, index_path.with_name(vault.MANIFEST_PATH.name)
+        )
 
 
 # ── Scanner ──────────────────────────────────────────────────────────
@@ -111,22 +182,45 @@ _NOTE_ID_RE = re.compile(r"^NOTE-\d{8}-\d{6}-\d{3}\.md$")
 _QUESTION_ID_RE = re.compile(r"^Q-\d{8}-\d{6}-\d{3}\.md$")
 
 
+def is_unregistered(path: Path) -> bool:
+    """True for a .md file that still needs registering (not yet named by ID).
+
+    Hidden files are skipped: they are temp files from atomic writes or
+    files already claimed by a running registration. Files below
+    notes/questions/, shards included, must carry a question ID.
+    """
+    if path.suffix != ".md" or path.name.startswith("."):
+        return False
+    if path.parent not in (vault.NOTES_DIR, vault.QUESTIONS_DIR):
+        # A YYYY/MM shard only ever receives files already named by ID.
+        if _NOTE_ID_RE.match(path.name) or _QUESTION_ID_RE.match(path.name):
+            return False
+    if vault.QUESTIONS_DIR in path.parents:
+        return not _QUESTION_ID_RE.match(path.name)
+    return not _NOTE_ID_RE.match(path.name)
+
+
 def find_unregistered_files() -> list[Path]:
-    """Return .md files in notes/ and notes/questions/ that don't match the ID format."""
-    notes_dir = WORKSPACE / "notes"
-    questions_dir = WORKSPACE / "notes" / "questions"
+    """Return .md files in notes/ and notes/questions/ that don't match the ID format.
+
+    Only the top level of each directory is listed. In a sharded vault that
+    holds just the shard directories and newly created files, so the scan
+    stays small however many notes are registered.
+    """
+    notes_dir = vault.NOTES_DIR
+    questions_dir = vault.QUESTIONS_DIR
     unregistered: list[Path] = []
 
     # Scan top-level notes/ (non-recursive, skip questions/ subdir)
     if notes_dir.exists():
         for f in notes_dir.iterdir():
-            if f.is_file() and f.suffix == ".md" and not _NOTE_ID_RE.match(f.name):
+            if f.is_file() and is_unregistered(f):
                 unregistered.append(f)
 
     # Scan notes/questions/
     if questions_dir.exists():
         for f in questions_dir.iterdir():
-            if f.is_file() and f.suffix == ".md" and not _QUESTION_ID_RE.match(f.name):
+            if f.is_file() and is_unregistered(f):
                 unregistered.append(f)
 
     return sorted(unregistered)
@@ -135,43 +229,380 @@ def find_unregistered_files() -> list[Path]:
 # ── CLI ──────────────────────────────────────────────────────────────
 
 
-def process_file(file_path: Path) -> tuple[str, Path, str] | None:
-    """Validate, assign ID, rename, and return (entry_id, new_path, timestamp) or None on error."""
-    text = file_path.read_text(encoding="utf-8")
+_journal = journal.Journal()
+
+
+def claim_file(file_path: Path, claimed: Path) -> bool:
+    """Atomically rename a file to a hidden claim name before registering it.
+
+    Only one process can win the rename, so a watcher and a script that
+    register the same new file never both assign it an ID. Returns False
+    if another process got there first.
+    """
+    try:
+        file_path.rename(claimed)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def process_file(
+    file_path: Path, pending: list[tuple[str, str, str, dict]] | None = None
+) -> tuple[str, Path, str] | None:
+    """Validate, assign ID, rename, and return (entry_id, new_path, timestamp) or None on error.
+
+    If `pending` is given, the _index.md entry is appended to it instead of
+    being written, so the caller can commit a batch with update_index_batch().
+
+    Each step is journaled first (see journal.py), so recover_journals()
+    can finish the registration if the process is killed part-way.
+    """
+    display_name = file_path.name
+    tx, claimed = _journal.claim(file_path)
+    if not claim_file(file_path, claimed):
+        _journal.abort(tx)
+        print(f"Skipped {display_name}: already being registered", file=sys.stderr)
+        return None
+
+    text = claimed.read_text(encoding="utf-8")
 
     try:
         raw = parse_frontmatter(text)
     except ValueError as exc:
-        print(f"Error in {file_path.name}: {exc}", file=sys.stderr)
+        claimed.rename(file_path)
+        _journal.abort(tx)
+        print(f"Error in {display_name}: {exc}", file=sys.stderr)
         return None
 
     try:
         entry = _validate(raw)
     except Exception as exc:
-        print(f"Validation error in {file_path.name}:\n{exc}", file=sys.stderr)
+        claimed.rename(file_path)
+        _journal.abort(tx)
+        print(f"Validation error in {display_name}:\n{exc}", file=sys.stderr)
         return None
 
+    text = canonicalise_tags(text, raw)
     entry_id, timestamp = generate_id_and_timestamp(entry.type)
+    _journal.assign(tx, entry.type, entry_id, timestamp, raw)
 
     updated = replace_placeholders(text, entry_id, timestamp)
-    file_path.write_text(updated, encoding="utf-8")
+    vault.atomic_write(claimed, updated)
 
-    new_path = rename_to_id(file_path, entry_id, entry.type)
+    _journal.step(tx, "rename", to=f"{entry_id}.md")
+    new_path = rename_to_id(claimed, entry_id, entry.type)
 
-    index_path = WORKSPACE / "_index.md"
-    if index_path.exists():
-        update_index(index_path, entry.type, entry_id, timestamp, raw)
-        print(f"Registered {entry_id} in _index.md")
+    index_path = vault.INDEX_PATH
+    if pending is not None:
+        pending.append((entry.type, entry_id, timestamp, raw))
+        update_derived(entry.type, entry_id, new_path, raw, tx=tx)
     else:
-        print("Warning: _index.md not found, skipping index update", file=sys.stderr)
+        _journal.indexing([entry_id])
+        if index_path.exists():
+            update_index(index_path, entry.type, entry_id, timestamp, raw)
+            print(f"Registered {entry_id} in _index.md")
+        else:
+            print(
+                "Warning: _index.md not found, skipping index update", file=sys.stderr
+            )
+        update_derived(entry.type, entry_id, new_path, raw, tx=tx)
+        _journal.done([entry_id])
 
     print(f"ID: {entry_id}")
-    print(f"File: {new_path.relative_to(WORKSPACE)}")
+    print(f"File: {new_path.relative_to(vault.ROOT)}")
     print(f"Created: {timestamp}")
     return entry_id, new_path, timestamp
 
 
+DERIVED = ("links", "questions", "tags")
+
+
+def update_derived(
+    entry_type: str,
+    entry_id: str,
+    path: Path,
+    data: dict,
+    tx: str | None = None,
+    applied: dict | None = None,
+) -> bool:
+    """Add a registered file to the link, question-tree and tag indexes.
+
+    Each index is updated on its own, so one failing leaves the others
+    current. With `tx`, each success is journaled as a "derived" step and
+    a failure keeps the tx open, so recover_journals() retries only the
+    indexes missing from `applied`. The question tree counts answers in
+    the link index, so it waits until that is updated. Returns True if
+    every index is current.
+    """
+    applied = applied or {}
+    ok = True
+    for name in DERIVED:
+        if applied.get(name) or (name == "tags" and entry_type != "note"):
+            continue
+        if name == "questions" and not ok:
+            break
+        try:
+            if name == "links":
+                link_index.refresh([path])
+            elif name == "questions":
+                question_tree.on_register(entry_type, entry_id, data)
+            else:
+                tags.on_register(entry_id, data.get("tags") or [])
+        except Exception as exc:
+            print(
+                f"Warning: {name} index not updated for {entry_id}: {exc}",
+                file=sys.stderr,
+            )
+            ok = False
+            continue
+        if tx is not None:
+            _journal.step(tx, "derived", **{name: "1"})
+    if not ok and tx is not None:
+        _journal.hold(tx)
+    return ok
+
+
+def register_batch(paths: list[Path]) -> tuple[list[Path], int]:
+    """Register files and commit their index rows in one write.
+
+    Returns (paths of the registered files, errors).
+    """
+    pending: list[tuple[str, str, str, dict]] = []
+    registered: list[Path] = []
+    errors = 0
+    for file_path in paths:
+        result = process_file(file_path, pending)
+        if result is None:
+            errors += 1
+        else:
+            registered.append(result[1])
+
+    index_path = vault.INDEX_PATH
+    entry_ids = [entry[1] for entry in pending]
+    _journal.indexing(entry_ids)
+    if pending and index_path.exists():
+        update_index_batch(index_path, pending)
+        print(f"Registered {len(pending)} file(s) in _index.md")
+    elif pending:
+        print("Warning: _index.md not found, skipping index update", file=sys.stderr)
+    _journal.done(entry_ids)
+    return registered, errors
+
+
+# ── Recovery ─────────────────────────────────────────────────────────
+
+
+def _unindexed(entry_ids: list[str]) -> set[str]:
+    """Return the IDs without a row in _index.md (binary search in _index.bin)."""
+    index = manifest.open_fresh()
+    if index is None:
+        return set()
+    with index:
+        return {entry_id for entry_id in entry_ids if index.find(entry_id) is None}
+
+
+def recover_journals() -> list[str]:
+    """Finish or undo registrations left incomplete by killed processes.
+
+    Only the journals of dead processes are read (see journal.py), so the
+    cost depends on how many files were in flight, not on the vault size.
+    A file claimed before it was given an ID goes back under its original
+    name. Anything further along is rolled forward: the ID is written, the
+    file is renamed, and it is added to _index.md and to the link,
+    question-tree and tag indexes its journal does not record as updated.
+    Returns one line per file handled.
+    """
+    actions: list[str] = []
+    for _path, txs in journal.stale():
+        finished: list[tuple[dict, Path]] = []
+        for fields in txs.values():
+            claimed = vault.ROOT / fields["claimed"]
+            original = vault.ROOT / fields["path"]
+            if "id" not in fields:
+                if not claimed.exists():
+                    continue
+                if original.exists():
+                    actions.append(f"left {fields['claimed']}: {fields['path']} exists")
+                else:
+                    claimed.rename(original)
+                    actions.append(f"restored {fields['path']}")
+                continue
+
+            entry_id = fields["id"]
+            if claimed.exists():
+                text = claimed.read_text(encoding="utf-8")
+                updated = canonicalise_tags(text, parse_frontmatter(text))
+                updated = replace_placeholders(updated, entry_id, fields["timestamp"])
+                if updated != text:
+                    vault.atomic_write(claimed, updated)
+                new_path = rename_to_id(claimed, entry_id, fields["type"])
+                actions.append(f"renamed {new_path.relative_to(vault.ROOT)}")
+            else:
+                new_path = vault.entry_path(entry_id)
+                if not new_path.exists():
+                    actions.append(f"skipped {entry_id}: file no longer exists")
+                    continue
+            finished.append((fields, new_path))
+
+        missing = _unindexed([fields["id"] for fields, _ in finished])
+        pending = sorted(
+            (
+                (fields["type"], fields["id"], fields["timestamp"], fields["data"])
+                for fields, _ in finished
+                if fields["id"] in missing
+            ),
+            key=lambda entry: entry[1],
+        )
+        if pending:
+            update_index_batch(vault.INDEX_PATH, pending)
+            actions.extend(f"indexed {entry[1]}" for entry in pending)
+
+        for fields, path in finished:
+            todo = [name for name in DERIVED if not fields.get(name)]
+            if fields["type"] != "note":
+                todo = [name for name in todo if name != "tags"]
+            if not todo:
+                continue
+            if update_derived(
+                fields["type"], fields["id"], path, fields["data"], applied=fields
+            ):
+                actions.append(f"updated {', '.join(todo)} for {fields['id']}")
+    return actions
+
+
+def _signature(path: Path) -> tuple[int, int] | None:
+    """Return (mtime, size) of a file, or None if it is not a file."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size) if stat.S_ISREG(st.st_mode) else None
+
+
+RECENT_FILES = 256
+
+
+def _touch_recent(recent: dict[Path, None], path: Path) -> None:
+    """Move a path to the end of `recent`, dropping the oldest beyond RECENT_FILES."""
+    recent.pop(path, None)
+    recent[path] = None
+    while len(recent) > RECENT_FILES:
+        del recent[next(iter(recent))]
+
+
+def watch(debounce: float, poll_interval: float, force_polling: bool) -> int:
+    """Register files as they appear until interrupted."""
+    vault.QUESTIONS_DIR.mkdir(parents=True, exist_ok=True)
+    # notes/ is watched recursively, which covers questions/ and the shards
+    # of the sharded layout. In-place edits do not change any directory's
+    # mtime, so polling also stats the files this watcher registered or saw
+    # change most recently; older files are never stat'ed one by one.
+    recent: dict[Path, None] = {}
+    watcher = fswatch.open_watcher(
+        [vault.NOTES_DIR], poll_interval, force_polling, files=lambda: list(recent)
+    )
+    kind = "inotify" if isinstance(watcher, fswatch.InotifyWatcher) else "polling"
+    print(f"Watching notes/ ({kind}). Press Ctrl+C to stop.")
+
+    renamed: dict[Path, tuple[int, int] | None] = {}
+    failed: dict[Path, tuple[int, int] | None] = {}
+    # Anything created while no watcher was running is picked up once here.
+    batch: dict[Path, None] = dict.fromkeys(find_unregistered_files())
+    first_event = time.monotonic()
+    max_wait = debounce * 10
+    try:
+        while True:
+            timeout = None
+            if batch:
+                remaining = first_event + max_wait - time.monotonic()
+                timeout = max(0.0, min(debounce, remaining))
+            changed = watcher.wait(timeout)
+            if watcher.overflowed:
+                watcher.overflowed = False
+                batch.update(dict.fromkeys(find_unregistered_files()))
+            if changed:
+                if not batch:
+                    first_event = time.monotonic()
+                batch.update(dict.fromkeys(changed))
+                if time.monotonic() - first_event < max_wait:
+                    continue
+            if not batch:
+                continue
+
+            paths = []
+            for p in batch:
+                sig = _signature(p)
+                if sig is None:
+                    continue
+                if renamed.pop(p, None) == sig or failed.get(p) == sig:
+                    continue
+                failed.pop(p, None)
+                paths.append(p)
+            batch.clear()
+            new = [p for p in paths if is_unregistered(p)]
+            edited = [
+                p
+                for p in paths
+                if _NOTE_ID_RE.match(p.name) or _QUESTION_ID_RE.match(p.name)
+            ]
+            if new:
+                registered, errors = register_batch(sorted(new))
+                print(f"Batch: {len(registered)} registered, {errors} error(s).")
+                # Renaming a file raises an event for it too. Those events
+                # are ours, and an unchanged invalid draft is not retried.
+                for p in registered:
+                    renamed[p] = _signature(p)
+                    _touch_recent(recent, p)
+                for p in new:
+                    if p.exists():
+                        failed[p] = _signature(p)
+            if edited:
+                for p in edited:
+                    _touch_recent(recent, p)
+                try:
+                    link_index.refresh(edited)
+                except sqlite3.Error as exc:
+                    print(f"Warning: link index not updated: {exc}", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    finally:
+        watcher.close()
+    return 0
+
+
 def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Register new notes and questions in _index.md."
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and register files as they appear",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.5,
+        help="Seconds of quiet before a batch of events is registered (default: 0.5)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between directory checks when inotify is unavailable",
+    )
+    parser.add_argument(
+        "--poll", action="store_true", help="Use the polling watcher even on Linux"
+    )
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
+
+    for line in recover_journals():
+        print(f"Recovered: {line}")
+
+    if args.watch:
+        return watch(args.debounce, args.poll_interval, args.poll)
+
     files = find_unregistered_files()
     if not files:
         print("No unregistered notes found.")
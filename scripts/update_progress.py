@@ -2,7 +2,8 @@
 """Safely update PROGRESS.md from one orchestrator iteration event.
 
 The script treats _index.md as the source of truth for open-question and
-note counts, then appends a single row to the PROGRESS.md history table.
+note counts (read from its binary manifest, _index.bin, when that is up
+to date), then appends a single row to the PROGRESS.md history table.
 
 Usage:
     uv run scripts/update_progress.py \
@@ -21,9 +22,9 @@ import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 
-WORKSPACE = Path(__file__).resolve().parent.parent
-INDEX_PATH = WORKSPACE / "_index.md"
-PROGRESS_PATH = WORKSPACE / "PROGRESS.md"
+sys.path.insert(0, str(Path(__file__).parent))
+import manifest  # noqa: E402
+import vault  # noqa: E402
 
 QUESTION_ROW_RE = re.compile(
     r"^\|\s*\[\[Q-\d{8}-\d{6}-\d{3}\]\]\s*\|\s*(open|answered)\s*\|",
@@ -93,6 +94,17 @@ def _parse_index_counts(index_text: str) -> tuple[int, int]:
     return open_questions, total_notes
 
 
+def _index_counts() -> tuple[int, int]:
+    """Counts from the manifest if it matches _index.md, else by parsing."""
+    try:
+        with manifest.Manifest(vault.MANIFEST_PATH) as m:
+            if m.is_fresh(vault.INDEX_PATH):
+                return m.open, m.notes
+    except (OSError, ValueError):
+        pass
+    return _parse_index_counts(vault.INDEX_PATH.read_text(encoding="utf-8"))
+
+
 def _sanitize_cell(value: str, name: str, min_len: int, max_len: int) -> str:
     cleaned = value.strip()
     if len(cleaned) < min_len:
@@ -190,7 +202,8 @@ def main() -> int:
         action="store_true",
         help="Validate and print the computed update without writing PROGRESS.md",
     )
-    args = parser.parse_args()
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
 
     try:
         activity_type = _sanitize_cell(args.type, "type", 1, 40)
@@ -207,46 +220,50 @@ def main() -> int:
         else:
             last_action = _sanitize_cell(args.last_action, "last-action", 1, 240)
 
-        if not INDEX_PATH.exists():
-            raise ValueError(f"Missing file: {INDEX_PATH.name}")
-        if not PROGRESS_PATH.exists():
-            raise ValueError(f"Missing file: {PROGRESS_PATH.name}")
+        if not vault.INDEX_PATH.exists():
+            raise ValueError(f"Missing file: {vault.INDEX_PATH.name}")
+        if not vault.PROGRESS_PATH.exists():
+            raise ValueError(f"Missing file: {vault.PROGRESS_PATH.name}")
 
-        open_questions, total_notes = _parse_index_counts(
-            INDEX_PATH.read_text(encoding="utf-8")
-        )
+        # Concurrent updaters in the same vault must not claim the same iteration.
+        with vault.lock("progress"):
+            open_questions, total_notes = _index_counts()
 
-        progress_text = PROGRESS_PATH.read_text(encoding="utf-8")
-        lines = progress_text.splitlines()
+            progress_text = vault.PROGRESS_PATH.read_text(encoding="utf-8")
+            lines = progress_text.splitlines()
 
-        state_start, state_end = _find_section(lines, "## Current State")
-        history_start, history_end = _find_section(lines, "## Iteration History")
+            state_start, state_end = _find_section(lines, "## Current State")
+            history_start, history_end = _find_section(lines, "## Iteration History")
 
-        next_iteration, insert_idx = _parse_history(lines, history_start, history_end)
-        timestamp = _utc_timestamp()
+            next_iteration, insert_idx = _parse_history(
+                lines, history_start, history_end
+            )
+            timestamp = _utc_timestamp()
 
-        _replace_state_line(
-            lines, state_start, state_end, "Iteration", str(next_iteration)
-        )
-        _replace_state_line(
-            lines, state_start, state_end, "Open Questions", str(open_questions)
-        )
-        _replace_state_line(
-            lines, state_start, state_end, "Total Notes", str(total_notes)
-        )
-        _replace_state_line(lines, state_start, state_end, "Last Action", last_action)
-        _replace_state_line(lines, state_start, state_end, "Status", args.status)
+            _replace_state_line(
+                lines, state_start, state_end, "Iteration", str(next_iteration)
+            )
+            _replace_state_line(
+                lines, state_start, state_end, "Open Questions", str(open_questions)
+            )
+            _replace_state_line(
+                lines, state_start, state_end, "Total Notes", str(total_notes)
+            )
+            _replace_state_line(
+                lines, state_start, state_end, "Last Action", last_action
+            )
+            _replace_state_line(lines, state_start, state_end, "Status", args.status)
 
-        new_row = f"| {next_iteration} | {activity_type} | {target} | {result} | {timestamp} |"
-        lines.insert(insert_idx, new_row)
+            new_row = f"| {next_iteration} | {activity_type} | {target} | {result} | {timestamp} |"
+            lines.insert(insert_idx, new_row)
 
-        updated_text = "\n".join(lines) + "\n"
+            updated_text = "\n".join(lines) + "\n"
 
-        if args.dry_run:
-            print("Dry run: no files were modified.")
-        else:
-            _atomic_write(PROGRESS_PATH, updated_text)
-            print(f"Updated {PROGRESS_PATH.name}.")
+            if args.dry_run:
+                print("Dry run: no files were modified.")
+            else:
+                _atomic_write(vault.PROGRESS_PATH, updated_text)
+                print(f"Updated {vault.PROGRESS_PATH.name}.")
 
         print(f"Iteration: {next_iteration}")
         print(f"Open Questions: {open_questions}")
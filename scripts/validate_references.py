@@ -10,7 +10,7 @@ Also validates that each file is named using its frontmatter ID
 
 Usage:
     python scripts/validate_references.py
-    python scripts/validate_references.py --fix   # remove broken wikilinks
+    python scripts/validate_references.py --fix   # unlink broken references
 """
 
 from __future__ import annotations
@@ -22,8 +22,9 @@ from pathlib import Path
 
 import yaml
 
-WORKSPACE = Path(__file__).resolve().parent.parent
-NOTES_DIR = WORKSPACE / "notes"
+sys.path.insert(0, str(Path(__file__).parent))
+import vault  # noqa: E402
+from rewrite_links import rewrite_references  # noqa: E402
 
 # Matches wikilinks like [[NOTE-20260227-054343-855]] or [[Q-20260227-051858-705]]
 WIKILINK_RE = re.compile(r"\[\[((?:NOTE|Q)-\d{8}-\d{6}-\d{3})\]\]")
@@ -44,27 +45,17 @@ def parse_frontmatter(text: str) -> dict | None:
 
 def collect_files() -> list[Path]:
     """Collect all .md files under notes/ recursively."""
-    return sorted(NOTES_DIR.rglob("*.md"))
+    return sorted(vault.NOTES_DIR.rglob("*.md"))
 
 
-def fix_broken_references(files: list[Path], id_to_file: dict[str, Path]) -> int:
-    """Remove wikilinks that reference non-existent IDs. Returns count of fixes."""
-    fixed = 0
-    for fpath in files:
-        text = fpath.read_text(encoding="utf-8")
-
-        def _replace(m: re.Match) -> str:
-            nonlocal fixed
-            ref_id = m.group(1)
-            if ref_id not in id_to_file:
-                fixed += 1
-                return ""  # remove the broken wikilink
-            return m.group(0)
+def fix_broken_references(broken_ids: set[str]) -> set[Path]:
+    """Remove wikilinks to non-existent IDs. Returns the files rewritten.
 
-        new_text = WIKILINK_RE.sub(_replace, text)
-        if new_text != text:
-            fpath.write_text(new_text, encoding="utf-8")
-    return fixed
+    Only registered files that reference a broken ID are touched (see
+    rewrite_links.py), so links in unregistered drafts are left as they are.
+    """
+    changed = rewrite_references({ref_id: None for ref_id in broken_ids})
+    return {path.resolve() for path in changed}
 
 
 def main() -> int:
@@ -74,7 +65,8 @@ def main() -> int:
     parser.add_argument(
         "--fix", action="store_true", help="Remove broken wikilink references"
     )
-    args = parser.parse_args()
+    vault.add_argument(parser)
+    args = vault.parse_args(parser)
 
     files = collect_files()
     if not files:
@@ -91,49 +83,63 @@ def main() -> int:
         fm = parse_frontmatter(text)
         if fm is None:
             errors.append(
-                f"  {fpath.relative_to(WORKSPACE)}: missing or invalid frontmatter"
+                f"  {fpath.relative_to(vault.ROOT)}: missing or invalid frontmatter"
             )
             continue
 
         entry_id = fm.get("id")
         if not entry_id or entry_id == "PLACEHOLDER":
             errors.append(
-                f"  {fpath.relative_to(WORKSPACE)}: id is missing or still PLACEHOLDER"
+                f"  {fpath.relative_to(vault.ROOT)}: id is missing or still PLACEHOLDER"
             )
             continue
 
         if entry_id in id_to_file:
             errors.append(
-                f"  {fpath.relative_to(WORKSPACE)}: duplicate ID {entry_id} "
-                f"(also in {id_to_file[entry_id].relative_to(WORKSPACE)})"
+                f"  {fpath.relative_to(vault.ROOT)}: duplicate ID {entry_id} "
+                f"(also in {id_to_file[entry_id].relative_to(vault.ROOT)})"
             )
         id_to_file[entry_id] = fpath
         file_to_id[fpath] = entry_id
 
-    # Validate filenames match IDs
+    # Validate filenames match IDs and files sit in the layout's directory
     filename_errors: list[str] = []
+    layout = vault.layout()
     for fpath, entry_id in file_to_id.items():
         expected_name = f"{entry_id}.md"
+        expected_dir = vault.entry_dir(entry_id, layout)
         if fpath.name != expected_name:
             filename_errors.append(
-                f"  {fpath.relative_to(WORKSPACE)}: "
+                f"  {fpath.relative_to(vault.ROOT)}: "
                 f"filename should be {expected_name} (id: {entry_id})"
             )
+        elif fpath.parent.resolve() != expected_dir.resolve():
+            filename_errors.append(
+                f"  {fpath.relative_to(vault.ROOT)}: "
+                f"should be in {expected_dir.relative_to(vault.ROOT)}/ "
+                f"({layout} layout)"
+            )
 
     # Validate wikilink references
-    ref_errors: list[str] = []
+    ref_errors: list[tuple[Path, str]] = []
+    broken_ids: set[str] = set()
     for fpath in files:
         text = fpath.read_text(encoding="utf-8")
         for match in WIKILINK_RE.finditer(text):
             ref_id = match.group(1)
             if ref_id not in id_to_file:
+                broken_ids.add(ref_id)
                 ref_errors.append(
-                    f"  {fpath.relative_to(WORKSPACE)}: "
-                    f"broken reference [[{ref_id}]] — no file with this ID"
+                    (
+                        fpath,
+                        f"  {fpath.relative_to(vault.ROOT)}: "
+                        f"broken reference [[{ref_id}]] — no file with this ID",
+                    )
                 )
 
     # Report
     has_errors = False
+    unfixed = ref_errors
 
     if errors:
         has_errors = True
@@ -152,12 +158,17 @@ def main() -> int:
     if ref_errors:
         has_errors = True
         if args.fix:
-            count = fix_broken_references(files, id_to_file)
-            print(f"Fixed {count} broken reference(s).")
+            changed = fix_broken_references(broken_ids)
+            unfixed = [(p, e) for p, e in ref_errors if p.resolve() not in changed]
+            print(
+                f"Fixed {len(ref_errors) - len(unfixed)} broken reference(s) "
+                f"in {len(changed)} file(s)."
+            )
             print()
-        else:
-            print(f"Broken references ({len(ref_errors)}):")
-            for e in ref_errors:
+        if unfixed:
+            label = "Unfixed broken references" if args.fix else "Broken references"
+            print(f"{label} ({len(unfixed)}):")
+            for _, e in unfixed:
                 print(e)
             print()
 
@@ -168,7 +179,7 @@ def main() -> int:
         )
         return 0
 
-    total = len(errors) + len(filename_errors) + len(ref_errors)
+    total = len(errors) + len(filename_errors) + len(unfixed)
     print(f"Total issues: {total}")
     return 1
 
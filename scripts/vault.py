@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""Shared vault paths and file helpers for Ralph Note scripts."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+# The vault root defaults to this checkout. Set RALPH_VAULT, or pass
+# --vault to any script, to work on another vault with the same scripts.
+VAULT_ENV = "RALPH_VAULT"
+DEFAULT_ROOT = Path(__file__).resolve().parent.parent
+
+LAYOUTS = ("flat", "sharded")
+
+NOTE_FILE_RE = re.compile(r"^NOTE-(\d{4})(\d{2})\d{2}-\d{6}-\d{3}\.md$")
+QUESTION_FILE_RE = re.compile(r"^Q-(\d{4})(\d{2})\d{2}-\d{6}-\d{3}\.md$")
+
+
+def use(root: Path | str | None) -> Path:
+    """Point every vault path at `root` (None: $RALPH_VAULT or this checkout).
+
+    Scripts must read paths as `vault.X` at call time rather than copying
+    them at import, so this takes effect everywhere. The choice is also
+    exported to the environment so worker processes and subprocesses
+    resolve the same vault.
+    """
+    global ROOT, NOTES_DIR, QUESTIONS_DIR, INDEX_PATH, MANIFEST_PATH, PROGRESS_PATH
+    global DOCS_DIR, CONTEXT_DIR, LAYOUT_FILE, STATE_DIR, STATE_DB, LOCKS_DIR
+    global TAG_SYNONYMS_PATH
+    if root is None:
+        root = os.environ.get(VAULT_ENV) or DEFAULT_ROOT
+    ROOT = Path(root).expanduser().resolve()
+    if ROOT != DEFAULT_ROOT or VAULT_ENV in os.environ:
+        os.environ[VAULT_ENV] = str(ROOT)
+
+    NOTES_DIR = ROOT / "notes"
+    QUESTIONS_DIR = NOTES_DIR / "questions"
+    INDEX_PATH = ROOT / "_index.md"
+    MANIFEST_PATH = ROOT / "_index.bin"
+    PROGRESS_PATH = ROOT / "PROGRESS.md"
+    DOCS_DIR = ROOT / "docs"
+    CONTEXT_DIR = ROOT / "context"
+    TAG_SYNONYMS_PATH = ROOT / "tag-synonyms.yaml"
+
+    # notes/.layout holds "sharded" when registered files live in year/month
+    # subdirectories (notes/2026/10/NOTE-....md). It travels with the notes.
+    LAYOUT_FILE = NOTES_DIR / ".layout"
+
+    # Local script state (snapshots, caches, indexes, locks) lives here,
+    # out of notes/, so every vault has its own.
+    STATE_DIR = ROOT / ".ralph"
+    STATE_DB = STATE_DIR / "state.db"
+    LOCKS_DIR = STATE_DIR / "locks"
+    return ROOT
+
+
+use(None)
+
+
+def add_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the standard --vault option to a script's argument parser."""
+    parser.add_argument(
+        "--vault",
+        type=Path,
+        default=None,
+        help=f"Vault root directory (default: ${VAULT_ENV} or this checkout)",
+    )
+
+
+def parse_args(
+    parser: argparse.ArgumentParser, argv: list[str] | None = None
+) -> argparse.Namespace:
+    """parse_args() that also applies --vault before the script runs."""
+    args = parser.parse_args(argv)
+    if args.vault is not None:
+        if not args.vault.expanduser().is_dir():
+            parser.error(f"vault directory not found: {args.vault}")
+        use(args.vault)
+    return args
+
+
+def try_lock(fh: IO[bytes]) -> bool:
+    """Take an exclusive lock on an open file without waiting.
+
+    Returns False if another process holds it. The lock is released by
+    unlock() or when the file is closed, including when the process dies.
+    """
+    try:
+        if sys.platform == "win32":
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def unlock(fh: IO[bytes]) -> None:
+    if sys.platform == "win32":
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def lock(name: str, timeout: float = 60.0) -> Iterator[None]:
+    """Hold an exclusive, per-vault, cross-process lock for a shared file.
+
+    Writers of _index.md, PROGRESS.md and other shared files take the lock
+    named after what they write. Locks of different vaults never contend.
+    """
+    LOCKS_DIR.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + timeout
+    with (LOCKS_DIR / f"{name}.lock").open("a+b") as fh:
+        while not try_lock(fh):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"timed out waiting for the {name} lock")
+            time.sleep(0.02)
+        try:
+            yield
+        finally:
+            unlock(fh)
+
+
+def atomic_write(path: Path, text: str) -> None:
+    """Write text to path via a temp file + rename so readers never see partial files."""
+    tmp_path = path.with_name(f".{path.name}.tmp-{uuid.uuid4().hex[:8]}")
+    tmp_path.write_text(text, encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Binary counterpart of atomic_write()."""
+    tmp_path = path.with_name(f".{path.name}.tmp-{uuid.uuid4().hex[:8]}")
+    tmp_path.write_bytes(data)
+    try:
+        tmp_path.replace(path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)  # e.g. path is mapped on Windows
+        raise
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    h = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def connect_state() -> sqlite3.Connection:
+    """Open the vault's SQLite state database, creating it if needed."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(STATE_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+# ── Layout ───────────────────────────────────────────────────────────
+
+
+def layout() -> str:
+    """Return the vault's file layout: "flat" (default) or "sharded"."""
+    try:
+        value = LAYOUT_FILE.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return "flat"
+    return value if value in LAYOUTS else "flat"
+
+
+def set_layout(value: str) -> None:
+    if value not in LAYOUTS:
+        raise ValueError(f"layout must be one of {LAYOUTS}, got {value!r}")
+    NOTES_DIR.mkdir(parents=True, exist_ok=True)
+    atomic_write(LAYOUT_FILE, value + "\n")
+
+
+def entry_dir(entry_id: str, layout_name: str | None = None) -> Path:
+    """Return the directory a registered entry belongs in, derived from its ID."""
+    base = QUESTIONS_DIR if entry_id.startswith("Q-") else NOTES_DIR
+    if (layout_name or layout()) == "flat":
+        return base
+    datestamp = entry_id.split("-", 2)[1]
+    return base / datestamp[:4] / datestamp[4:6]
+
+
+def entry_path(entry_id: str) -> Path:
+    """Resolve an ID to its file path without scanning any directory.
+
+    The path for the current layout is returned if it exists; otherwise the
+    other layout's path is tried, so half-migrated vaults still resolve.
+    """
+    current = layout()
+    primary = entry_dir(entry_id, current) / f"{entry_id}.md"
+    if primary.exists():
+        return primary
+    other = "flat" if current == "sharded" else "sharded"
+    fallback = entry_dir(entry_id, other) / f"{entry_id}.md"
+    return fallback if fallback.exists() else primary
+
+
+def _registered_in(base: Path, name_re: re.Pattern) -> Iterator[Path]:
+    if not base.is_dir():
+        return
+    with os.scandir(base) as top:
+        for entry in top:
+            if entry.is_file():
+                if name_re.match(entry.name):
+                    yield Path(entry.path)
+            elif entry.is_dir() and entry.name.isdigit() and len(entry.name) == 4:
+                with os.scandir(entry.path) as months:
+                    month_paths = sorted(m.path for m in months if m.is_dir())
+                for month in month_paths:
+                    with os.scandir(month) as files:
+                        for f in files:
+                            if name_re.match(f.name) and f.is_file():
+                                yield Path(f.path)
+
+
+def iter_registered(entry_type: str) -> Iterator[Path]:
+    """Yield registered note or question files in either layout."""
+    if entry_type == "question":
+        yield from _registered_in(QUESTIONS_DIR, QUESTION_FILE_RE)
+    else:
+        yield from _registered_in(NOTES_DIR, NOTE_FILE_RE)